@@ -0,0 +1,112 @@
+# area_store.py
+
+from array import array
+
+
+class AreaStore:
+    """
+    Redaction areas held in parallel arrays: four coordinates per area in one array('d'), the
+    titles in a list and a stable uid per area in an array('q').
+
+    Records are addressed by uid, which is also the viewer's overlay key and the area list's row
+    key; index_of maps a uid to its current position. Every add, edit and removal is recorded, so
+    the viewer only updates the overlays that changed (take_changes). Iterating yields
+    {"coordinates", "title"} dicts; to_list() is the plain list the processor and templates use.
+    """
+
+    def __init__(self, areas=()):
+        self.coordinates = array("d")
+        self.titles = []
+        self.uids = array("q")
+        self._index = {}  # {uid: position}
+        self._next_uid = 1
+        self._changed = set()
+        self._removed = set()
+        self.extend(areas)
+
+    def __len__(self):
+        return len(self.uids)
+
+    def __iter__(self):
+        for index in range(len(self.uids)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        return {"coordinates": self.coordinates[4 * index:4 * index + 4].tolist(), "title": self.titles[index]}
+
+    def to_list(self):
+        return [self[index] for index in range(len(self.uids))]
+
+    def index_of(self, uid):
+        return self._index[uid]
+
+    def coordinates_of(self, uid):
+        index = 4 * self._index[uid]
+        return tuple(self.coordinates[index:index + 4])
+
+    def title_of(self, uid):
+        return self.titles[self._index[uid]]
+
+    def append(self, coordinates, title):
+        """Adds one area; returns its uid."""
+        return self.extend([{"coordinates": coordinates, "title": title}])[0]
+
+    def extend(self, areas):
+        """Adds many areas in one go (e.g. a template import); returns their uids."""
+        start = len(self.uids)
+        coordinates, titles = [], []
+        for area in areas:
+            x0, y0, x1, y1 = area["coordinates"]
+            coordinates += (float(x0), float(y0), float(x1), float(y1))
+            titles.append(area.get("title", "Untitled"))
+        uids = range(self._next_uid, self._next_uid + len(titles))
+        self._next_uid += len(titles)
+
+        self.coordinates.extend(coordinates)
+        self.titles += titles
+        self.uids.extend(uids)
+        self._index.update(zip(uids, range(start, start + len(titles))))
+        self._changed.update(uids)
+        return list(uids)
+
+    def replace(self, areas):
+        """Swaps the whole set of areas for `areas`."""
+        self.clear()
+        self.extend(areas)
+
+    def set_title(self, uid, title):
+        self.titles[self._index[uid]] = title
+        self._changed.add(uid)
+
+    def set_coordinate(self, uid, field, value):
+        """Sets x0, y0, x1 or y1 (field 0-3) of one area."""
+        self.coordinates[4 * self._index[uid] + field] = float(value)
+        self._changed.add(uid)
+
+    def remove(self, uids):
+        """Removes the areas with the given uids, keeping the order of the rest."""
+        gone = {uid for uid in uids if uid in self._index}
+        if not gone:
+            return
+        keep = [index for index, uid in enumerate(self.uids) if uid not in gone]
+        coordinates = self.coordinates
+        self.coordinates = array("d", [value for index in keep for value in coordinates[4 * index:4 * index + 4]])
+        self.titles = [self.titles[index] for index in keep]
+        self.uids = array("q", [self.uids[index] for index in keep])
+        self._index = {uid: index for index, uid in enumerate(self.uids)}
+        self._changed -= gone
+        self._removed |= gone
+
+    def clear(self):
+        self._removed.update(self.uids)
+        self._changed.clear()
+        self.coordinates = array("d")
+        self.titles = []
+        self.uids = array("q")
+        self._index.clear()
+
+    def take_changes(self):
+        """Returns (uids added or edited, uids removed) since the last call and forgets them."""
+        changed, removed = self._changed, self._removed
+        self._changed, self._removed = set(), set()
+        return changed, removed
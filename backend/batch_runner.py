@@ -0,0 +1,278 @@
+# batch_runner.py
+
+import glob
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from collections import deque
+
+from backend.constants import PARTIAL_OUTPUT_SUFFIX, THROUGHPUT_WINDOW
+from backend.metrics import write_metrics
+from backend.run_log import RunLog, configure_worker_logging
+
+# Set in each pool worker by _init_worker, so the processor is pickled once per worker, not per file
+_processor = None
+_events = None
+_cancelled = None
+
+
+def _init_worker(processor, events, log_queue, cancelled, ignore_interrupt):
+    global _processor, _events, _cancelled
+    _processor, _events, _cancelled = processor, events, cancelled
+    if ignore_interrupt:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+    configure_worker_logging(log_queue)
+
+
+def make_pool(processor, processes, events, log_queue, cancelled, ignore_interrupt=False, **pool_options):
+    """
+    A pool whose workers each hold `processor` and run `run_file` tasks. Workers post "start"
+    events to `events`, log through `log_queue` and skip their files once `cancelled` is set. With
+    `ignore_interrupt` they ignore Ctrl+C, so the parent decides whether their files finish.
+    """
+    return multiprocessing.Pool(processes, initializer=_init_worker,
+                                initargs=(processor, events, log_queue, cancelled, ignore_interrupt), **pool_options)
+
+
+def run_file(pdf_path):
+    """Pool task: announces the file, processes it and returns its result record."""
+    if _cancelled.is_set():  # Queued before the batch was cancelled; leave it for a resume
+        return {"file": pdf_path, "status": "cancelled", "pages": 0, "pid": os.getpid()}
+    _events.put(("start", os.getpid(), pdf_path, time.time()))
+    record = _processor.process_single_pdf(pdf_path)
+    record["pid"] = os.getpid()
+    return record
+
+
+class BatchStats:
+    """
+    Live view of a batch, built from the runner's events on the GUI thread.
+
+    Rates are computed over the last THROUGHPUT_WINDOW seconds, so the ETA follows the
+    current speed instead of the average since the start.
+    """
+
+    def __init__(self, total_files, processes, window=THROUGHPUT_WINDOW):
+        self.total_files = total_files
+        self.processes = processes
+        self.window = window
+        self.started = time.time()
+        self.done_files = 0
+        self.pages = 0
+        self.error_files = []
+        self.verification_failures = []  # (file, page, message)
+        self.current = {}  # {worker pid: (pdf_path, start time)}
+        self.slowest = None  # (seconds, pdf_path)
+        self.finished = False
+        self.cancelled = False
+        self.completed = set()  # Files processed, with or without errors
+        self._recent = deque()  # (finish time, pages) of files finished within the window
+
+    def apply(self, event):
+        kind = event[0]
+        if kind == "start":
+            _, pid, pdf_path, started = event
+            if pdf_path not in self.completed:  # The result can overtake its own start event
+                self.current[pid] = (pdf_path, started)
+        elif kind == "done":
+            _, record, finished = event
+            if record.get("status") == "cancelled":
+                return
+            pdf_path = record["file"]
+            self.completed.add(pdf_path)
+            started = None
+            if record.get("pid") in self.current and self.current[record["pid"]][0] == pdf_path:
+                started = self.current.pop(record["pid"])[1]
+            seconds = record["total_ms"] / 1000 if "total_ms" in record else (
+                finished - started if started is not None else None)
+            if seconds is not None and (self.slowest is None or seconds > self.slowest[0]):
+                self.slowest = (seconds, pdf_path)
+
+            self.done_files += 1
+            self.pages += record.get("pages", 0)
+            if record.get("status") != "ok":
+                self.error_files.append(pdf_path)
+            self.verification_failures += [(pdf_path, page, message)
+                                           for page, message in record.get("verification_failures", ())]
+            self._recent.append((finished, record.get("pages", 0)))
+        elif kind == "lost":  # A work queue worker stopped responding; its file goes back in the queue
+            self.current.pop(event[1], None)
+        elif kind == "finished":
+            _, _, self.cancelled = event
+            self.finished = True
+            self.current.clear()
+
+    def _trim(self, now):
+        while self._recent and self._recent[0][0] < now - self.window:
+            self._recent.popleft()
+
+    def rates(self, now=None):
+        """(files per second, pages per second) over the rolling window."""
+        now = now or time.time()
+        self._trim(now)
+        span = min(self.window, now - self.started)
+        if span <= 0:
+            return 0.0, 0.0
+        return len(self._recent) / span, sum(pages for _, pages in self._recent) / span
+
+    def eta_seconds(self, now=None):
+        files_per_second, _ = self.rates(now)
+        if not files_per_second:
+            return None
+        return (self.total_files - self.done_files) / files_per_second
+
+    @property
+    def busy_workers(self):
+        return len(self.current)
+
+    @property
+    def idle_workers(self):
+        return max(0, self.processes - len(self.current))
+
+    @property
+    def elapsed(self):
+        return time.time() - self.started
+
+
+class BatchRunner:
+    """
+    Runs process_single_pdf over a pool without blocking the caller, and reports as it goes.
+
+    Workers post a "start" event when they pick up a file; results come back through the pool's
+    result stream and are posted as "done" events; "finished" follows the last one. The caller
+    drains `events` (e.g. from Tk's after()) with drain(), which also updates `stats`.
+
+    pause() stops handing out files while the ones already handed out finish; resume() carries
+    on. cancel() stops dispatching and makes workers skip files still queued in the pool; files
+    being processed finish, or with terminate=True the pool is killed and their half-saved
+    temporary files are deleted; their outputs keep whatever an earlier run left. remaining_files() then lists what was not processed, for a new runner to resume.
+
+    The run's log file is owned by a RunLog for as long as the pool runs; it is complete and
+    closed by the time "finished" is posted.
+    """
+
+    def __init__(self, processor, pdf_files, log_file, processes=None):
+        self.processor = processor
+        self.pdf_files = list(pdf_files)
+        self.run_log = RunLog(log_file)
+        self.processes = processes or multiprocessing.cpu_count()
+        self.events = multiprocessing.Queue()
+        self.stats = BatchStats(len(self.pdf_files), self.processes)
+        # Only a couple of files per worker are handed to the pool at a time
+        self._slots = threading.Semaphore(self.processes * 2)
+        self._in_flight = set()  # Handed to the pool, result not back yet
+        self._processed = 0  # Results back, with or without errors, for the run log's summary
+        self._running = threading.Event()
+        self._running.set()
+        self._cancelled = multiprocessing.Event()
+        self._terminate = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    @property
+    def cancelling(self):
+        return self._cancelled.is_set()
+
+    def cancel(self, terminate=False):
+        """Stops the batch; with `terminate`, files being processed are abandoned instead of finished."""
+        self._terminate = self._terminate or terminate
+        self._cancelled.set()
+        self._running.set()
+
+    def remaining_files(self):
+        """Files not processed yet, in their original order. Call once the batch has finished."""
+        return [path for path in self.pdf_files if path not in self.stats.completed]
+
+    def _on_result(self, record):
+        self._in_flight.discard(record["file"])
+        if record.get("status") != "cancelled":
+            self._processed += 1
+        if self.processor.metrics_file and "total_ms" in record:
+            write_metrics(self.processor.metrics_file, record)
+        self.events.put(("done", record, time.time()))
+        self._slots.release()
+
+    def _on_error(self, pdf_path, error):
+        self._in_flight.discard(pdf_path)
+        self._processed += 1
+        self.events.put(("done", {"file": pdf_path, "status": "error", "pages": 0, "error": str(error)}, time.time()))
+        self._slots.release()
+
+    def _wait_for_slot(self):
+        """Blocks while paused or while the pool has enough files; returns False once cancelled."""
+        while not self._cancelled.is_set():
+            if self._running.wait(0.1) and self._slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    def _discard_partial_outputs(self):
+        """
+        Removes the temporary files killed workers were saving to. Outputs are only renamed into
+        place once complete, so the outputs themselves, including any from an earlier run of a file
+        that never started, are left as they were.
+        """
+        for pdf_path in list(self._in_flight):
+            output_path = self.processor.get_output_path(pdf_path)
+            for partial_path in glob.glob(f"{glob.escape(output_path)}.*{PARTIAL_OUTPUT_SUFFIX}"):
+                os.remove(partial_path)
+                logging.warning(f"Removed partial output {partial_path} of cancelled file {pdf_path}")
+
+    def join(self):
+        """Blocks until the batch has finished and applies its events to `stats`."""
+        self._thread.join()
+        self.drain()
+
+    def _run(self):
+        self.run_log.start()
+        pool = make_pool(self.processor, self.processes, self.events, self.run_log.queue, self._cancelled)
+        dispatched = 0
+        try:
+            for pdf_path in self.pdf_files:
+                if not self._wait_for_slot():
+                    break
+                dispatched += 1
+                self._in_flight.add(pdf_path)
+                pool.apply_async(run_file, (pdf_path,), callback=self._on_result,
+                                 error_callback=lambda error, path=pdf_path: self._on_error(path, error))
+            while self._in_flight and not self._terminate:
+                time.sleep(0.1)
+            if self._terminate:
+                pool.terminate()
+                self._discard_partial_outputs()
+            else:
+                pool.close()
+            pool.join()
+            if self.cancelling:
+                logging.warning(f"Batch cancelled after handing out {dispatched} of {len(self.pdf_files)} files; "
+                                f"{len(self._in_flight)} in progress were abandoned")
+        finally:
+            pool.terminate()
+            logging.info(f"Processed {self._processed} out of {len(self.pdf_files)} PDFs.")
+            self.run_log.stop()
+            self.events.put(("finished", time.time(), self.cancelling))
+
+    def drain(self):
+        """Applies all pending events to `stats`; returns True once the batch has finished."""
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.stats.apply(event)
+        return self.stats.finished
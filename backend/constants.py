@@ -19,6 +19,61 @@ SCROLL_INCREMENT_THRESHOLD = 3  # Adjust this for slower/faster auto-scroll
 scroll_counter = 0  # This will be updated in your main code
 RESIZE_DELAY = 700  # milliseconds delay
 
+# Tiled rendering
+TILE_SIZE = 512  # Edge length of a rendered tile in canvas pixels
+TILE_CACHE_BYTES = 256 * 2 ** 20  # Memory budget for rendered tiles (Tk keeps 4 bytes per pixel)
+ZOOM_BUCKET = 0.05  # Zoom levels are snapped to multiples of this so tiles can be reused
+TILE_MARGIN = 1  # Extra ring of tiles rendered around the visible region so scrolling stays smooth
+PREVIEW_MAX_SIZE = 1200  # Long side in pixels of the greyscale overview shown while tiles render
+RENDER_POLL_INTERVAL = 30  # milliseconds between checks for finished background renders
+ZOOM_SETTLE_DELAY = 150  # milliseconds without zoom input before the final zoom is rendered
+PREVIEW_SETTLE_DELAY = 300  # milliseconds without template edits before the output preview is re-run
+PREFETCH_PAGES = 1  # Pages on either side of the current one pre-rendered in the background
+SPARE_IMAGE_LIMIT = 8  # Evicted tile images kept for reuse instead of allocating new Tk photos
+
+# Folder thumbnails
+THUMBNAIL_SIZE = 160  # Long side of a thumbnail in pixels
+THUMBNAIL_CACHE_DIR = "thumbnail_cache"  # PNGs named by a hash of path, mtime and size
+THUMBNAIL_CACHE_BYTES = 256 * 2 ** 20  # Disk budget; the oldest thumbnails are pruned when a folder is shown
+THUMBNAIL_MEMORY_BYTES = 32 * 2 ** 20  # Budget for decoded thumbnails kept for rows scrolled out of view
+
+# Output QA (pixel diff of input against output pages)
+QA_DPI = 50  # Render resolution for the comparison
+QA_DIFF_THRESHOLD = 48  # Grey-level difference (0-255) that counts a pixel as changed
+QA_MARGIN = 3  # Points of slack around areas and insertion texts for anti-aliasing
+QA_MIN_PIXELS = 4  # Changed pixels outside the allowed regions before a page is flagged
+QA_THUMBNAILS = 25  # Worst pages that get a diff thumbnail in the report
+
+# Batch outputs
+PARTIAL_OUTPUT_SUFFIX = ".part"  # Outputs are saved as <output>.<random>.part and renamed into place when complete
+
+# Batch metrics
+COLLECT_METRICS = True  # Write per-file stage timings to logs/metrics_<time>.jsonl
+METRICS_SLOWEST = 10  # Slowest files listed in the run summary
+
+# Batch progress dashboard
+THROUGHPUT_WINDOW = 30  # seconds of recent completions used for the rates and the ETA
+DASHBOARD_REFRESH = 250  # milliseconds between dashboard updates
+
+# Coordinator/worker mode (backend.work_queue)
+WORK_QUEUE_PORT = 47800
+WORK_HEARTBEAT = 5  # seconds between worker heartbeats
+# A worker silent this long is presumed lost and its file re-queued. Generous, because a long
+# MuPDF call can hold the GIL and delay the heartbeat thread by a second or two
+WORK_LEASE_TIMEOUT = 60
+WORK_MAX_ATTEMPTS = 3  # Workers a file may lose before it is recorded as an error
+
+# Watch-folder daemon (backend.watch_folder)
+WATCH_POLL = 1.0  # seconds between polls of the watched folder
+WATCH_SETTLE = 2.0  # seconds a file's size and mtime must stay the same before it is processed
+WATCH_FULL_SCAN = 300  # seconds between full listings, to catch files overwritten in place
+WATCH_MAX_TASKS_PER_CHILD = 200  # Files per pool worker before it is replaced, so MuPDF memory cannot build up
+
+# Batch run log, written by one listener in the parent
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(processName)s - %(pdf_file)s - %(message)s"
+LOG_BATCH_SIZE = 200  # records buffered before a write
+LOG_FLUSH_INTERVAL = 2.0  # seconds; a record arriving later than this after the last write flushes the buffer
+
 #modes
 TEXT_MODE = "text_mode"
 REDACTION_MODE = "redaction_mode"
@@ -27,6 +82,16 @@ REVISION_COORDINATES_MODE = "rev_coordinates"
 
 
 
+# The 14 standard PDF fonts, usable without embedding (pymupdf.Base14_fontdict lists them with aliases)
+BASE14_FONTS = [
+    "Courier", "Courier-Oblique", "Courier-Bold", "Courier-BoldOblique",
+    "Helvetica", "Helvetica-Oblique", "Helvetica-Bold", "Helvetica-BoldOblique",
+    "Times-Roman", "Times-Italic", "Times-Bold", "Times-BoldItalic",
+    "Symbol", "ZapfDingbats",
+]
+CUSTOM_FONT_OPTION = "Font file..."  # Font menu entry that adds a .ttf/.otf file
+SUBSET_FONTS = True  # Subset fonts at save when an insertion uses a font file (smaller outputs, slower saves)
+
 FONT_MAPPING = {
     "Courier": "Courier",
     "Courier-Oblique": "Courier",
@@ -0,0 +1,106 @@
+# data_merge.py
+
+"""
+Per-file values for insertion text.
+
+Insertion text may contain {{column}} placeholders. A MergeTable reads a CSV or xlsx sheet once
+into a dict keyed by its key column, normalised (whitespace collapsed, case-folded, ".pdf"
+dropped), so finding a file's row is one hash lookup. Rows are matched by the PDF's file name
+without extension, or by the text found in a template area such as the old drawing number.
+
+The table travels inside the PDFProcessor, which BatchRunner hands to each pool worker once
+through the pool initializer, so it is pickled once per worker rather than once per file.
+"""
+
+import csv
+import datetime
+import os
+import re
+
+PLACEHOLDER = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+
+
+def normalize_key(value):
+    key = " ".join(str(value).split()).casefold()
+    return key[:-4] if key.endswith(".pdf") else key
+
+
+def placeholders(text):
+    """Column names used as {{column}} in `text`."""
+    return PLACEHOLDER.findall(str(text))
+
+
+def fill_placeholders(text, row):
+    """Replaces every {{column}} in `text` with the row's value; a missing column raises KeyError."""
+    return PLACEHOLDER.sub(lambda match: row[match.group(1)], str(text))
+
+
+def _cell_text(value):
+    """Text of a spreadsheet cell as it would be typed: 12 not 12.0, dates as 09-Jan-25."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime("%d-%b-%y")
+    return str(value).strip()
+
+
+def read_table(path):
+    """Reads a CSV or xlsx file whose first row names the columns; returns (columns, rows as dicts)."""
+    if path.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            records = [[_cell_text(value) for value in row] for row in wb.active.iter_rows(values_only=True)]
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            records = [[value.strip() for value in row] for row in csv.reader(f)]
+
+    if not records:
+        raise ValueError(f"{path} is empty")
+    columns = records[0]
+    return columns, [dict(zip(columns, record)) for record in records[1:] if any(record)]
+
+
+class MergeTable:
+    """Rows of a data merge sheet indexed by key. The first row wins when a key repeats."""
+
+    def __init__(self, columns, rows, key_column, key_area=None, source=None):
+        if key_column not in columns:
+            raise ValueError(f"Key column '{key_column}' not found; columns are {', '.join(columns)}")
+        self.columns = columns
+        self.key_column = key_column
+        self.key_area = key_area  # Title of the template area holding the key; None matches file names
+        self.source = source  # (path, mtime) of the file it was read from
+        self.rows = {}
+        self.duplicates = 0
+        for row in rows:
+            key = normalize_key(row.get(key_column, ""))
+            if not key:
+                continue
+            if key in self.rows:
+                self.duplicates += 1
+                continue
+            self.rows[key] = row
+
+    @classmethod
+    def load(cls, path, key_column=None, key_area=None):
+        """Builds the table from a file read with read_table; the key column defaults to the first."""
+        columns, rows = read_table(path)
+        return cls(columns, rows, key_column or columns[0], key_area, (path, os.path.getmtime(path)))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def lookup(self, key):
+        """The row for `key`, or None."""
+        return self.rows.get(normalize_key(key))
+
+    def missing_columns(self, insertion_points):
+        """Placeholders used by the insertion points that are not columns of this table."""
+        return sorted({name for insertion in insertion_points for name in placeholders(insertion["text"])}
+                      - set(self.columns))
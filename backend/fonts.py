@@ -0,0 +1,60 @@
+# fonts.py
+
+"""
+TrueType/OpenType fonts for insertion text.
+
+An insertion point's font is either a Base-14 name or the path of a .ttf/.otf file. Font files
+are read once per process (so once per pool worker) and kept in memory; each page then installs
+the font from that buffer under a fixed resource name. MuPDF recognises the same font program
+within a document, so it is embedded once and every page refers to that one font object.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+import pymupdf as fitz
+
+FONT_FILE_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+
+def is_font_file(font):
+    return str(font).lower().endswith(FONT_FILE_EXTENSIONS)
+
+
+@lru_cache(maxsize=None)
+def font_buffer(path):
+    """The bytes of a font file, read on first use in this process."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=None)
+def load_font(path):
+    """A pymupdf.Font for a font file, for measuring text."""
+    return fitz.Font(fontbuffer=font_buffer(path))
+
+
+def font_resource_name(path):
+    """Page resource name for a font file, e.g. 'CorporateSans-Bold.ttf' -> 'CorporateSans-Bold'."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r"[^A-Za-z0-9_-]", "", stem) or "CustomFont"
+
+
+def page_font(page, font):
+    """
+    The fontname to pass to insert_text for `font`. Font files are installed on the page from
+    the cached buffer first; Base-14 names are returned as they are.
+    """
+    if not is_font_file(font):
+        return font
+    name = font_resource_name(font)
+    page.insert_font(fontname=name, fontbuffer=font_buffer(font))
+    return name
+
+
+def text_length(text, font, size):
+    """Width in points of one line of `text`, for Base-14 names and font files alike."""
+    if is_font_file(font):
+        return load_font(font).text_length(text, fontsize=size)
+    return fitz.get_text_length(text, fontname=font, fontsize=size)
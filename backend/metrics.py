@@ -0,0 +1,166 @@
+# metrics.py
+
+"""
+Per-file stage timings and counters for batch runs.
+
+process_single_pdf times each stage with a StageTimer and returns the timings in its result
+record; the process collecting the results (BatchRunner, the watch daemon or the work queue
+coordinator) appends them as one JSON line per file to the run's metrics file.
+summarize_metrics turns that file into percentiles per stage and the slowest files. With
+metrics disabled the processor uses NULL_TIMER, whose stages are shared no-op
+context managers, so the disabled cost is a method call per stage.
+
+    python -m backend.metrics logs/metrics_<time>.jsonl [--slowest 10]
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import math
+import os
+import time
+
+from backend.constants import METRICS_SLOWEST
+
+
+class StageTimer:
+    """Accumulates wall time per named stage and integer counters for one file."""
+
+    def __init__(self):
+        self.stages = {}  # {stage: seconds}; a stage entered several times (e.g. once per page) adds up
+        self.counters = {}
+        self.started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, **fields):
+        """The JSON-ready record for this file: `fields`, total and per-stage milliseconds, counters."""
+        return {
+            **fields,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            **self.counters,
+        }
+
+
+class _NullTimer:
+    """Stand-in for StageTimer when metrics are off."""
+
+    _context = contextlib.nullcontext()
+
+    def stage(self, name):
+        return self._context
+
+    def count(self, name, amount=1):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def append_record(metrics_file, record):
+    """Appends one record as a JSON line. Only one process should write a given file: a long
+    record is not a single atomic write, so lines from several writers could interleave."""
+    with open(metrics_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def write_metrics(metrics_file, record):
+    """Appends a file's metrics record in the process collecting the results; a failed write is logged, not raised."""
+    try:
+        append_record(metrics_file, record)
+    except OSError as e:
+        logging.warning(f"Could not write metrics for {record.get('file')}: {e}")
+
+
+def read_records(metrics_file):
+    with open(metrics_file, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize_metrics(metrics_file, slowest=METRICS_SLOWEST):
+    """Aggregates a run's records: totals, p50/p90/p99/max per stage, and the slowest files."""
+    records = read_records(metrics_file)
+    stage_values = {}
+    for record in records:
+        for name, ms in record.get("stages_ms", {}).items():
+            stage_values.setdefault(name, []).append(ms)
+
+    stages = {}
+    for name, values in stage_values.items():
+        values.sort()
+        stages[name] = {
+            "files": len(values),
+            "total_ms": round(sum(values), 3),
+            "p50_ms": percentile(values, 0.5),
+            "p90_ms": percentile(values, 0.9),
+            "p99_ms": percentile(values, 0.99),
+            "max_ms": values[-1],
+        }
+
+    totals = sorted(record["total_ms"] for record in records)
+    counters = ("pages", "areas_applied", "insertions", "tables_found", "bytes_in", "bytes_out")
+    return {
+        "files": len(records),
+        "errors": sum(record.get("status") != "ok" for record in records),
+        **{name: sum(record.get(name, 0) for record in records) for name in counters},
+        "file_ms": {"p50": percentile(totals, 0.5), "p90": percentile(totals, 0.9),
+                    "p99": percentile(totals, 0.99), "max": totals[-1]} if totals else {},
+        "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["total_ms"])),
+        "slowest": [{"file": record["file"], "total_ms": record["total_ms"], "status": record.get("status")}
+                    for record in sorted(records, key=lambda record: -record["total_ms"])[:slowest]],
+    }
+
+
+def write_summary(summary, metrics_file):
+    """Saves the summary next to the metrics file as <name>_summary.json; returns its path."""
+    summary_path = os.path.splitext(metrics_file)[0] + "_summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary_path
+
+
+def format_summary(summary):
+    """Human-readable text of a summary, for the console."""
+    lines = [f"{summary['files']} files, {summary['pages']} pages, {summary['errors']} errors, "
+             f"{summary['bytes_in'] / 2 ** 20:.1f} MB in, {summary['bytes_out'] / 2 ** 20:.1f} MB out"]
+    if summary["file_ms"]:
+        lines.append("Per file: " + ", ".join(f"{key} {value:.0f} ms" for key, value in summary["file_ms"].items()))
+    lines.append(f"{'stage':<18}{'total s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name, stage in summary["stages"].items():
+        lines.append(f"{name:<18}{stage['total_ms'] / 1000:>9.1f}{stage['p50_ms']:>9.1f}{stage['p90_ms']:>9.1f}"
+                     f"{stage['p99_ms']:>9.1f}{stage['max_ms']:>9.1f}")
+    lines.append("Slowest files:")
+    lines += [f"  {entry['total_ms']:>9.0f} ms  {entry['file']}" for entry in summary["slowest"]]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a batch metrics file.")
+    parser.add_argument("metrics_file")
+    parser.add_argument("--slowest", type=int, default=METRICS_SLOWEST)
+    args = parser.parse_args()
+
+    summary = summarize_metrics(args.metrics_file, args.slowest)
+    print(format_summary(summary))
+    print(f"Summary written to {write_summary(summary, args.metrics_file)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# output_preview.py
+
+import logging
+import os
+import time
+
+import pymupdf as fitz
+
+# Pipeline stages in the order process_single_pdf runs them
+STAGES = ("bake", "redact", "insert", "revision")
+
+
+def stage_keys(template):
+    """
+    Returns one key per stage describing the template inputs that stage reads.
+
+    A stage's output also depends on every stage before it, so the first key that differs from
+    the cached run marks where the pipeline has to restart.
+    """
+    merge = template.get("data_merge")
+    return (
+        None,  # Baking depends on the source page only
+        repr([area["coordinates"] for area in template["areas"]]),
+        repr(([(point["position"], point["text"], point["font"], point["size"])
+               for point in template["insertion_points"]],
+              (merge.source, merge.key_column, merge.key_area) if merge else None)),
+        repr((template["table_coordinates"], template["rev_coordinates"],
+              template["revision_date"], template["revision_description"])),
+    )
+
+
+class OutputPreview:
+    """
+    Produces what the batch would write for one page, without touching the disk.
+
+    The page is copied into an in-memory document and run through the same PDFProcessor stages
+    as process_single_pdf. The document is snapshotted after every stage, so an edit to, say, an
+    insertion point re-runs only the insert and revision stages from the redacted snapshot.
+
+    The viewer runs it in its render process (see frontend.render_worker), so table detection,
+    redaction and text insertion never hold the GUI's GIL; only renders of the finished page
+    come back to the editor.
+    """
+
+    def __init__(self):
+        self._source = None  # (pdf_path, mtime, page_number) the snapshots belong to
+        self._keys = ()
+        self._snapshots = []  # PDF bytes after each stage
+
+    def render(self, pdf_path, page_number, template):
+        """Returns the processed page as the bytes of a one-page PDF."""
+        source = (pdf_path, os.path.getmtime(pdf_path), page_number)
+        if source != self._source:
+            self._source, self._keys, self._snapshots = source, (), []
+
+        keys = stage_keys(template)
+        start = 0
+        while start < len(self._keys) and self._keys[start] == keys[start]:
+            start += 1
+        if start == len(STAGES):
+            return self._snapshots[-1]
+
+        from backend.pdf_processor import PDFProcessor  # The viewer imports this module at startup
+
+        started = time.perf_counter()
+        processor = PDFProcessor(
+            pdf_folder=os.path.dirname(pdf_path),
+            output_excel_path="",
+            areas=template["areas"],
+            insertion_points=template["insertion_points"],
+            include_subfolders=False,
+            table_coordinates=template["table_coordinates"],
+            rev_coordinates=template["rev_coordinates"],
+            revision_date=template["revision_date"],
+            revision_description=template["revision_description"],
+            data_merge=template.get("data_merge"),
+        )
+        if start:
+            doc = fitz.open("pdf", self._snapshots[start - 1])
+        else:
+            doc = fitz.open()
+            with fitz.open(pdf_path) as source_doc:
+                doc.insert_pdf(source_doc, from_page=page_number, to_page=page_number)
+
+        try:
+            snapshots = self._snapshots[:start]
+            for stage in STAGES[start:]:
+                if stage == "bake":
+                    processor.bake_document(doc)
+                elif stage == "redact":
+                    processor.redact_page(doc[0])
+                elif stage == "insert":
+                    processor.insert_page_text(doc[0], insertion_points=self._merged_insertions(processor, pdf_path))
+                elif processor.revision_date and processor.revision_description:
+                    processor.update_revision(doc[0], pdf_path)
+                snapshots.append(doc.tobytes())
+        finally:
+            doc.close()
+
+        self._keys, self._snapshots = keys, snapshots
+        logging.debug(f"Preview: ran {', '.join(STAGES[start:])} in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return snapshots[-1]
+
+    @staticmethod
+    def _merged_insertions(processor, pdf_path):
+        """
+        Insertion points with data merge placeholders filled in, or None without a data merge.
+        The key is read from the untouched first page, as the batch does; by the insert stage the
+        preview page's key area has already been redacted.
+        """
+        if processor.data_merge is None:
+            return None
+        with fitz.open() as first_page, fitz.open(pdf_path) as source_doc:
+            first_page.insert_pdf(source_doc, from_page=0, to_page=0)
+            return processor.resolve_insertions(first_page, pdf_path)
@@ -0,0 +1,48 @@
+# page_text.py
+
+import pymupdf as fitz
+
+
+class PageText:
+    """
+    Collects the text written to one page and adds it to the page in a single content-stream
+    append when committed.
+
+    page.insert_text and page.insert_textbox each build a Shape and commit it, and every commit
+    re-reads the page's content streams to balance the graphics state and appends a stream of its
+    own; on a drawing with heavy line work that costs far more than the text. Here every call
+    goes into one Shape, which writes the same operators and font resources as those methods, so
+    the result looks the same. The boxes of the queued text are kept so a later redaction can
+    commit the text first when it would have cleared some of it.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.shape = page.new_shape()
+        self.rects = []  # Boxes of the queued text, in page coordinates
+
+    def __len__(self):
+        return len(self.rects)
+
+    def insert_text(self, point, text, rect, **kwargs):
+        """Queues text written at `point`, as page.insert_text; `rect` is the box it covers."""
+        self.shape.insert_text(point, text, **kwargs)
+        self.rects.append(fitz.Rect(rect))
+
+    def insert_textbox(self, rect, text, **kwargs):
+        """Queues text fitted into `rect`, as page.insert_textbox; returns the unused height."""
+        spare = self.shape.insert_textbox(rect, text, **kwargs)
+        if spare >= 0:
+            self.rects.append(fitz.Rect(rect))
+        return spare
+
+    def intersects(self, rect):
+        rect = fitz.Rect(rect)
+        return any(queued.intersects(rect) for queued in self.rects)
+
+    def commit(self):
+        """Writes the queued text to the page, if there is any, and starts afresh."""
+        if self.rects:
+            self.shape.commit()
+            self.shape = self.page.new_shape()
+            self.rects = []
@@ -2,22 +2,58 @@
 
 import os
 import re
+import tempfile
 import pymupdf as fitz
 import logging
 from datetime import datetime
-import multiprocessing
-from functools import partial
-from backend.utils import adjust_coordinates_for_rotation, adjust_point_for_rotation
+from backend.batch_runner import BatchRunner
+from backend.constants import PARTIAL_OUTPUT_SUFFIX
+from backend.data_merge import placeholders, fill_placeholders
+from backend.fonts import is_font_file, page_font, text_length
+from backend.metrics import StageTimer, NULL_TIMER
+from backend.page_text import PageText
+from backend.run_log import log_context
+from backend.utils import adjust_coordinates_for_rotation, adjust_point_for_rotation, project_area_to_page
+
+def find_pdf_files(pdf_folder, include_subfolders):
+    """Gathers all PDF files within `pdf_folder`, optionally descending into subfolders."""
+    pdf_files = []
+    for root_folder, subfolders, files in os.walk(pdf_folder):
+        if not include_subfolders:
+            subfolders.clear()
+        pdf_files.extend(
+            [os.path.join(root_folder, f) for f in files if f.lower().endswith('.pdf')]
+        )
+    return pdf_files
+
+
+def insertion_text_rect(insertion):
+    """Estimates the box, in points, that page.insert_text covers for an insertion point."""
+    x, y = insertion['position']
+    size = insertion['size']
+    lines = str(insertion['text']).split("\n")
+    try:
+        width = max(text_length(line, insertion['font'], size) for line in lines)
+    except Exception:
+        width = 0.6 * size * max(len(line) for line in lines)  # Rough width for unknown fonts
+    # insert_text places the first baseline at y and continues downwards
+    return [x, y - size, x + width, y + size * (1.2 * (len(lines) - 1) + 0.35)]
+
 
 class PDFProcessor:
-    def __init__(self, pdf_folder, output_excel_path, areas, insertion_points, include_subfolders, table_coordinates, rev_coordinates,revision_date, revision_description):
+    def __init__(self, pdf_folder, output_excel_path, areas, insertion_points, include_subfolders, table_coordinates, rev_coordinates,revision_date, revision_description, verify_output=False, collect_metrics=False, data_merge=None, subset_fonts=False):
 
         self.insertion_points = insertion_points  # Store insertion points
+        self.data_merge = data_merge  # MergeTable filling {{column}} placeholders per file, if any
 
         self.table_coordinates = table_coordinates  # Add table coordinates
         self.rev_coordinates = rev_coordinates  # Add revision coordinates
         self.revision_date = revision_date  # Store Date
         self.revision_description = revision_description
+        self.verify_output = verify_output  # Re-open each saved file and check the redactions took
+        self.collect_metrics = collect_metrics
+        self.subset_fonts = subset_fonts  # Keep only the used glyphs of embedded insertion fonts
+        self.metrics_file = None  # JSONL of per-file stage timings, set during setup_logging() if collecting
 
         self.log_file = None  # Log file will be set during setup_logging()
 
@@ -32,23 +68,42 @@ class PDFProcessor:
         if not os.path.exists(self.temp_image_folder):
             os.makedirs(self.temp_image_folder)
 
+    @classmethod
+    def from_template(cls, template, pdf_folder, output_folder, **options):
+        """
+        A processor for a template workbook exported from the GUI, for runs without the GUI.
+        `template` is the workbook's path or a dict as load_template returns it.
+        """
+        if not isinstance(template, dict):
+            from backend.template_io import load_template
+
+            template = load_template(template)
+        return cls(
+            pdf_folder=pdf_folder,
+            output_excel_path=output_folder,
+            areas=template["areas"] or [],
+            insertion_points=template["insertion_points"] or [],
+            table_coordinates=template["table_coordinates"],
+            rev_coordinates=template["rev_coordinates"],
+            **{"include_subfolders": False, "revision_date": "", "revision_description": "", **options},
+        )
+
     def setup_logging(self):
-        """Configures the logging module with a dynamic log file name."""
+        """
+        Names this run's log file (and metrics file) and returns the log file. Calling it again
+        returns the same file. The file is written by the run's RunLog listener (see run_log).
+        """
+        if self.log_file:
+            return self.log_file
         log_folder = "logs"  # Define a folder for logs
         os.makedirs(log_folder, exist_ok=True)
 
         current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
         self.log_file = os.path.join(log_folder, f"error_log_{current_time}.txt")
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[
-                logging.FileHandler(self.log_file, mode='w'),
-                logging.StreamHandler()
-            ]
-        )
+        if self.collect_metrics:
+            self.metrics_file = os.path.join(log_folder, f"metrics_{current_time}.jsonl")
         print(f"Logging initialized. Log file: {self.log_file}")
+        return self.log_file
 
     def clean_text(self, text):
         """Cleans text by replacing newlines, stripping, and removing illegal characters."""
@@ -67,41 +122,24 @@ class PDFProcessor:
         return re.sub(r'\s+', ' ', text)
 
     def start_processing(self, progress_list, total_files):
-        """Extracts text from PDFs using multiprocessing and updates the progress list."""
+        """Processes every PDF with a BatchRunner and waits for it, filling in the progress list."""
         log_file = self.setup_logging()  # Call logging setup
-        logging.info(f"Logging started. Log file: {log_file}")
 
-        try:
-            # Gather all PDF files in the specified folder
-            pdf_files = self.get_pdf_files()
-            total_files.value = len(pdf_files)
-
-            if not pdf_files:
-                logging.warning("No PDF files found in the specified folder.")
-                return
-
-            # Create a multiprocessing pool
-            pool = multiprocessing.Pool()
-            manager = multiprocessing.Manager()
-            progress_list = manager.list()  # Shared list for progress tracking
-
-            # Use partial to pass the shared progress list to process_single_pdf
-            process_func = partial(self.process_single_pdf, progress_list=progress_list)
-
-            # Process the files in parallel
-            pool.map(process_func, pdf_files)
-
-            # Close and join the pool
-            pool.close()
-            pool.join()
-
-            logging.info(f"Processed {len(progress_list)} out of {len(pdf_files)} PDFs.")
-
-        except Exception as e:
-            logging.error(f"Error during processing: {e}")
-
-    def insert_revision_row(self, page, table, new_row, latest_revision_index):
-            """Insert a new revision row using precise cell bounding boxes."""
+        # Gather all PDF files in the specified folder
+        pdf_files = self.get_pdf_files()
+        total_files.value = len(pdf_files)
+        if not pdf_files:
+            logging.warning("No PDF files found in the specified folder.")
+            return
+
+        runner = BatchRunner(self, pdf_files, log_file)  # Logs the "Processed ..." summary to the run log
+        runner.start()
+        runner.join()
+        # A Manager list proxy pickles its arguments, so it must be given a list, not a generator
+        progress_list.extend([path for path in pdf_files if path not in runner.stats.error_files])
+
+    def insert_revision_row(self, text, table, new_row, latest_revision_index):
+            """Insert a new revision row using precise cell bounding boxes, queued on the page's PageText."""
             cell_text = table.extract()  # Extract table contents
             cell_boxes = [[cell for cell in row.cells] for row in table.rows]  # Get cell bounding boxes
 
@@ -121,7 +159,7 @@ class PDFProcessor:
                     rect = fitz.Rect(text_x0, y0, x1, text_y1)
 
                     # Insert text into the cell
-                    page.insert_textbox(
+                    text.insert_textbox(
                         rect,
                         cell_content,
                         fontsize=8,
@@ -129,126 +167,314 @@ class PDFProcessor:
                         align=0  # Left-aligned
                     )
 
-    def process_single_pdf(self, input_pdf_path, log_file, error_files, progress_list=None):
-        """Reconfigures logging and processes a single PDF file."""
-
-        logging.basicConfig(
-            level=logging.WARNING,  # Log only warnings and errors
-            format="%(asctime)s - %(levelname)s - %(message)s",
-            handlers=[logging.FileHandler(log_file, mode='a')]
+    def process_single_pdf(self, input_pdf_path, error_files=None, progress_list=None, verification_failures=None):
+        """
+        Processes a single PDF file. Log records from it are tagged with the file (see run_log).
+        Returns {"file", "status", "pages"}, plus "verification_failures" [(page, message)] when
+        verification fails, and timings and counters when metrics are collected.
+        """
+        timer = StageTimer() if self.collect_metrics else NULL_TIMER
+        status, pages, output_pdf_path, failures = "ok", 0, None, []
+        with log_context(input_pdf_path):
+            try:
+                output_pdf_path = self.get_output_path(input_pdf_path)
+                with timer.stage("open"):
+                    doc = fitz.open(input_pdf_path)
+                pages = doc.page_count
+
+                self.bake_document(doc, timer)
+                with timer.stage("merge"):
+                    insertion_points = self.resolve_insertions(doc, input_pdf_path, timer)
+                for page in doc:
+                    self.process_page(page, input_pdf_path, timer, insertion_points)
+
+                if self.subset_fonts and any(is_font_file(insertion['font']) for insertion in insertion_points):
+                    with timer.stage("subset_fonts"):
+                        doc.subset_fonts()
+                with timer.stage("save"):
+                    self.save_output(doc, output_pdf_path)
+
+                if self.verify_output:
+                    with timer.stage("verify"):
+                        failures = self.verify_saved_output(output_pdf_path, insertion_points)
+                    for page_number, message in failures:
+                        logging.warning(f"Verification failed for {input_pdf_path}, page {page_number}: {message}")
+                    if failures and verification_failures is not None:
+                        verification_failures.extend((input_pdf_path, page_number, message) for page_number, message in failures)
+
+                if progress_list is not None:
+                    progress_list.append(input_pdf_path)
+
+            except Exception as e:
+                status = "error"
+                logging.error(f"Error processing {input_pdf_path}: {e}")
+                if error_files is not None:
+                    error_files.append(input_pdf_path)  # Add to error list
+
+        result = {"file": input_pdf_path, "status": status, "pages": pages}
+        if failures:
+            result["verification_failures"] = failures
+        if not self.collect_metrics:
+            return result
+        # Whoever collects the results writes them to metrics_file, so workers never share the file
+        return timer.record(
+            **result, pid=os.getpid(),
+            bytes_in=os.path.getsize(input_pdf_path) if os.path.exists(input_pdf_path) else 0,
+            bytes_out=os.path.getsize(output_pdf_path) if output_pdf_path and os.path.exists(output_pdf_path) else 0,
         )
 
+    def save_output(self, doc, output_pdf_path):
+        """
+        Saves to a temporary file next to `output_pdf_path` and renames it into place, so the
+        output is either the previous file or the complete new one, never half written, even if
+        two workers end up processing the same file.
+        """
+        output_dir, name = os.path.split(output_pdf_path)
+        fd, partial_path = tempfile.mkstemp(suffix=PARTIAL_OUTPUT_SUFFIX, prefix=f"{name}.", dir=output_dir)
+        os.close(fd)
         try:
-            output_pdf_path = self.get_output_path(input_pdf_path)
-            doc = fitz.open(input_pdf_path)
+            doc.ez_save(partial_path)
+            os.replace(partial_path, output_pdf_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
 
+    def verify_saved_output(self, output_pdf_path, insertion_points=None):
+        """
+        Re-opens a saved output and checks that no extractable text is left inside any template
+        area and that every insertion text is present. Returns [(page number, message)] failures.
+
+        Extraction is clipped to the areas and insertion boxes, so only those regions are read.
+        """
+        failures = []
+        with fitz.open(output_pdf_path) as doc:
+            for page in doc:
+                # Outputs have no rotation, so template coordinates apply as they are
+                area_rects = []
+                for index, area in enumerate(self.areas):
+                    rect, _ = project_area_to_page(area["coordinates"], page.rect.width, page.rect.height)
+                    if rect is not None:
+                        area_rects.append((area.get("title") or f"Area {index + 1}", fitz.Rect(rect)))
+                insertion_rects = []
+                for insertion in self.insertion_points if insertion_points is None else insertion_points:
+                    expected = " ".join(str(insertion['text']).split())
+                    if expected:
+                        insertion_rects.append((expected, fitz.Rect(insertion_text_rect(insertion)) + (-2, -2, 2, 2)))
+                if not area_rects and not insertion_rects:
+                    continue
+
+                # One text extraction per page, limited to the checked regions, serves every check
+                clip = fitz.Rect()
+                for _, rect in area_rects + insertion_rects:
+                    clip |= rect
+                words = page.get_textpage(clip=clip).extractWORDS()
+
+                def words_in(rect):
+                    # Redaction splits words, so a leftover piece is its own word; it counts when its
+                    # centre is inside the region
+                    return [word for word in words
+                            if rect.x0 <= (word[0] + word[2]) / 2 <= rect.x1
+                            and rect.y0 <= (word[1] + word[3]) / 2 <= rect.y1]
+
+                # Inserted text often lands inside a redacted area; it is not a leftover
+                inserted = {id(word) for expected, rect in insertion_rects
+                            for word in words_in(rect) if word[4] in expected.split()}
+                for title, rect in area_rects:
+                    remaining = " ".join(word[4] for word in words_in(rect) if id(word) not in inserted)
+                    if remaining:
+                        failures.append((page.number + 1, f"text left in {title}: {remaining[:40]!r}"))
+                for expected, rect in insertion_rects:
+                    found = "".join(word[4] for word in words_in(rect))
+                    if expected.replace(" ", "") not in found:
+                        failures.append((page.number + 1, f"inserted text missing: {expected[:40]!r}"))
+        return failures
+
+    # The page pipeline is split into stages so the viewer's output preview can run exactly the
+    # same steps on a single page and re-run only the stages whose template inputs changed.
+
+    def bake_document(self, doc, timer=NULL_TIMER):
+        """Flattens form fields and annotations into the page content, if there are any."""
+        with timer.stage("bake"):
             needs_bake = doc.is_form_pdf or any(page.first_annot for page in doc)
             if needs_bake:
                 doc.bake()
 
-            for page in doc:
-                page.remove_rotation()
+    def resolve_insertions(self, doc, input_pdf_path, timer=NULL_TIMER):
+        """
+        The insertion points for one file, with {{column}} placeholders filled in from its data
+        merge row. Insertions whose row or column is missing are left out and logged, rather than
+        stamping the placeholder itself onto the drawing.
+        """
+        if self.data_merge is None:
+            return self.insertion_points
+        key = self.merge_key(doc, input_pdf_path)
+        row = self.data_merge.lookup(key)
+        if row is None:
+            timer.count("merge_misses")
+            logging.warning(f"No data merge row for key '{key}' of {input_pdf_path}")
+
+        resolved = []
+        for insertion in self.insertion_points:
+            if not placeholders(insertion['text']):
+                resolved.append(insertion)
+            elif row is not None:
+                try:
+                    resolved.append({**insertion, 'text': fill_placeholders(insertion['text'], row)})
+                except KeyError as e:
+                    logging.warning(f"Data merge has no column {e} for {input_pdf_path}")
+        return resolved
+
+    def merge_key(self, doc, input_pdf_path):
+        """The file's data merge key: its name without extension, or the text in the key area of page 1."""
+        if self.data_merge.key_area is None:
+            return os.path.splitext(os.path.basename(input_pdf_path))[0]
+        for area in self.areas:
+            if area.get("title") == self.data_merge.key_area:
+                page = doc[0]
+                page.remove_rotation()  # Areas apply to the page as displayed, as in redact_page
+                rect = adjust_coordinates_for_rotation(area["coordinates"], page.rotation,
+                                                       page.rect.height, page.rect.width)
+                return page.get_text("text", clip=fitz.Rect(rect)).strip()
+        logging.warning(f"No template area titled '{self.data_merge.key_area}' to read the data merge key from")
+        return ""
+
+    def process_page(self, page, input_pdf_path, timer=NULL_TIMER, insertion_points=None):
+        """Runs every per-page stage on an already baked page; all its text is written in one go at the end."""
+        self.redact_page(page, timer)
+        text = PageText(page)
+        self.insert_page_text(page, timer, insertion_points, text)
+        # Revision updater logic: Only run if revision updater is enabled
+        if self.revision_date and self.revision_description:
+            self.update_revision(page, input_pdf_path, timer, text)
+        with timer.stage("write_text"):
+            text.commit()
+
+    def redact_page(self, page, timer=NULL_TIMER):
+        """Removes the page rotation and blanks out every template area."""
+        with timer.stage("remove_rotation"):
+            page.remove_rotation()
+
+        with timer.stage("apply_redactions"):
+            for area in self.areas:
+                coordinates = area["coordinates"]
+                adjusted_coordinates = adjust_coordinates_for_rotation(
+                    coordinates, page.rotation, page.rect.height, page.rect.width
+                )
+                rect = fitz.Rect(*adjusted_coordinates)
+                page.add_redact_annot(rect)
+
+            page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE | 0, graphics=fitz.PDF_REDACT_LINE_ART_NONE | 0)
+        timer.count("areas_applied", len(self.areas))
+
+    def insert_page_text(self, page, timer=NULL_TIMER, insertion_points=None, text=None):
+        """
+        Writes the text of every insertion point (by default the template's, as they are). With a
+        PageText the text is only queued on it; without one it is written straight away.
+        """
+        if insertion_points is None:
+            insertion_points = self.insertion_points
+        with timer.stage("insert_text"):
+            if text is None:
+                text = PageText(page)
+                self._insert_page_text(page, insertion_points, text)
+                text.commit()
+            else:
+                self._insert_page_text(page, insertion_points, text)
+        timer.count("insertions", len(insertion_points))
+
+    def _insert_page_text(self, page, insertion_points, text):
+        for insertion in insertion_points:
+            original_x, original_y = insertion['position']
+            adjusted_x, adjusted_y = adjust_point_for_rotation(
+                (original_x, original_y),
+                page.rotation,
+                page.rect.height,
+                page.rect.width
+            )
+            rect = adjust_coordinates_for_rotation(
+                insertion_text_rect(insertion), page.rotation, page.rect.height, page.rect.width
+            )
+            font = page_font(page, insertion['font'])  # Font files are embedded once per document
+            size = insertion['size']
+            text.insert_text(
+                (adjusted_x, adjusted_y),
+                insertion['text'],
+                rect,
+                fontsize=size,
+                fontname=font,
+                rotate=page.rotation
+            )
 
-                for area in self.areas:
-                    coordinates = area["coordinates"]
-                    adjusted_coordinates = adjust_coordinates_for_rotation(
-                        coordinates, page.rotation, page.rect.height, page.rect.width
-                    )
-                    rect = fitz.Rect(*adjusted_coordinates)
-                    page.add_redact_annot(rect)
-
-                page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE | 0, graphics=fitz.PDF_REDACT_LINE_ART_NONE | 0)
-
-                for insertion in self.insertion_points:
-                    original_x, original_y = insertion['position']
-                    adjusted_x, adjusted_y = adjust_point_for_rotation(
-                        (original_x, original_y),
-                        page.rotation,
-                        page.rect.height,
-                        page.rect.width
-                    )
-                    text = insertion['text']
-                    font = insertion['font']
-                    size = insertion['size']
-                    page.insert_text(
-                        (adjusted_x, adjusted_y),
-                        text,
-                        fontsize=size,
-                        fontname=font,
-                        rotate=page.rotation
+    def update_revision(self, page, input_pdf_path, timer=NULL_TIMER, text=None):
+        """
+        Adds the next revision row to the revision table and updates the revision box, queuing the
+        text on `text` (a PageText) if given or writing it straight away otherwise.
+        """
+        with timer.stage("find_tables"):
+            tables = page.find_tables(clip=self.table_coordinates, strategy="lines")
+        timer.count("tables_found", len(tables.tables))
+        if not tables.tables:  # Check if the tables list is empty
+            logging.warning(f"No tables found on page {page.number + 1} of {input_pdf_path}.")
+            return
+
+        with timer.stage("revision"):
+            if text is None:
+                text = PageText(page)
+                self._update_revision_rows(page, tables, text)
+                text.commit()
+            else:
+                self._update_revision_rows(page, tables, text)
+
+    def _update_revision_rows(self, page, tables, text):
+        for tab in tables.tables:
+            cell_text = tab.extract()
+            if not cell_text:
+                logging.warning(f"Empty table data on page {page.number + 1}.")
+                continue
+
+            latest_revision_index, last_revision = None, None
+            for row_index, row in enumerate(cell_text):
+                if row[0] and row[0].startswith("P"):
+                    latest_revision_index = row_index
+                    last_revision = row[0]
+                    break
+
+            if latest_revision_index is not None and last_revision is not None:
+                try:
+
+                    # Extract the previous values for columns 4 and 5
+                    previous_col4 = cell_text[latest_revision_index][3] if len(cell_text[latest_revision_index]) > 3 else ""
+                    previous_col5 = cell_text[latest_revision_index][4] if len(cell_text[latest_revision_index]) > 4 else ""
+
+                    # Increment revision number and create new revision row
+                    last_revision_number = int(last_revision[1:])
+                    next_revision = f"P{last_revision_number + 1:02d}"
+                    new_row = [next_revision, self.revision_date, self.revision_description, previous_col4,
+                               previous_col5]
+
+                    # Insert the new row
+                    self.insert_revision_row(text, tab, new_row, latest_revision_index)
+
+                    # Redact and update revision area. Queued text is not on the page yet, so any
+                    # that the redaction would have cleared is written first
+                    if text.intersects(self.rev_coordinates):
+                        text.commit()
+                    page.add_redact_annot(fitz.Rect(*self.rev_coordinates))
+                    page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE, graphics=fitz.PDF_REDACT_LINE_ART_NONE)
+                    text.insert_textbox(
+                        fitz.Rect(*self.rev_coordinates),
+                        next_revision,
+                        fontsize=8,
+                        fontname="helv",
+                        color=(0, 0, 0),
+                        align=1
                     )
-
-                # Revision updater logic: Only run if revision updater is enabled
-                if self.revision_date and self.revision_description:
-                    # Revision updater logic
-                    tables = page.find_tables(clip=self.table_coordinates, strategy="lines")
-                    if not tables.tables:  # Check if the tables list is empty
-                        logging.warning(f"No tables found on page {page.number + 1} of {input_pdf_path}.")
-                        continue
-
-                    if tables.tables:  # Check if there are any tables
-                        for tab in tables.tables:
-                            cell_text = tab.extract()
-                            if not cell_text:
-                                logging.warning(f"Empty table data on page {page.number + 1}.")
-                                continue
-
-                            latest_revision_index, last_revision = None, None
-                            for row_index, row in enumerate(cell_text):
-                                if row[0] and row[0].startswith("P"):
-                                    latest_revision_index = row_index
-                                    last_revision = row[0]
-                                    break
-
-                            if latest_revision_index is not None and last_revision is not None:
-                                try:
-
-                                    # Extract the previous values for columns 4 and 5
-                                    previous_col4 = cell_text[latest_revision_index][3] if len(cell_text[latest_revision_index]) > 3 else ""
-                                    previous_col5 = cell_text[latest_revision_index][4] if len(cell_text[latest_revision_index]) > 4 else ""
-
-                                    # Increment revision number and create new revision row
-                                    last_revision_number = int(last_revision[1:])
-                                    next_revision = f"P{last_revision_number + 1:02d}"
-                                    new_row = [next_revision, self.revision_date, self.revision_description, previous_col4,
-                                               previous_col5]
-
-                                    # Insert the new row
-                                    self.insert_revision_row(page, tab, new_row, latest_revision_index)
-
-                                    # Redact and update revision area
-                                    page.add_redact_annot(fitz.Rect(*self.rev_coordinates))
-                                    page.apply_redactions(images=fitz.PDF_REDACT_IMAGE_NONE, graphics=fitz.PDF_REDACT_LINE_ART_NONE)
-                                    page.insert_textbox(
-                                        fitz.Rect(*self.rev_coordinates),
-                                        next_revision,
-                                        fontsize=8,
-                                        fontname="helv",
-                                        color=(0, 0, 0),
-                                        align=1
-                                    )
-                                except ValueError as e:
-                                    print(f"Revision processing error: {e}")
-
-
-            doc.ez_save(output_pdf_path)
-            if progress_list is not None:
-                progress_list.append(input_pdf_path)
-
-        except Exception as e:
-            logging.error(f"Error processing {input_pdf_path}: {e}")
-            error_files.append(input_pdf_path)  # Add to error list
+                except ValueError as e:
+                    print(f"Revision processing error: {e}")
 
     def get_pdf_files(self):
         """Gathers all PDF files within the specified folder."""
-        pdf_files = []
-        for root_folder, subfolders, files in os.walk(self.pdf_folder):
-            if not self.include_subfolders:
-                subfolders.clear()
-            pdf_files.extend(
-                [os.path.join(root_folder, f) for f in files if f.lower().endswith('.pdf')]
-            )
-        return pdf_files
+        return find_pdf_files(self.pdf_folder, self.include_subfolders)
 
     def get_output_path(self, input_pdf_path):
         """
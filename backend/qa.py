@@ -0,0 +1,291 @@
+# qa.py
+
+"""
+Before/after pixel-diff QA of a batch run.
+
+Every input page and its output page are rendered in greyscale at QA_DPI in a process pool and
+diffed with NumPy. A page is flagged when pixels change outside the regions the template is
+allowed to touch (collateral damage), or when a template area that held text on the input shows
+no change at all. Pages are ranked worst first into an Excel report, with diff thumbnails of
+the worst ones.
+
+    python -m backend.qa <pdf folder> <output folder> --template areas.xlsx [--revision] [--merge rows.csv]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from functools import partial
+
+import numpy as np
+import pymupdf as fitz
+from PIL import Image
+
+from backend.constants import QA_DPI, QA_DIFF_THRESHOLD, QA_MARGIN, QA_MIN_PIXELS, QA_THUMBNAILS
+from backend.data_merge import MergeTable
+from backend.pdf_processor import PDFProcessor, find_pdf_files, insertion_text_rect
+from backend.template_io import load_template
+from backend.utils import project_area_to_page
+
+# Report order, most serious first
+STATUSES = ("error", "missing output", "page count mismatch", "size mismatch", "collateral", "unchanged area", "ok")
+THUMBNAIL_MAX_SIZE = 900  # Long side of a side-by-side diff thumbnail in pixels
+
+
+def file_insertions(template, input_doc, input_pdf_path):
+    """
+    The insertion points as the batch wrote them into this file: with a data merge, the
+    {{column}} placeholders are filled in from the file's row, as PDFProcessor does.
+    """
+    if template.get("data_merge") is None:
+        return template["insertion_points"]
+    processor = PDFProcessor.from_template(template, os.path.dirname(input_pdf_path), "",
+                                           data_merge=template["data_merge"])
+    return processor.resolve_insertions(input_doc, input_pdf_path)
+
+
+def allowed_regions(template, page_width, page_height, insertion_points=None):
+    """
+    Rectangles, in PDF points of the displayed page, that the batch is expected to change.
+    `insertion_points` are the file's resolved insertions (see file_insertions); by default the
+    template's own.
+    """
+    regions = []
+    for area in template["areas"]:
+        projected, _ = project_area_to_page(area["coordinates"], page_width, page_height)
+        if projected:
+            regions.append(projected)
+
+    if insertion_points is None:
+        insertion_points = template["insertion_points"]
+    regions += [insertion_text_rect(point) for point in insertion_points]
+
+    if template.get("revision"):
+        regions += [rect for rect in (template["table_coordinates"], template["rev_coordinates"]) if rect]
+    return regions
+
+
+def _grey_pixels(page, dpi):
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+
+def _pixel_box(rect, scale, shape, margin=0):
+    """Converts a rectangle in points to (row0, row1, col0, col1) array bounds."""
+    x0, y0, x1, y1 = rect
+    height, width = shape
+    return (max(0, math.floor((min(y0, y1) - margin) * scale)), min(height, math.ceil((max(y0, y1) + margin) * scale)),
+            max(0, math.floor((min(x0, x1) - margin) * scale)), min(width, math.ceil((max(x0, x1) + margin) * scale)))
+
+
+def diff_page(input_page, output_page, template, dpi=QA_DPI, threshold=QA_DIFF_THRESHOLD, insertion_points=None):
+    """
+    Compares one input page with its output page; `insertion_points` as for allowed_regions.
+
+    Returns (changed, allowed, unchanged_titles, before, after): boolean arrays of changed pixels
+    and of pixels the template may change, the titles of areas that held text but did not change,
+    and the two greyscale renders.
+    """
+    # The batch removes rotation before applying the template, so compare in the displayed frame
+    input_page.remove_rotation()
+    before = _grey_pixels(input_page, dpi)
+    after = _grey_pixels(output_page, dpi)
+    if before.shape != after.shape:
+        raise ValueError(f"page size changed from {before.shape[::-1]} to {after.shape[::-1]} pixels")
+
+    changed = np.abs(before.astype(np.int16) - after.astype(np.int16)) > threshold
+    scale = dpi / 72
+    allowed = np.zeros(changed.shape, dtype=bool)
+    for rect in allowed_regions(template, input_page.rect.width, input_page.rect.height, insertion_points):
+        row0, row1, col0, col1 = _pixel_box(rect, scale, changed.shape, QA_MARGIN)
+        allowed[row0:row1, col0:col1] = True
+
+    # Only areas that held text are expected to change; redaction leaves images and line art alone
+    unchanged_titles = []
+    for index, area in enumerate(template["areas"]):
+        projected, _ = project_area_to_page(area["coordinates"], input_page.rect.width, input_page.rect.height)
+        if not projected or not input_page.get_text("words", clip=projected):
+            continue
+        row0, row1, col0, col1 = _pixel_box(projected, scale, changed.shape)
+        if not changed[row0:row1, col0:col1].any():
+            unchanged_titles.append(area.get("title") or f"Area {index + 1}")
+
+    return changed, allowed, unchanged_titles, before, after
+
+
+def output_path_for(input_pdf_path, pdf_folder, output_folder):
+    """Where the batch wrote a file's output, mirroring PDFProcessor.get_output_path."""
+    return os.path.join(output_folder, os.path.relpath(input_pdf_path, pdf_folder))
+
+
+def compare_pdf(paths, template, dpi=QA_DPI, threshold=QA_DIFF_THRESHOLD, min_pixels=QA_MIN_PIXELS):
+    """Compares every page of one input/output pair. Runs in pool workers; returns a list of report rows."""
+    input_pdf_path, output_pdf_path = paths
+    row = {"file": input_pdf_path, "output": output_pdf_path, "page": None, "status": "ok",
+           "changed_outside": 0, "changed_outside_pct": 0.0, "unchanged_areas": "", "detail": ""}
+    if not os.path.exists(output_pdf_path):
+        return [dict(row, status="missing output")]
+
+    rows = []
+    try:
+        with fitz.open(input_pdf_path) as input_doc, fitz.open(output_pdf_path) as output_doc:
+            if input_doc.page_count != output_doc.page_count:
+                return [dict(row, status="page count mismatch",
+                             detail=f"{input_doc.page_count} input pages, {output_doc.page_count} output pages")]
+            insertion_points = file_insertions(template, input_doc, input_pdf_path)
+            for page_number in range(input_doc.page_count):
+                page_row = dict(row, page=page_number + 1)
+                try:
+                    changed, allowed, unchanged_titles, _, _ = diff_page(
+                        input_doc[page_number], output_doc[page_number], template, dpi, threshold, insertion_points)
+                except ValueError as e:
+                    rows.append(dict(page_row, status="size mismatch", detail=str(e)))
+                    continue
+                outside = int(np.count_nonzero(changed & ~allowed))
+                page_row["changed_outside"] = outside
+                page_row["changed_outside_pct"] = 100 * outside / changed.size
+                page_row["unchanged_areas"] = ", ".join(unchanged_titles)
+                if outside >= min_pixels:
+                    page_row["status"] = "collateral"
+                elif unchanged_titles:
+                    page_row["status"] = "unchanged area"
+                rows.append(page_row)
+    except Exception as e:
+        return [dict(row, status="error", detail=str(e))]
+    return rows
+
+
+def diff_thumbnail(ranked_row, template, thumbnail_folder, dpi=QA_DPI, threshold=QA_DIFF_THRESHOLD):
+    """
+    Saves the input and output page side by side, with collateral changes in red and allowed
+    changes in green on the output. Runs in pool workers; returns the PNG path or None.
+    """
+    rank, row = ranked_row
+    try:
+        with fitz.open(row["file"]) as input_doc, fitz.open(row["output"]) as output_doc:
+            insertion_points = file_insertions(template, input_doc, row["file"])
+            changed, allowed, _, before, after = diff_page(
+                input_doc[row["page"] - 1], output_doc[row["page"] - 1], template, dpi, threshold, insertion_points)
+        marked = np.repeat(after[:, :, None], 3, axis=2)
+        marked[changed & ~allowed] = (255, 0, 0)
+        marked[changed & allowed] = (0, 170, 0)
+        side_by_side = np.concatenate([np.repeat(before[:, :, None], 3, axis=2), marked], axis=1)
+
+        image = Image.fromarray(side_by_side)
+        image.thumbnail((THUMBNAIL_MAX_SIZE, THUMBNAIL_MAX_SIZE))
+        name = os.path.splitext(os.path.basename(row["file"]))[0]
+        thumbnail_path = os.path.join(thumbnail_folder, f"{rank:04d}_{name}_p{row['page']}.png")
+        image.save(thumbnail_path)
+        return thumbnail_path
+    except Exception as e:
+        print(f"Could not create QA thumbnail for {row['file']} page {row['page']}: {e}")
+        return None
+
+
+def rank_rows(rows):
+    """Sorts report rows worst first: by status, then by the amount of collateral change."""
+    return sorted(rows, key=lambda row: (STATUSES.index(row["status"]), -row["changed_outside"],
+                                         -len(row["unchanged_areas"]), row["file"], row["page"] or 0))
+
+
+def write_report(rows, report_path, thumbnails):
+    """Writes the ranked rows, and the worst pages' thumbnails, to an Excel workbook."""
+    from openpyxl import Workbook
+    from openpyxl.drawing.image import Image as SheetImage
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "QA Report"
+    ws.append(["Rank", "Status", "File", "Page", "Changed Outside (px)", "Changed Outside (%)",
+               "Unchanged Areas", "Detail", "Thumbnail"])
+    for rank, row in enumerate(rows, start=1):
+        ws.append([rank, row["status"], row["file"], row["page"], row["changed_outside"],
+                   round(row["changed_outside_pct"], 4), row["unchanged_areas"], row["detail"],
+                   thumbnails.get(rank, "")])
+    ws.freeze_panes = "A2"
+
+    if thumbnails:
+        ws_worst = wb.create_sheet(title="Worst Pages")
+        sheet_row = 1
+        for rank, thumbnail_path in sorted(thumbnails.items()):
+            row = rows[rank - 1]
+            ws_worst.cell(row=sheet_row, column=1, value=f"#{rank} {row['status']}: {row['file']} page {row['page']}")
+            image = SheetImage(thumbnail_path)
+            ws_worst.add_image(image, f"A{sheet_row + 1}")
+            sheet_row += 2 + math.ceil(image.height / 20)  # Default row height is 20 pixels
+
+    wb.save(report_path)
+
+
+def run_qa(pdf_folder, output_folder, template, report_path, dpi=QA_DPI, include_subfolders=False,
+           processes=None, thumbnails=QA_THUMBNAILS):
+    """
+    Compares every PDF in `pdf_folder` with its output in `output_folder` and writes the report.
+
+    `template` is a dict as returned by load_template, plus "revision": True if the batch ran
+    the revision updater and "data_merge": the MergeTable it used, if any. Returns the ranked
+    report rows.
+    """
+    started = time.perf_counter()
+    pdf_files = sorted(find_pdf_files(pdf_folder, include_subfolders))
+    pairs = [(path, output_path_for(path, pdf_folder, output_folder)) for path in pdf_files]
+    print(f"QA: comparing {len(pairs)} files at {dpi} dpi")
+
+    rows = []
+    # Workers are replaced now and then so an overnight run cannot accumulate MuPDF memory
+    with multiprocessing.Pool(processes, maxtasksperchild=200) as pool:
+        compare = partial(compare_pdf, template=template, dpi=dpi)
+        for done, file_rows in enumerate(pool.imap_unordered(compare, pairs, chunksize=4), start=1):
+            rows.extend(file_rows)
+            if done % 100 == 0:
+                elapsed = time.perf_counter() - started
+                print(f"QA: {done}/{len(pairs)} files, {len(rows) / elapsed:.1f} pages/s")
+
+        rows = rank_rows(rows)
+        worst = [(rank, row) for rank, row in enumerate(rows[:thumbnails], start=1)
+                 if row["status"] in ("collateral", "unchanged area")]
+        thumbnail_paths = {}
+        if worst:
+            thumbnail_folder = os.path.splitext(report_path)[0] + "_thumbnails"
+            os.makedirs(thumbnail_folder, exist_ok=True)
+            render = partial(diff_thumbnail, template=template, thumbnail_folder=thumbnail_folder, dpi=dpi)
+            for (rank, _), thumbnail_path in zip(worst, pool.map(render, worst)):
+                if thumbnail_path:
+                    thumbnail_paths[rank] = thumbnail_path
+
+    write_report(rows, report_path, thumbnail_paths)
+    flagged = sum(row["status"] != "ok" for row in rows)
+    print(f"QA: {len(rows)} pages checked, {flagged} flagged, in {time.perf_counter() - started:.1f} s. "
+          f"Report: {report_path}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pixel-diff QA of batch outputs against their inputs.")
+    parser.add_argument("pdf_folder", help="Folder the batch read from")
+    parser.add_argument("output_folder", help="Folder the batch wrote to")
+    parser.add_argument("--template", required=True, help="Areas workbook exported from the GUI")
+    parser.add_argument("--revision", action="store_true", help="The batch ran the revision updater")
+    parser.add_argument("--merge", help="Data merge CSV or xlsx the batch filled {{column}} placeholders from")
+    parser.add_argument("--merge-key-column", help="Key column of the data merge file (default: the first)")
+    parser.add_argument("--merge-key-area", help="Template area holding the key (default: match file names)")
+    parser.add_argument("--report", default="qa_report.xlsx", help="Excel report to write")
+    parser.add_argument("--dpi", type=int, default=QA_DPI)
+    parser.add_argument("--subfolders", action="store_true", help="Include subfolders")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--thumbnails", type=int, default=QA_THUMBNAILS, help="Worst pages to thumbnail")
+    args = parser.parse_args()
+
+    template = load_template(args.template)
+    template["areas"] = template["areas"] or []
+    template["insertion_points"] = template["insertion_points"] or []
+    template["revision"] = args.revision
+    template["data_merge"] = args.merge and MergeTable.load(args.merge, args.merge_key_column, args.merge_key_area)
+    run_qa(args.pdf_folder, args.output_folder, template, args.report, dpi=args.dpi,
+           include_subfolders=args.subfolders, processes=args.processes, thumbnails=args.thumbnails)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# run_log.py
+
+"""
+One log file per batch run, written by a single listener in the parent process.
+
+Pool workers log through a QueueHandler (configure_worker_logging, run from the pool
+initializer), so they never open the log file themselves. The parent's QueueListener hands the
+records to a buffering handler that writes them to the file in batches. Records carry the PDF
+being processed (`pdf_file`, set with log_context) and the worker's process name.
+"""
+
+import contextlib
+import contextvars
+import logging
+import logging.handlers
+import multiprocessing
+import time
+
+from backend.constants import LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_FORMAT
+
+_current_file = contextvars.ContextVar("pdf_file", default="-")
+
+
+@contextlib.contextmanager
+def log_context(pdf_path):
+    """Tags every record logged inside the block with `pdf_path`."""
+    token = _current_file.set(pdf_path)
+    try:
+        yield
+    finally:
+        _current_file.reset(token)
+
+
+class FileContextFilter(logging.Filter):
+    """Adds `pdf_file` to records that do not have it yet."""
+
+    def filter(self, record):
+        if not hasattr(record, "pdf_file"):
+            record.pdf_file = _current_file.get()
+        return True
+
+
+class BatchingHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also flushes once `interval` seconds have passed since the last flush."""
+
+    def __init__(self, capacity, target, interval=LOG_FLUSH_INTERVAL):
+        super().__init__(capacity, flushLevel=logging.CRITICAL, target=target, flushOnClose=True)
+        self.interval = interval
+        self.last_flush = time.monotonic()
+
+    def shouldFlush(self, record):
+        return super().shouldFlush(record) or time.monotonic() - self.last_flush >= self.interval
+
+    def flush(self):
+        super().flush()
+        self.last_flush = time.monotonic()
+
+
+def configure_worker_logging(log_queue, level=logging.WARNING):
+    """Routes a worker's logging to the run's queue, replacing any handlers inherited from the parent."""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    handler = logging.handlers.QueueHandler(log_queue)
+    handler.addFilter(FileContextFilter())
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+class RunLog:
+    """
+    Owns the log file of one run. While started, the parent's own logging also goes through the
+    queue, so worker and parent records end up in the same file in arrival order.
+    """
+
+    def __init__(self, log_file, batch_size=LOG_BATCH_SIZE):
+        self.log_file = log_file
+        self.queue = multiprocessing.Queue()
+
+        # Appending lets a resumed batch continue the log of the run it resumes
+        self._file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+        self._file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._buffer = BatchingHandler(batch_size, self._file_handler)
+        console = logging.StreamHandler()
+        console.setLevel(logging.WARNING)
+        console.setFormatter(logging.Formatter(LOG_FORMAT))
+        self._listener = logging.handlers.QueueListener(self.queue, self._buffer, console,
+                                                        respect_handler_level=True)
+
+        self._parent_handler = logging.handlers.QueueHandler(self.queue)
+        self._parent_handler.addFilter(FileContextFilter())
+
+    def start(self):
+        self._listener.start()
+        root = logging.getLogger()
+        root.addHandler(self._parent_handler)
+        if root.level > logging.INFO or root.level == logging.NOTSET:
+            root.setLevel(logging.INFO)
+
+    def stop(self):
+        """Writes out everything still queued or buffered and closes the file."""
+        logging.getLogger().removeHandler(self._parent_handler)
+        self._listener.stop()
+        self._buffer.close()
+        self._file_handler.close()
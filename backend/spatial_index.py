@@ -0,0 +1,88 @@
+# spatial_index.py
+
+import math
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index of rectangles, keyed by a stable identity (e.g. an area uid).
+
+    Each rectangle is registered in every grid cell it overlaps, so a point query only has to
+    look at the rectangles registered in the few cells around that point instead of all of them.
+    Coordinates are PDF points, independent of the viewer's zoom.
+    """
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self._cells = {}  # {(cx, cy): set of keys}
+        self._rects = {}  # {key: (x0, y0, x1, y1)} normalised so x0 <= x1 and y0 <= y1
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cx in range(math.floor(x0 / size), math.floor(x1 / size) + 1):
+            for cy in range(math.floor(y0 / size), math.floor(y1 / size) + 1):
+                yield cx, cy
+
+    def insert(self, key, rect):
+        """Adds (or replaces) the rectangle stored under `key`."""
+        if key in self._rects:
+            self.remove(key)
+        x0, y0, x1, y1 = rect
+        rect = (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        self._rects[key] = rect
+        for cell in self._cell_range(*rect):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def update(self, key, rect):
+        """Moves the rectangle stored under `key`; a no-op if it did not change."""
+        x0, y0, x1, y1 = rect
+        if self._rects.get(key) != (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)):
+            self.insert(key, rect)
+
+    def remove(self, key):
+        """Forgets the rectangle stored under `key`, if any."""
+        rect = self._rects.pop(key, None)
+        if rect is None:
+            return
+        for cell in self._cell_range(*rect):
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._rects.clear()
+
+    def _candidates(self, x, y, tolerance):
+        found = set()
+        for cell in self._cell_range(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            found.update(self._cells.get(cell, ()))
+        return found
+
+    def hit(self, x, y):
+        """Returns the keys of all rectangles containing the point."""
+        return [key for key in self._candidates(x, y, 0)
+                if self._rects[key][0] <= x <= self._rects[key][2] and self._rects[key][1] <= y <= self._rects[key][3]]
+
+    def near_edge(self, x, y, tolerance):
+        """Returns the keys of rectangles with an edge within `tolerance` of the point, closest first."""
+        matches = []
+        for key in self._candidates(x, y, tolerance):
+            x0, y0, x1, y1 = self._rects[key]
+            distances = []
+            if y0 - tolerance <= y <= y1 + tolerance:
+                distances += [abs(x - x0), abs(x - x1)]
+            if x0 - tolerance <= x <= x1 + tolerance:
+                distances += [abs(y - y0), abs(y - y1)]
+            distance = min(distances, default=math.inf)
+            if distance <= tolerance:
+                matches.append((distance, key))
+        return [key for _, key in sorted(matches, key=lambda match: match[0])]
+
+    def __contains__(self, key):
+        return key in self._rects
+
+    def __len__(self):
+        return len(self._rects)
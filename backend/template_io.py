@@ -0,0 +1,93 @@
+# template_io.py
+
+# openpyxl (and the numpy it pulls in) takes longer to import than the rest of the GUI, so it
+# is imported on first use rather than at startup.
+
+
+def save_template(path, areas, insertion_points, table_coordinates, rev_coordinates):
+    """Writes deletion areas, insertion points, and table/revision coordinates to an Excel file."""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+
+    # Add Deletion Areas sheet
+    ws_deletion = wb.active
+    ws_deletion.title = "Deletion Areas"
+    ws_deletion.append(["X0", "Y0", "X1", "Y1", "Title"])  # Headers
+    for area in areas:
+        coordinates = area["coordinates"]
+        title = area.get("title", "Untitled")
+        ws_deletion.append(list(coordinates) + [title])
+
+    # Add Insertion Points sheet
+    ws_insertion = wb.create_sheet(title="Insertion Points")
+    ws_insertion.append(["X", "Y", "Text", "Font", "Size"])  # Headers
+    for point in insertion_points:
+        ws_insertion.append([
+            point["position"][0],
+            point["position"][1],
+            point["text"],
+            point["font"],
+            point["size"]
+        ])
+
+    # Add Table and Revision Areas sheet
+    ws_table_revision = wb.create_sheet(title="Table and Revision Areas")
+    ws_table_revision.append(["Type", "X0", "Y0", "X1", "Y1"])  # Headers
+    if table_coordinates:
+        ws_table_revision.append(["Table"] + list(table_coordinates))
+    if rev_coordinates:
+        ws_table_revision.append(["Revision"] + list(rev_coordinates))
+
+    wb.save(path)
+
+
+def load_template(path):
+    """
+    Reads a template written by save_template.
+
+    Returns a dict with "areas", "insertion_points", "table_coordinates" and "rev_coordinates".
+    A section whose sheet is missing (or, for table/revision, blank) is None, so callers can keep
+    what they already have.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path)
+    template = {"areas": None, "insertion_points": None, "table_coordinates": None, "rev_coordinates": None}
+
+    # Read Deletion Areas
+    if "Deletion Areas" in wb.sheetnames:
+        template["areas"] = []
+        for row in wb["Deletion Areas"].iter_rows(min_row=2, values_only=True):  # Skip the header row
+            x0, y0, x1, y1, title = row
+            template["areas"].append({
+                "coordinates": [x0, y0, x1, y1],
+                "title": title
+            })
+
+    # Read Insertion Points
+    if "Insertion Points" in wb.sheetnames:
+        template["insertion_points"] = []
+        for row in wb["Insertion Points"].iter_rows(min_row=2, values_only=True):  # Skip the header row
+            x, y, text, font, size = row
+            template["insertion_points"].append({
+                "position": [x, y],
+                "text": text,
+                "font": font,
+                "size": int(size) if size else 12  # Default size if missing
+            })
+
+    # Read Table and Revision Areas
+    if "Table and Revision Areas" in wb.sheetnames:
+        rows = list(wb["Table and Revision Areas"].iter_rows(min_row=2, values_only=True))  # Skip the header row
+        if not rows:
+            print("Table and Revision Areas sheet is blank. Skipping update.")
+        for row in rows:
+            if any(row):  # Skip empty rows
+                area_type, x0, y0, x1, y1 = row
+                if area_type == "Table":
+                    template["table_coordinates"] = [x0, y0, x1, y1]
+                elif area_type == "Revision":
+                    template["rev_coordinates"] = [x0, y0, x1, y1]
+
+    return template
@@ -0,0 +1,143 @@
+# thumbnail_cache.py
+
+import hashlib
+import multiprocessing
+import os
+import queue
+import threading
+from functools import partial
+
+import pymupdf as fitz
+
+from backend.constants import THUMBNAIL_SIZE, THUMBNAIL_CACHE_DIR, THUMBNAIL_CACHE_BYTES
+
+
+def thumbnail_name(pdf_path):
+    """
+    Returns the cache file name for a PDF, derived from its absolute path, mtime and size.
+    An edited or replaced file therefore gets a new name and its stale thumbnail is never shown.
+    """
+    stat = os.stat(pdf_path)
+    key = f"{os.path.abspath(pdf_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".png"
+
+
+def prune_cache(cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_BYTES, keep=()):
+    """
+    Deletes the oldest files (by mtime) until the cache folder is within `max_bytes`. Every edit
+    of a PDF gives it a new thumbnail name, so without this the folder only ever grows. Names in
+    `keep`, e.g. the thumbnails of the folder being shown, are deleted last. Returns the number
+    of files deleted.
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((entry.name in keep, stat.st_mtime, stat.st_size, entry.path))
+            except OSError:
+                continue
+    total = sum(size for _, _, size, _ in entries)
+    deleted = 0
+    for _, _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        deleted += 1
+    return deleted
+
+
+def cached_thumbnails(pdf_paths, cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_CACHE_BYTES):
+    """
+    Splits `pdf_paths` into ({pdf_path: thumbnail_path} already on disk, [paths still to render]),
+    first pruning the cache to `max_bytes`, sparing these files' thumbnails where it can. The cache
+    folder is listed once, so checking thousands of files costs one stat per file.
+    """
+    names = {}
+    for pdf_path in pdf_paths:
+        try:
+            names[pdf_path] = thumbnail_name(pdf_path)
+        except OSError:
+            continue  # Vanished since the folder was listed
+    if prune_cache(cache_dir, max_bytes, keep=set(names.values())):
+        print(f"Thumbnails: pruned the cache to {max_bytes // 2 ** 20} MB")
+    existing = set(os.listdir(cache_dir)) if os.path.isdir(cache_dir) else set()
+    cached, missing = {}, []
+    for pdf_path, name in names.items():
+        if name in existing:
+            cached[pdf_path] = os.path.join(cache_dir, name)
+        else:
+            missing.append(pdf_path)
+    return cached, missing
+
+
+def generate_thumbnail(job, cache_dir=THUMBNAIL_CACHE_DIR):
+    """
+    Renders the first page of a PDF into the cache. `job` is (slot, pdf_path), the slot being
+    whatever the caller uses to place the thumbnail. Runs in pool workers; returns (slot, png or None).
+    """
+    slot, pdf_path = job
+    try:
+        thumbnail_path = os.path.join(cache_dir, thumbnail_name(pdf_path))
+        with fitz.open(pdf_path) as doc:
+            page = doc[0]
+            scale = THUMBNAIL_SIZE / max(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), annots=False)
+        # Write under a temporary name so a half-written PNG is never picked up as cached
+        temp_path = f"{thumbnail_path}.{os.getpid()}.tmp"
+        pix.save(temp_path, output="png")
+        os.replace(temp_path, thumbnail_path)
+        return slot, thumbnail_path
+    except Exception as e:
+        print(f"Could not create thumbnail for {pdf_path}: {e}")
+        return slot, None
+
+
+class ThumbnailGenerator:
+    """
+    Renders missing thumbnails in a process pool without blocking the caller.
+
+    `jobs` are (slot, pdf_path) pairs. They are handed out in the order given, and a feeder
+    thread posts (slot, thumbnail_path) to `results` as each finishes, so one slow file does not
+    hold back the rest; the slot says where the thumbnail belongs.
+    """
+
+    def __init__(self, jobs, cache_dir=THUMBNAIL_CACHE_DIR, processes=None):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.jobs = list(jobs)
+        self.cache_dir = cache_dir
+        # Leave one core for the GUI
+        self.processes = processes or max(1, multiprocessing.cpu_count() - 1)
+        self.results = queue.Queue()
+        self.pool = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _run(self):
+        self.pool = multiprocessing.Pool(self.processes)
+        try:
+            generate = partial(generate_thumbnail, cache_dir=self.cache_dir)
+            for result in self.pool.imap_unordered(generate, self.jobs, chunksize=4):
+                if self._stopped:
+                    break
+                self.results.put(result)
+        except Exception as e:
+            print(f"Thumbnail generation stopped: {e}")
+        finally:
+            self.pool.terminate()
+            self.results.put(None)  # Sentinel: nothing more will arrive
+
+    def stop(self):
+        """Abandons the remaining work, e.g. when another folder is selected; the pool is
+        terminated by the feeder thread as soon as the next result comes back."""
+        self._stopped = True
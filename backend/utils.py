@@ -2,133 +2,9 @@
 
 from CTkToolTip import *
 from backend.constants import *
-import tkinter as tk
-from tkinter import ttk
-import customtkinter as ctk
-
-class EditableTreeview(ttk.Treeview):
-    def __init__(self, root_window, parent, *args, **kwargs):
-        super().__init__(parent, *args, **kwargs)
-        self.root_window = root_window
-
-        # Class code here
-
-        self._entry = None
-        self._col = None
-
-        # Other initialization code for your EditableTreeview
-        # Bind right-click to show context menu
-        self.bind("<Button-3>", self.show_context_menu)
-        self.bind("<Double-Button-1>", self.on_double_click)
-
-        # Create context menu
-        self.context_menu = tk.Menu(self, tearoff=0)
-        self.context_menu.add_command(label="Remove Row", command=self.remove_row)
-
-    def on_double_click(self, event):
-        item = self.focus()
-        col = self.identify_column(event.x)
-        if item and col and col != "#0":
-            self._col = col
-            cell_values = self.item(item, "values")
-            if cell_values:
-                col_index = int(col.split("#")[-1]) - 1
-                cell_value = cell_values[col_index]
-                self.edit_cell(item, col, cell_value)
-
-    def show_context_menu(self, event):
-        item = self.identify_row(event.y)
-        if item:
-            self.context_menu.post(event.x_root, event.y_root)
-
-    def remove_row(self):
-        item = self.focus()
-        if item:
-            # Locate the index of the rectangle to remove
-            rectangle_index = self.index(item)  # Simplified lookup based on Treeview row
-
-            # Remove the rectangle from both Treeview and canvas
-            self.root_window.pdf_viewer.canvas.delete(self.root_window.pdf_viewer.rectangle_list[rectangle_index])
-            del self.root_window.pdf_viewer.areas[rectangle_index]
-            del self.root_window.pdf_viewer.rectangle_list[rectangle_index]
-
-            # Remove from Treeview and update display
-            self.delete(item)
-            self.root_window.update_areas_treeview()
-            self.root_window.pdf_viewer.update_rectangles()
-
-            print("Removed rectangle and updated canvas.")
-
-    def edit_cell(self, item, col, _):
-        def on_ok():
-            new_value = entry_var.get()
-            if new_value:
-                current_values = list(self.item(item, "values"))
-                current_values[col_index] = new_value
-                self.item(item, values=tuple(current_values))
-                self.update_areas_list()  # Update areas list when cell is edited
-            top.destroy()
-
-        bbox = self.bbox(item, col)
-        x, y, _, _ = bbox
-        col_index = int(col.replace("#", "")) - 1  # Subtract 1 for 0-based indexing
-
-        # Create the top-level window without specifying a parent
-        top = ctk.CTkToplevel()
-        top.title("Edit Cell")
-
-        entry_var = ctk.StringVar()
-        entry_var.set(self.item(item, "values")[col_index])
-
-        entry = ctk.CTkEntry(top, justify="center", textvariable=entry_var,
-                             width=100, height=20, font=(BUTTON_FONT, 9),
-                             border_width=1, corner_radius=3)
-
-        entry.pack(pady=5)
-
-        ok_button = ctk.CTkButton(top, text="OK", command=on_ok)
-        ok_button.pack()
-
-        top.geometry(f"+{x}+{y}")
-        top.grab_set()  # Make the pop-up modal
-
-        entry.focus_set()
-        top.wait_window(top)  # Wait for the window to be closed
-
-    def on_focus_out(self, _event):
-        if self._entry is not None:
-            self.stop_editing()
-
-    def stop_editing(self, event=None):
-        if self._entry is not None:
-            new_value = self._entry.get()
-            item = self.focus()
-
-            if event and getattr(event, "keysym", "") == "Return" and item:
-                current_values = self.item(item, "values")
-                updated_values = [new_value if i == 0 else val for i, val in enumerate(current_values)]
-                self.item(item, values=updated_values)
-                self.update_areas_list()  # Update areas list when cell is edited
-
-            self._entry.destroy()
-            self._entry = None
-            self._col = None
-
-    def update_areas_list(self):
-        """Updates the areas in the main application when a Treeview cell is edited."""
-        updated_areas = []
-        for row_id in self.get_children():
-            values = self.item(row_id, "values")
-            title, x0, y0, x1, y1 = values
-            updated_areas.append({
-                "title": title,
-                "coordinates": [float(x0), float(y0), float(x1), float(y1)]
-            })
-
-        # Access pdf_viewer through main_app, not root_window
-        self.root_window.pdf_viewer.areas = updated_areas
-        self.root_window.pdf_viewer.update_rectangles()  # Refresh rectangles on the canvas
-
+import os
+import subprocess
+import sys
 
 def create_tooltip(widget, message,
                    delay=0.3,
@@ -147,6 +23,19 @@ def create_tooltip(widget, message,
                       message=message)
 
 
+def open_path(path):
+    """Opens a file or folder with the system's default application (os.startfile is Windows-only)."""
+    try:
+        if sys.platform == "win32":
+            os.startfile(path)
+        elif sys.platform == "darwin":
+            subprocess.Popen(["open", path])
+        else:
+            subprocess.Popen(["xdg-open", path])
+    except OSError as e:
+        print(f"Could not open {path}: {e}")
+
+
 def adjust_coordinates_for_rotation(coordinates, rotation, pdf_height, pdf_width):
     """
     Adjusts the given coordinates based on the rotation of a PDF page.
@@ -204,3 +93,28 @@ def adjust_point_for_rotation(point, rotation, pdf_height, pdf_width):
     else:
         raise ValueError("Invalid rotation angle. Must be 0, 90, 180, or 270 degrees.")
 
+
+def project_area_to_page(coordinates, page_width, page_height):
+    """
+    Places template coordinates on a page the way process_single_pdf applies them.
+
+    The batch calls page.remove_rotation() before applying areas, so a template is expressed in
+    each sheet's displayed frame: (page_width, page_height) must be the size after rotation,
+    i.e. page.rect of the rotated page.
+
+    Args:
+        coordinates (list): The template coordinates [x0, y0, x1, y1].
+        page_width (float): The displayed width of the page.
+        page_height (float): The displayed height of the page.
+
+    Returns:
+        tuple: The part of the area that lies on the sheet and whether it was cut off,
+        or (None, True) if the area misses the sheet entirely.
+    """
+    x0, y0, x1, y1 = coordinates
+    clipped = [max(0, min(x0, x1)), max(0, min(y0, y1)),
+               min(page_width, max(x0, x1)), min(page_height, max(y0, y1))]
+    if clipped[0] >= clipped[2] or clipped[1] >= clipped[3]:
+        return None, True
+    cut_off = clipped != [min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1)]
+    return clipped, cut_off
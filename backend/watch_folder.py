@@ -0,0 +1,307 @@
+# watch_folder.py
+
+"""
+Watch-folder daemon: processes PDFs as they are dropped into a folder.
+
+FolderWatcher polls the folder without listing the whole tree each time. A directory is only
+listed again when its mtime moves, which happens when files are added, removed or renamed in it.
+Files overwritten in place do not touch their directory, so they are caught by a full listing
+every WATCH_FULL_SCAN seconds. A new or changed file is handed out once its size and mtime have
+stayed the same for WATCH_SETTLE seconds, so files still being copied are left alone. A file
+whose end has no %%EOF marker yet is given ten times as long, in case the copy has only stalled.
+
+WatchDaemon keeps one pool warm for the whole run; its workers get the processor once through
+the pool initializer, as in BatchRunner, and are recycled every WATCH_MAX_TASKS_PER_CHILD files.
+When the template workbook changes, the processor is rebuilt and the pool restarted. Every
+result is appended to the manifest along with the size and mtime of the version processed, so
+after a restart only files that are new or changed since then are processed.
+
+    python -m backend.watch_folder <watch folder> <output folder> --template areas.xlsx
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from backend.batch_runner import BatchStats, make_pool, run_file
+from backend.constants import (COLLECT_METRICS, WATCH_FULL_SCAN, WATCH_MAX_TASKS_PER_CHILD, WATCH_POLL,
+                               WATCH_SETTLE)
+from backend.metrics import append_record, write_metrics
+from backend.run_log import RunLog
+from backend.work_queue import read_manifest
+
+
+def _signature(stat_result):
+    return stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _looks_complete(pdf_path):
+    """True if the file ends with a PDF end-of-file marker, as a fully written PDF does."""
+    try:
+        with open(pdf_path, "rb") as f:
+            f.seek(max(0, os.path.getsize(pdf_path) - 1024))
+            return b"%%EOF" in f.read()
+    except OSError:
+        return False
+
+
+class FolderWatcher:
+    """Finds PDFs under `folder` that are new or changed and have finished arriving."""
+
+    def __init__(self, folder, include_subfolders, known=None, settle=WATCH_SETTLE, full_scan=WATCH_FULL_SCAN):
+        self.folder = folder
+        self.include_subfolders = include_subfolders
+        self.settle = settle
+        self.full_scan = full_scan
+        self.files = dict(known or {})  # {pdf path: (size, mtime_ns)} of the version last handed out
+        self.directories = {}  # {directory: mtime_ns when it was last listed}
+        self.unsettled = {}  # {pdf path: ((size, mtime_ns), time it was first seen like that)}
+        self.last_full_scan = None
+
+    def poll(self, now=None):
+        """Lists the directories that changed; returns [(pdf path, (size, mtime_ns))] of files ready to process."""
+        now = now or time.time()
+        full = self.last_full_scan is None or now - self.last_full_scan >= self.full_scan
+        if full:
+            self.last_full_scan = now
+
+        pending = list(self.directories) or [self.folder]
+        while pending:
+            directory = pending.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:  # Removed; forget it and what was in it
+                self._forget(directory)
+                continue
+            # A directory changed within the last moment may change again inside the same mtime tick
+            recently_changed = now - mtime / 1e9 < self.settle
+            if not full and self.directories.get(directory) == mtime and not recently_changed:
+                continue
+            self.directories[directory] = mtime
+            pending += self._list(directory, now)
+
+        return self._settled(now)
+
+    def _list(self, directory, now):
+        """Notes new or changed PDFs in `directory`; returns subdirectories not listed before."""
+        new_directories = []
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return new_directories
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if self.include_subfolders and entry.path not in self.directories:
+                        new_directories.append(entry.path)
+                elif entry.name.lower().endswith(".pdf"):
+                    signature = _signature(entry.stat())
+                    if self.files.get(entry.path) != signature and entry.path not in self.unsettled:
+                        self.unsettled[entry.path] = (signature, now)
+            except OSError:  # Gone between the listing and the stat
+                continue
+        return new_directories
+
+    def _settled(self, now):
+        ready = []
+        for pdf_path, (signature, since) in list(self.unsettled.items()):
+            try:
+                current = _signature(os.stat(pdf_path))
+            except OSError:
+                del self.unsettled[pdf_path]
+                continue
+            if current != signature:
+                self.unsettled[pdf_path] = (current, now)  # Still being written
+            elif now - since >= self.settle * 10 or (now - since >= self.settle and _looks_complete(pdf_path)):
+                del self.unsettled[pdf_path]
+                self.files[pdf_path] = signature
+                ready.append((pdf_path, signature))
+        return ready
+
+    def _forget(self, directory):
+        prefix = directory.rstrip(os.sep) + os.sep
+        for path in [path for path in self.directories if path == directory or path.startswith(prefix)]:
+            del self.directories[path]
+        for table in (self.files, self.unsettled):
+            for path in [path for path in table if path.startswith(prefix)]:
+                del table[path]
+
+
+class WatchDaemon:
+    """
+    Processes the PDFs a FolderWatcher reports in a warm pool until stop() is called.
+
+    Results are appended to the manifest and applied to `stats` as they come in; a file that
+    changes again while it is being processed is processed again once it settles.
+    """
+
+    def __init__(self, template_file, watch_folder, output_folder, manifest_file=None, processes=None,
+                 poll=WATCH_POLL, settle=WATCH_SETTLE, **options):
+        watch_folder, output_folder = os.path.abspath(watch_folder), os.path.abspath(output_folder)
+        if os.path.commonpath([watch_folder, output_folder]) == watch_folder:
+            raise ValueError("The output folder must not be inside the watched folder")
+        self.template_file = template_file
+        self.watch_folder = watch_folder
+        self.output_folder = output_folder
+        self.manifest_file = manifest_file or os.path.join(output_folder, "watch_manifest.jsonl")
+        self.processes = processes or multiprocessing.cpu_count()
+        self.poll = poll
+        self.options = {"include_subfolders": True, "collect_metrics": COLLECT_METRICS, **options}
+
+        os.makedirs(output_folder, exist_ok=True)
+        known = {path: (record["source_size"], record["source_mtime_ns"])
+                 for path, record in read_manifest(self.manifest_file).items() if "source_size" in record}
+        self.watcher = FolderWatcher(watch_folder, self.options["include_subfolders"], known, settle=settle)
+        self.stats = BatchStats(0, self.processes)
+        self.in_flight = {}  # {pdf path: (size, mtime_ns) being processed}
+        self.deferred = {}  # {pdf path: (size, mtime_ns)} ready, waiting for an earlier version to finish
+        self.results = queue.Queue()  # (pdf path, signature, time it was handed out, record) from the pool
+        self.processor = None
+        self.template_mtime = None
+        self._pool = None
+        self._events = multiprocessing.Queue()
+        self._cancelled = multiprocessing.Event()  # Never set; BatchRunner's workers expect one
+        self._stop = threading.Event()
+        self._run_log = None
+
+    def stop(self):
+        self._stop.set()
+
+    def _load_template(self):
+        """(Re)builds the processor if the template workbook changed; returns True if it did."""
+        mtime = os.path.getmtime(self.template_file)
+        if mtime == self.template_mtime:
+            return False
+        from backend.pdf_processor import PDFProcessor
+
+        processor = PDFProcessor.from_template(self.template_file, self.watch_folder, self.output_folder,
+                                               **self.options)
+        if self.processor is None:
+            processor.setup_logging()
+        else:
+            processor.log_file, processor.metrics_file = self.processor.log_file, self.processor.metrics_file
+        self.processor, self.template_mtime = processor, mtime
+        return True
+
+    def _start_pool(self):
+        # Ctrl+C stops the daemon, which lets the workers finish their files; they must not die with it
+        self._pool = make_pool(self.processor, self.processes, self._events, self._run_log.queue, self._cancelled,
+                               ignore_interrupt=True, maxtasksperchild=WATCH_MAX_TASKS_PER_CHILD)
+
+    def _stop_pool(self):
+        """Lets the files handed out finish, then closes the pool."""
+        self._pool.close()
+        self._pool.join()
+        self._collect()
+
+    def _submit(self, pdf_path, signature):
+        self.in_flight[pdf_path] = signature
+        self.stats.total_files += 1
+        handed_out = time.time()
+        self._pool.apply_async(
+            run_file, (pdf_path,),
+            callback=lambda record: self.results.put((pdf_path, signature, handed_out, record)),
+            error_callback=lambda error: self.results.put(
+                (pdf_path, signature, handed_out, {"file": pdf_path, "status": "error", "pages": 0, "error": str(error)})))
+
+    def _collect(self):
+        """Records the results that came back and applies the workers' events to `stats`."""
+        while True:
+            try:
+                self.stats.apply(self._events.get_nowait())
+            except queue.Empty:
+                break
+        while True:
+            try:
+                pdf_path, signature, handed_out, record = self.results.get_nowait()
+            except queue.Empty:
+                break
+            finished = time.time()
+            del self.in_flight[pdf_path]
+            record.update(source_size=signature[0], source_mtime_ns=signature[1],
+                          processed=finished, seconds=round(finished - handed_out, 3))
+            append_record(self.manifest_file, record)
+            if self.processor.metrics_file and "total_ms" in record:
+                write_metrics(self.processor.metrics_file, record)
+            self.stats.apply(("done", record, finished))
+            log = logging.info if record.get("status") == "ok" else logging.error
+            log(f"Processed {pdf_path}: {record.get('status')}, {record.get('pages', 0)} pages "
+                f"in {finished - handed_out:.1f} s")
+
+    def _reload_template(self):
+        """Restarts the pool with the new processor when the template has changed."""
+        try:
+            changed = self._load_template()
+        except Exception as e:  # E.g. caught half-saved; the current template stays in use
+            logging.warning(f"Could not load template {self.template_file}: {e}")
+            return
+        if changed:
+            logging.info(f"Template {self.template_file} changed; restarting the pool")
+            self._stop_pool()
+            self._start_pool()
+
+    def run(self):
+        """Watches and processes until stop() is called; files being processed are finished first."""
+        self._load_template()
+        self._run_log = RunLog(self.processor.log_file)
+        self._run_log.start()
+        try:
+            self._start_pool()
+            logging.info(f"Watching {self.watch_folder} with {self.processes} workers; "
+                         f"{len(self.watcher.files)} files already in {self.manifest_file}")
+            while not self._stop.is_set():
+                self._reload_template()
+                self.deferred.update(self.watcher.poll())
+                for pdf_path in [path for path in self.deferred if path not in self.in_flight]:
+                    self._submit(pdf_path, self.deferred.pop(pdf_path))
+                self._collect()
+                self._stop.wait(self.poll)
+            # Files still waiting are not in the manifest, so the next run picks them up
+            self._stop_pool()
+        finally:
+            if self._pool is not None:
+                self._pool.terminate()
+            self._run_log.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process PDFs as they arrive in a folder.")
+    parser.add_argument("watch_folder", help="Folder the drawings are dropped into")
+    parser.add_argument("output_folder", help="Folder for the outputs and the manifest, outside the watched one")
+    parser.add_argument("--template", required=True, help="Areas workbook exported from the GUI; edits are picked up")
+    parser.add_argument("--top-only", action="store_true", help="Ignore subfolders of the watched folder")
+    parser.add_argument("--revision-date", default="", help="Run the revision updater with this date")
+    parser.add_argument("--revision-description", default="")
+    parser.add_argument("--verify", action="store_true", help="Verify each output after saving")
+    parser.add_argument("--manifest", help="Results file (default: in the output folder)")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--status-every", type=float, default=60, help="Seconds between status lines")
+    args = parser.parse_args()
+
+    daemon = WatchDaemon(args.template, args.watch_folder, args.output_folder, args.manifest, args.processes,
+                         include_subfolders=not args.top_only, revision_date=args.revision_date,
+                         revision_description=args.revision_description, verify_output=args.verify)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    print(f"Watching {daemon.watch_folder}; press Ctrl+C to stop")
+    reported = None
+    try:
+        while thread.is_alive():
+            thread.join(args.status_every)
+            stats = daemon.stats
+            if stats.done_files != reported:
+                reported = stats.done_files
+                print(f"{stats.done_files} files processed ({len(stats.error_files)} errors), "
+                      f"{len(daemon.in_flight)} in progress, {len(daemon.watcher.unsettled)} arriving")
+    except KeyboardInterrupt:
+        print("Stopping once the files in progress are done...")
+        daemon.stop()
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
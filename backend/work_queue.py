@@ -0,0 +1,489 @@
+# work_queue.py
+
+"""
+Coordinator/worker mode: one coordinator hands out files to any number of worker processes, on
+this machine or on others that see the files at the same paths (e.g. the same mapped drive).
+
+The coordinator owns the job list, the manifest and the results. Workers connect over TCP and
+send JSON lines, each answered by one JSON line:
+
+    {"op": "hello", "name", "token"}      -> {"worker", "processor": spec, "heartbeat"}
+    {"op": "next", "worker"}              -> {"job": pdf path} | {"wait": seconds} | {"done": true}
+    {"op": "heartbeat", "worker"}         -> {"ok": true}
+    {"op": "result", "worker", "record"}  -> {"ok": true}
+
+A request that is not of this shape is answered with {"error": ...}; a malformed result puts the
+worker's file straight back in the queue rather than waiting for its lease to time out.
+
+A worker takes one file at a time and heartbeats from a second connection while it works. A
+worker not heard from for WORK_LEASE_TIMEOUT seconds is presumed lost and its file goes back to
+the front of the queue; a file that has lost WORK_MAX_ATTEMPTS workers is recorded as an error
+instead. If a lost worker turns out to be alive, its result is still taken while its file waits
+in the queue, and ignored once the file has been handed to another worker or finished. Outputs
+are saved to a temporary file and renamed into place, so two workers on the same file never
+leave a mixed output.
+
+Every result is appended to the manifest (JSON lines). Files already recorded "ok" there are
+skipped, so a coordinator restarted on the same manifest resumes where the last one stopped.
+
+The hello reply describes the processor as plain JSON, the template and the processing options,
+and each worker builds its own with PDFProcessor.from_template; nothing a worker receives is
+unpickled or run. The token keeps other clients from taking jobs. It travels in clear text, so
+the coordinator listens on 127.0.0.1 unless --host names an interface the workers can reach.
+
+    python -m backend.work_queue coordinator <pdf folder> <output folder> --template areas.xlsx
+    python -m backend.work_queue worker <host>:<port> --token <token> [--processes N]
+"""
+
+import argparse
+import collections
+import hmac
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import threading
+import time
+
+from backend.batch_runner import BatchStats
+from backend.constants import (LOG_FORMAT, WORK_HEARTBEAT, WORK_LEASE_TIMEOUT, WORK_MAX_ATTEMPTS,
+                               WORK_QUEUE_PORT)
+from backend.metrics import append_record, write_metrics
+from backend.run_log import FileContextFilter, RunLog
+
+
+def _processor_spec(processor):
+    """The template and options of `processor` as JSON-safe values; _processor_from_spec rebuilds it."""
+    merge = processor.data_merge
+    return {
+        "template": {"areas": processor.areas, "insertion_points": processor.insertion_points,
+                     "table_coordinates": processor.table_coordinates, "rev_coordinates": processor.rev_coordinates},
+        "pdf_folder": processor.pdf_folder,
+        "output_folder": processor.output_excel_path,
+        "options": {"include_subfolders": processor.include_subfolders,
+                    "revision_date": processor.revision_date, "revision_description": processor.revision_description,
+                    "verify_output": processor.verify_output, "collect_metrics": processor.collect_metrics,
+                    "subset_fonts": processor.subset_fonts},
+        "data_merge": merge and {"columns": merge.columns, "rows": list(merge.rows.values()),
+                                 "key_column": merge.key_column, "key_area": merge.key_area, "source": merge.source},
+    }
+
+
+def _processor_from_spec(spec):
+    """A PDFProcessor built from a _processor_spec received from the coordinator."""
+    from backend.data_merge import MergeTable
+    from backend.pdf_processor import PDFProcessor
+
+    merge = spec.get("data_merge")
+    if merge:
+        merge = MergeTable(merge["columns"], merge["rows"], merge["key_column"], merge["key_area"],
+                           tuple(merge["source"]) if merge["source"] else None)
+    return PDFProcessor.from_template(spec["template"], spec["pdf_folder"], spec["output_folder"],
+                                      data_merge=merge, **spec["options"])
+
+
+def read_manifest(manifest_file):
+    """{pdf path: record} of the results in a manifest; the last record of a file wins."""
+    records = {}
+    if not os.path.exists(manifest_file):
+        return records
+    with open(manifest_file, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:  # Blank, or cut short when a coordinator was killed mid-write
+                continue
+            records[record["file"]] = record
+    return records
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if not isinstance(message, dict):
+                reply = {"error": "bad request"}
+            else:
+                try:
+                    reply = self.server.coordinator.handle(message)
+                except Exception as e:  # Keep the connection, and the worker's lease, alive
+                    logging.error(f"Could not answer {message.get('op')!r} from {self.client_address[0]}: {e}")
+                    reply = {"error": "internal error"}
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class Coordinator:
+    """
+    Serves the files of one batch to work queue workers and collects their results.
+
+    Like BatchRunner it posts "start", "done" and "finished" events (plus "lost" when a worker
+    drops out), keyed by worker id instead of pid; drain() applies them to `stats`.
+    """
+
+    def __init__(self, processor, pdf_files, manifest_file, host="127.0.0.1", port=WORK_QUEUE_PORT, token=None,
+                 heartbeat=WORK_HEARTBEAT, lease_timeout=WORK_LEASE_TIMEOUT, max_attempts=WORK_MAX_ATTEMPTS):
+        self.processor = processor
+        self.manifest_file = manifest_file
+        self.token = token or secrets.token_urlsafe(16)
+        self.heartbeat = heartbeat
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_file)), exist_ok=True)
+        self.pdf_files = list(pdf_files)
+        self._batch = set(self.pdf_files)
+        self.results = {path: record for path, record in read_manifest(manifest_file).items()
+                        if record.get("status") == "ok"}  # Done by an earlier run on this manifest
+        self.skipped = sum(path in self.results for path in self.pdf_files)
+        self.pending = collections.deque(path for path in self.pdf_files if path not in self.results)
+        self.leases = {}  # {pdf path: worker id} of files being processed
+        self.attempts = collections.Counter()
+        self.workers = {}  # {worker id: {"last_seen", "job", "lost"}}
+        self.lost_workers = 0
+
+        self.events = queue.Queue()
+        self.stats = BatchStats(len(self.pending), 0)
+        self.finished = threading.Event()
+        self._lock = threading.Lock()
+        self._worker_numbers = itertools.count(1)
+        self._spec = _processor_spec(processor)
+
+        self.server = _Server((host, port), _Handler)
+        self.server.coordinator = self
+        self._threads = [threading.Thread(target=self.server.serve_forever, daemon=True),
+                         threading.Thread(target=self._reap, daemon=True)]
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    @property
+    def live_workers(self):
+        return sum(not state["lost"] for state in self.workers.values())
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        if not self.pending:
+            self._finish_run(time.time())
+
+    def join(self, timeout=None):
+        """Waits until every file has a result; returns True if they all have."""
+        return self.finished.wait(timeout)
+
+    def stop(self, grace=None):
+        """Keeps answering for `grace` seconds (by default a heartbeat) so waiting workers hear "done", then closes."""
+        time.sleep(self.heartbeat if grace is None else grace)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def drain(self):
+        """Applies all pending events to `stats`; returns True once the batch has finished."""
+        self.stats.processes = self.live_workers
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.stats.apply(event)
+        return self.stats.finished
+
+    def handle(self, message):
+        """Answers one request from a worker."""
+        now = time.time()
+        op = message.get("op")
+        with self._lock:
+            if op == "hello":
+                if not hmac.compare_digest(str(message.get("token", "")).encode("utf-8"), self.token.encode("utf-8")):
+                    logging.warning(f"Refused worker {message.get('name')}: wrong token")
+                    return {"error": "wrong token"}
+                worker = f"{message.get('name', 'worker')}#{next(self._worker_numbers)}"
+                self.workers[worker] = {"last_seen": now, "job": None, "lost": False}
+                logging.info(f"Worker {worker} joined")
+                return {"worker": worker, "processor": self._spec, "heartbeat": self.heartbeat}
+
+            worker = message.get("worker")
+            state = self.workers.get(worker) if isinstance(worker, str) else None
+            if state is None:
+                return {"error": "unknown worker"}
+            if state["lost"]:
+                state["lost"] = False
+                logging.warning(f"Worker {worker} is responding again")
+            state["last_seen"] = now
+
+            if op == "heartbeat":
+                return {"ok": True}
+            if op == "next":
+                return self._next_job(worker, now)
+            if op == "result":
+                record = message.get("record")
+                if not self._valid_record(record):
+                    # The worker's file would otherwise wait for the lease to time out
+                    self._release(worker, now, "sent a malformed result")
+                    return {"error": "malformed result"}
+                self._take_result(worker, record, now)
+                return {"ok": True}
+            return {"error": f"unknown op {op!r}"}
+
+    def _next_job(self, worker, now):
+        if self.pending:
+            pdf_path = self.pending.popleft()
+            self.leases[pdf_path] = worker
+            self.attempts[pdf_path] += 1
+            self.workers[worker]["job"] = pdf_path
+            self.events.put(("start", worker, pdf_path, now))
+            return {"job": pdf_path}
+        if self.leases:  # Files out with other workers may still come back to the queue
+            return {"wait": self.heartbeat}
+        return {"done": True}
+
+    def _valid_record(self, record):
+        """True if `record` has the shape of a result record for a file of this batch."""
+        return (isinstance(record, dict) and isinstance(record.get("file"), str) and record["file"] in self._batch
+                and isinstance(record.get("status"), str) and isinstance(record.get("pages", 0), int))
+
+    def _release(self, worker, now, reason):
+        """Puts the file leased to `worker` back at the front of the queue straight away."""
+        state = self.workers[worker]
+        pdf_path, state["job"] = state["job"], None
+        logging.warning(f"Worker {worker} {reason}")
+        if pdf_path is None or self.leases.get(pdf_path) != worker:
+            return
+        del self.leases[pdf_path]
+        self.pending.appendleft(pdf_path)
+        self.events.put(("lost", worker, now))  # Clears the file from the worker's line in `stats`
+        logging.warning(f"Re-queued {pdf_path} (attempt {self.attempts[pdf_path]} was on {worker})")
+
+    def _take_result(self, worker, record, now):
+        pdf_path = record["file"]
+        if self.workers[worker]["job"] == pdf_path:
+            self.workers[worker]["job"] = None
+        if pdf_path in self.results or self.finished.is_set():
+            logging.info(f"Ignored a second result for {pdf_path} from {worker}")
+            return
+        if self.leases.get(pdf_path, worker) != worker:  # Reassigned after this worker was presumed lost
+            logging.info(f"Ignored a late result for {pdf_path} from {worker}; it is now with {self.leases[pdf_path]}")
+            return
+        self.leases.pop(pdf_path, None)
+        if pdf_path in self.pending:  # Re-queued after this worker was presumed lost, not handed out yet
+            self.pending.remove(pdf_path)
+        record.update(pid=worker, worker=worker, attempts=self.attempts[pdf_path])
+        self._record(record, now)
+
+    def _record(self, record, now):
+        self.results[record["file"]] = record
+        append_record(self.manifest_file, record)
+        if self.processor.metrics_file and "total_ms" in record:
+            write_metrics(self.processor.metrics_file, record)
+        if record.get("status") != "ok":
+            logging.error(f"Error processing {record['file']} on {record['worker']}: {record.get('error', 'see worker log')}")
+        self.events.put(("done", record, now))
+        if not self.pending and not self.leases:
+            self._finish_run(now)
+
+    def _finish_run(self, now):
+        if not self.finished.is_set():
+            self.finished.set()
+            self.events.put(("finished", now, False))
+
+    def _reap(self):
+        """Re-queues the files of workers that stopped heartbeating."""
+        while not self.finished.wait(self.heartbeat):
+            now = time.time()
+            with self._lock:
+                for worker, state in self.workers.items():
+                    if state["lost"] or now - state["last_seen"] <= self.lease_timeout:
+                        continue
+                    state["lost"] = True
+                    self.lost_workers += 1
+                    pdf_path, state["job"] = state["job"], None
+                    logging.warning(f"Worker {worker} lost: nothing heard for {now - state['last_seen']:.0f} s")
+                    self.events.put(("lost", worker, now))
+                    if pdf_path is None or self.leases.get(pdf_path) != worker:
+                        continue
+                    del self.leases[pdf_path]
+                    if self.attempts[pdf_path] >= self.max_attempts:
+                        self._record({"file": pdf_path, "status": "error", "pages": 0, "pid": worker, "worker": worker,
+                                      "attempts": self.attempts[pdf_path],
+                                      "error": f"{self.attempts[pdf_path]} workers were lost while processing it"}, now)
+                    else:
+                        self.pending.appendleft(pdf_path)
+                        logging.warning(f"Re-queued {pdf_path} (attempt {self.attempts[pdf_path]} was on {worker})")
+
+
+class _Connection:
+    """One JSON-lines connection to the coordinator."""
+
+    def __init__(self, address, timeout=WORK_LEASE_TIMEOUT):
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, **message):
+        self.file.write(json.dumps(message).encode("utf-8") + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("the coordinator closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ConnectionError(f"the coordinator refused {message['op']}: {reply['error']}")
+        return reply
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def _send_heartbeats(address, worker, interval, stop):
+    try:
+        connection = _Connection(address)
+    except OSError as e:
+        logging.warning(f"Worker {worker} cannot heartbeat: {e}")
+        return
+    try:
+        while not stop.wait(interval):
+            connection.request(op="heartbeat", worker=worker)
+    except OSError as e:
+        if not stop.is_set():
+            logging.warning(f"Worker {worker} stopped heartbeating: {e}")
+    finally:
+        connection.close()
+
+
+def run_worker(address, token, name=None):
+    """
+    Takes files from the coordinator at `address` (host, port) until it reports the batch done.
+    Returns the number of files this worker processed.
+    """
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    connection = _Connection(address)
+    hello = connection.request(op="hello", name=name, token=token)
+    worker = hello["worker"]
+    processor = _processor_from_spec(hello["processor"])
+    processor.metrics_file = None  # The coordinator writes the metrics; timings come back in each record
+
+    stop = threading.Event()
+    threading.Thread(target=_send_heartbeats, args=(address, worker, hello["heartbeat"], stop), daemon=True).start()
+    processed = 0
+    try:
+        while True:
+            reply = connection.request(op="next", worker=worker)
+            if "job" in reply:
+                record = processor.process_single_pdf(reply["job"])
+                connection.request(op="result", worker=worker, record=record)
+                processed += 1
+            elif "wait" in reply:
+                time.sleep(reply["wait"])
+            else:
+                break
+    finally:
+        stop.set()
+        connection.close()
+    print(f"Worker {worker} finished after {processed} files")
+    return processed
+
+
+def _worker_main(address, token):
+    """Entry point of one worker process started by the command line."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handler.addFilter(FileContextFilter())
+    logging.basicConfig(level=logging.WARNING, handlers=[handler])
+    try:
+        run_worker(address, token)
+    except OSError as e:
+        logging.error(f"Worker stopped: {e}")
+
+
+def run_coordinator(processor, pdf_files, manifest_file, host, port, token=None, report_every=10):
+    """Runs a coordinator until every file has a result, printing progress; returns it."""
+    log_file = processor.setup_logging()
+    run_log = RunLog(log_file)
+    run_log.start()
+    coordinator = Coordinator(processor, pdf_files, manifest_file, host, port, token)
+    try:
+        coordinator.start()
+        host, port = coordinator.address
+        print(f"Coordinator on {host}:{port}, token {coordinator.token}: {len(coordinator.pending)} files to do, "
+              f"{coordinator.skipped} already done in {manifest_file}")
+        while not coordinator.join(report_every):
+            coordinator.drain()
+            stats = coordinator.stats
+            files_per_second, pages_per_second = stats.rates()
+            print(f"{stats.done_files}/{stats.total_files} files, {len(stats.error_files)} errors, "
+                  f"{coordinator.live_workers} workers ({stats.busy_workers} busy), "
+                  f"{files_per_second:.2f} files/s, {pages_per_second:.2f} pages/s")
+        coordinator.drain()
+        coordinator.stop()
+    finally:
+        run_log.stop()
+    stats = coordinator.stats
+    print(f"Done: {stats.done_files} files, {stats.pages} pages, {len(stats.error_files)} errors, "
+          f"{coordinator.lost_workers} workers lost, in {stats.elapsed:.0f} s. Log: {log_file}")
+    return coordinator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a batch across worker processes on several machines.")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    coordinator = modes.add_parser("coordinator", help="Hand out the files of a batch and collect the results")
+    coordinator.add_argument("pdf_folder", help="Folder of PDFs, at a path every worker can read")
+    coordinator.add_argument("output_folder", help="Folder for the outputs, at a path every worker can write")
+    coordinator.add_argument("--template", required=True, help="Areas workbook exported from the GUI")
+    coordinator.add_argument("--subfolders", action="store_true", help="Include subfolders")
+    coordinator.add_argument("--revision-date", default="", help="Run the revision updater with this date")
+    coordinator.add_argument("--revision-description", default="")
+    coordinator.add_argument("--verify", action="store_true", help="Verify each output after saving")
+    coordinator.add_argument("--manifest", help="Results file, also used to resume (default: in the output folder)")
+    coordinator.add_argument("--host", default="127.0.0.1",
+                             help="Interface to listen on; 0.0.0.0 or a LAN address for workers on other machines")
+    coordinator.add_argument("--port", type=int, default=WORK_QUEUE_PORT)
+    coordinator.add_argument("--token", help="Shared secret workers must present (default: a random one)")
+
+    worker = modes.add_parser("worker", help="Process files handed out by a coordinator")
+    worker.add_argument("address", help="host:port of the coordinator")
+    worker.add_argument("--token", required=True)
+    worker.add_argument("--processes", type=int, default=multiprocessing.cpu_count())
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        host, port = args.address.rsplit(":", 1)
+        processes = [multiprocessing.Process(target=_worker_main, args=((host, int(port)), args.token))
+                     for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        return
+
+    from backend.constants import COLLECT_METRICS
+    from backend.pdf_processor import PDFProcessor
+
+    processor = PDFProcessor.from_template(
+        args.template, args.pdf_folder, args.output_folder,
+        include_subfolders=args.subfolders,
+        revision_date=args.revision_date,
+        revision_description=args.revision_description,
+        verify_output=args.verify,
+        collect_metrics=COLLECT_METRICS,
+    )
+    manifest = args.manifest or os.path.join(args.output_folder, "work_queue_manifest.jsonl")
+    run_coordinator(processor, sorted(processor.get_pdf_files()), manifest, args.host, args.port, args.token)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench_display_list.py
+"""
+Repeated-zoom render time with and without a cached display list, on a vector-heavy A1 sheet.
+
+`page.get_pixmap` re-interprets the content stream on every call; the viewer's render worker
+builds `page.get_displaylist()` once per page and renders every zoom level and tile from it.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_display_list
+"""
+
+import time
+
+import fitz  # PyMuPDF
+
+from backend.constants import TILE_SIZE
+from benchmarks.bench_render import make_a1_sheet
+
+ZOOMS = (0.5, 1.0, 1.5, 2.0, 1.0, 0.5, 2.0, 3.0)  # A user zooming in and out a few times
+
+
+def render_viewport(render, page_rect, zoom):
+    """Renders the top-left 3x2 tiles at `zoom`, like the viewer filling its canvas."""
+    for col in range(3):
+        for row in range(2):
+            clip = fitz.Rect(col * TILE_SIZE / zoom, row * TILE_SIZE / zoom,
+                             (col + 1) * TILE_SIZE / zoom, (row + 1) * TILE_SIZE / zoom) & page_rect
+            render(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+
+
+def time_zooms(render, page_rect):
+    start = time.perf_counter()
+    for zoom in ZOOMS:
+        render_viewport(render, page_rect, zoom)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    page = make_a1_sheet()[0]
+    page.get_pixmap(matrix=fitz.Matrix(0.1, 0.1))  # Warm up fonts
+
+    direct_ms = time_zooms(page.get_pixmap, page.rect)
+
+    start = time.perf_counter()
+    display_list = page.get_displaylist()
+    build_ms = (time.perf_counter() - start) * 1000
+    cached_ms = time_zooms(display_list.get_pixmap, page.rect)
+
+    print(f"{len(ZOOMS)} zoom levels x 6 tiles on a {page.rect.width:.0f}x{page.rect.height:.0f} pt sheet")
+    print(f"page.get_pixmap:         {direct_ms:9.1f} ms")
+    print(f"display list (build):    {build_ms:9.1f} ms")
+    print(f"display list (renders):  {cached_ms:9.1f} ms")
+    print(f"speedup incl. build:     {direct_ms / (build_ms + cached_ms):9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
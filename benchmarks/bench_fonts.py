@@ -0,0 +1,90 @@
+# bench_fonts.py
+"""
+Cost of custom TrueType/OpenType insertion fonts against the Base-14 default.
+
+Runs the same corpus three ways: the template's insertion points in Helvetica, in the given font
+file, and in the font file with subsetting at save. For each it reports the median insert_text
+time per page, the median save time (including subsetting), the total output size and the number
+of font objects the font file produced per output, which should be one however many pages a
+document has.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_fonts --font PATH.ttf [--files 8] [--pages 4] [--lines 5000]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from backend.fonts import font_resource_name
+from backend.pdf_processor import PDFProcessor
+from backend.template_io import load_template
+from benchmarks.generate_corpus import generate_corpus
+
+
+def run(pdf_files, output_folder, template, font, subset):
+    """Processes every file stage by stage; returns (insert ms per page, save ms per file, bytes out, font objects)."""
+    insertion_points = [{**insertion, "font": font} for insertion in template["insertion_points"]]
+    processor = PDFProcessor(
+        pdf_folder=os.path.dirname(pdf_files[0]), output_excel_path=output_folder, areas=template["areas"],
+        insertion_points=insertion_points, include_subfolders=False,
+        table_coordinates=template["table_coordinates"], rev_coordinates=template["rev_coordinates"],
+        revision_date="", revision_description="", subset_fonts=subset,
+    )
+    insert_ms, save_ms, bytes_out, font_objects = [], [], 0, []
+    for pdf_path in pdf_files:
+        output_path = os.path.join(output_folder, os.path.basename(pdf_path))
+        doc = fitz.open(pdf_path)
+        for page in doc:
+            processor.redact_page(page)
+            start = time.perf_counter()
+            processor.insert_page_text(page)
+            insert_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        if subset:
+            doc.subset_fonts()
+        doc.ez_save(output_path)
+        save_ms.append((time.perf_counter() - start) * 1000)
+        doc.close()
+
+        bytes_out += os.path.getsize(output_path)
+        with fitz.open(output_path) as out:
+            font_objects.append(len({entry[0] for page in out for entry in page.get_fonts()
+                                     if entry[4] == font_resource_name(font)}))
+    return statistics.median(insert_ms), statistics.median(save_ms), bytes_out, max(font_objects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark custom insertion fonts.")
+    parser.add_argument("--font", required=True, help="TrueType/OpenType font file")
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--lines", type=int, default=5000, help="Line segments per page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus = os.path.join(work_dir, "corpus")
+        generate_corpus(corpus, files=args.files, pages=args.pages, sizes=("A1",), lines=args.lines)
+        pdf_files = sorted(glob.glob(os.path.join(corpus, "*.pdf")))
+        template = load_template(os.path.join(corpus, "template_A1.xlsx"))
+        print(f"{len(pdf_files)} files of {args.pages} pages, {len(template['insertion_points'])} insertions per page\n")
+
+        print(f"{'font':<22}{'insert ms/page':>16}{'save ms':>10}{'output KB':>11}{'font objs':>11}")
+        for label, font, subset in (("Helvetica", "Helvetica", False),
+                                    (os.path.basename(args.font), args.font, False),
+                                    ("  + subset at save", args.font, True)):
+            output_folder = os.path.join(work_dir, label.strip(" +"))
+            os.makedirs(output_folder)
+            insert_ms, save_ms, bytes_out, font_objects = run(pdf_files, output_folder, template, font, subset)
+            objects = "" if font == "Helvetica" else str(font_objects)
+            print(f"{label:<22}{insert_ms:>16.2f}{save_ms:>10.1f}{bytes_out / 1024:>11.0f}{objects:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# bench_processor.py
+"""
+Batch throughput of PDFProcessor on a synthetic drawing corpus.
+
+Part 1 runs the process_single_pdf stages one by one in this process and reports the median
+time of each (open, bake, remove_rotation, redact, insert text, find_tables, the whole revision
+update, save). Part 2 runs the real multiprocessing batch end to end and reports files and pages
+per second plus the peak RSS of the parent and of the largest worker.
+
+The corpus is generated by benchmarks.generate_corpus into a temporary folder unless --corpus
+points at an existing one (its template_<size>.xlsx is then used). Everything runs offline.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_processor [--files 24] [--lines 20000] [--size A1] [--processes N]
+        [--corpus DIR]
+"""
+
+import argparse
+import glob
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from backend.batch_runner import BatchRunner
+from backend.pdf_processor import PDFProcessor
+from backend.template_io import load_template
+from benchmarks.bench_render import peak_rss_mb
+from benchmarks.generate_corpus import generate_corpus
+
+STAGES = ("open", "bake", "remove_rotation", "redact", "insert_text", "find_tables", "revision", "save")
+
+
+def make_processor(pdf_folder, output_folder, template):
+    return PDFProcessor(
+        pdf_folder=pdf_folder,
+        output_excel_path=output_folder,
+        areas=template["areas"],
+        insertion_points=template["insertion_points"],
+        include_subfolders=False,
+        table_coordinates=template["table_coordinates"],
+        rev_coordinates=template["rev_coordinates"],
+        revision_date="09-Jan-25",
+        revision_description="ISSUED FOR CONSTRUCTION",
+    )
+
+
+def time_stages(processor, pdf_files, output_folder):
+    """Runs the pipeline stage by stage on every file; returns {stage: [ms per file]}."""
+    timings = {stage: [] for stage in STAGES}
+    for pdf_path in pdf_files:
+        spent = dict.fromkeys(STAGES, 0.0)
+
+        start = time.perf_counter()
+        doc = fitz.open(pdf_path)
+        spent["open"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        processor.bake_document(doc)
+        spent["bake"] = time.perf_counter() - start
+
+        for page in doc:
+            start = time.perf_counter()
+            page.remove_rotation()
+            spent["remove_rotation"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            processor.redact_page(page)  # Its own remove_rotation is a no-op by now
+            spent["redact"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            processor.insert_page_text(page)
+            spent["insert_text"] += time.perf_counter() - start
+
+            # Measured on its own; update_revision below runs it again as part of the stage
+            start = time.perf_counter()
+            page.find_tables(clip=processor.table_coordinates, strategy="lines")
+            spent["find_tables"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            processor.update_revision(page, pdf_path)
+            spent["revision"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        doc.ez_save(os.path.join(output_folder, os.path.basename(pdf_path)))
+        spent["save"] = time.perf_counter() - start
+        doc.close()
+
+        for stage, seconds in spent.items():
+            timings[stage].append(seconds * 1000)
+    return timings
+
+
+def run_batch(processor, pdf_files, log_file, processes):
+    """The GUI's batch: a BatchRunner over the files. Returns (seconds, error count)."""
+    start = time.perf_counter()
+    runner = BatchRunner(processor, pdf_files, log_file, processes)
+    runner.start()
+    runner.join()
+    return time.perf_counter() - start, len(runner.stats.error_files)
+
+
+def children_peak_rss_mb():
+    """Peak RSS of the largest finished child process in MB, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDFProcessor on a synthetic corpus.")
+    parser.add_argument("--corpus", help="Existing corpus folder (default: generate one)")
+    parser.add_argument("--files", type=int, default=24)
+    parser.add_argument("--lines", type=int, default=20000, help="Line segments per page")
+    parser.add_argument("--size", default="A1")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus = args.corpus
+        if corpus is None:
+            corpus = os.path.join(work_dir, "corpus")
+            start = time.perf_counter()
+            generate_corpus(corpus, files=args.files, sizes=(args.size,), rotations=(0, 90),
+                            lines=args.lines, forms=0.25, annots=0.25)
+            print(f"Generated {args.files} {args.size} files with {args.lines} lines each "
+                  f"in {time.perf_counter() - start:.1f} s")
+        pdf_files = sorted(glob.glob(os.path.join(corpus, "*.pdf")))
+        template = load_template(os.path.join(corpus, f"template_{args.size}.xlsx"))
+        total_pages = sum(fitz.open(path).page_count for path in pdf_files)
+        megabytes_in = sum(os.path.getsize(path) for path in pdf_files) / 2 ** 20
+
+        # Part 1: stage timings, single process
+        stage_output = os.path.join(work_dir, "stages")
+        os.makedirs(stage_output)
+        processor = make_processor(corpus, stage_output, template)
+        timings = time_stages(processor, pdf_files, stage_output)
+        total_ms = sum(sum(values) for stage, values in timings.items() if stage != "find_tables")
+        print(f"\nStage timings over {len(pdf_files)} files ({total_pages} pages, {megabytes_in:.1f} MB in)")
+        print(f"{'stage':<17}{'median ms':>11}{'max ms':>10}{'share':>8}")
+        for stage in STAGES:
+            values = timings[stage]
+            share = "" if stage == "find_tables" else f"{sum(values) / total_ms:.0%}"
+            print(f"{stage:<17}{statistics.median(values):>11.1f}{max(values):>10.1f}{share:>8}")
+        print("(find_tables is timed on its own and is also part of revision)")
+
+        # Part 2: end-to-end pool throughput
+        batch_output = os.path.join(work_dir, "batch")
+        processor = make_processor(corpus, batch_output, template)
+        seconds, errors = run_batch(processor, pdf_files, os.path.join(work_dir, "batch.log"), args.processes)
+        processes = args.processes or multiprocessing.cpu_count()
+        parent_rss, worker_rss = peak_rss_mb(), children_peak_rss_mb()
+        print(f"\nBatch with {processes} processes: {seconds:.2f} s, "
+              f"{len(pdf_files) / seconds:.1f} files/s, {total_pages / seconds:.1f} pages/s, {errors} errors")
+        print(f"Peak RSS: parent {parent_rss:.0f} MB, largest worker "
+              + (f"{worker_rss:.0f} MB" if worker_rss is not None else "n/a"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# bench_render.py
+"""
+Frame time and peak memory of handing a rendered page to Tk, on a synthetic A1 sheet.
+
+Compares the old hand-off (PPM encode, then tk.PhotoImage parsing the blob) with the raw path
+used by the viewer (PIL image over the raster samples the render process sends back, pasted
+into a reused PhotoImage).
+Each case runs in a fresh interpreter so its peak RSS is not polluted by the others.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_render
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+A1_WIDTH, A1_HEIGHT = 2384, 1684  # A1 landscape in points
+ZOOMS = (1, 2, 4)
+REPEATS = 3
+
+
+def make_a1_sheet():
+    """Builds a one-page A1 document with a dense grid of line work and labels."""
+    doc = fitz.open()
+    page = doc.new_page(width=A1_WIDTH, height=A1_HEIGHT)
+    shape = page.new_shape()
+    for x in range(0, A1_WIDTH, 12):
+        shape.draw_line((x, 0), (A1_WIDTH - x, A1_HEIGHT))
+    for y in range(0, A1_HEIGHT, 12):
+        shape.draw_line((0, y), (A1_WIDTH, A1_HEIGHT - y))
+    shape.finish(color=(0, 0, 0), width=0.3)
+    shape.commit()
+    for y in range(40, A1_HEIGHT, 60):
+        page.insert_text((40, y), f"GRID LINE {y:04d} - SAMPLE ANNOTATION TEXT", fontsize=9)
+    return doc
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2 ** 20
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def run_case(path, zoom):
+    """Renders the sheet REPEATS times at `zoom` through one hand-off path; prints a JSON result."""
+    import tkinter as tk
+    from frontend.render_worker import raster, raster_to_image
+
+    try:
+        root = tk.Tk()
+        root.withdraw()
+    except tk.TclError:
+        root = None  # No display: only the MuPDF/encode side can be measured
+
+    page = make_a1_sheet()[0]
+    matrix = fitz.Matrix(zoom, zoom)
+    photo = None
+    times = []
+    for _ in range(REPEATS + 1):  # The first frame warms up fonts and caches
+        start = time.perf_counter()
+        pix = page.get_pixmap(matrix=matrix)
+        if path == "ppm":
+            data = pix.tobytes("ppm")
+            if root is not None:
+                photo = tk.PhotoImage(data=data)
+        else:
+            image = raster_to_image(raster(pix))
+            if root is not None:
+                from PIL import ImageTk
+                if photo is None or (photo.width(), photo.height()) != image.size:
+                    photo = ImageTk.PhotoImage("RGB", image.size)
+                photo.paste(image)
+        if root is not None:
+            root.update_idletasks()
+        times.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        "frame_ms": statistics.median(times[1:]),
+        "peak_rss_mb": peak_rss_mb(),
+        "pixels": f"{pix.width}x{pix.height}",
+        "tk": root is not None,
+    }))
+
+
+def main():
+    print(f"{'path':<6}{'zoom':>6}{'pixmap':>14}{'frame ms':>11}{'peak RSS MB':>14}")
+    for zoom in ZOOMS:
+        for path in ("ppm", "raw"):
+            out = subprocess.run([sys.executable, "-m", "benchmarks.bench_render", "--case", path, str(zoom)],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            rss = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "n/a"
+            note = "" if result["tk"] else "  (no display: Tk step skipped)"
+            print(f"{path:<6}{zoom:>6}{result['pixels']:>14}{result['frame_ms']:>11.1f}{rss:>14}{note}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--case":
+        run_case(sys.argv[2], float(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,100 @@
+# bench_startup.py
+"""
+Application startup time: import cost per module and time to the first painted frame.
+
+Part 1 imports each module in a fresh interpreter with `-X importtime` and reports the median
+cumulative import time, then lists the modules with the most self time under main + frontend.gui
+and checks that the deferred ones (openpyxl, numpy, the processing engine) stay out of startup.
+Part 2, when a display is available, starts the app the way main.py does and reports the time to
+the first frame (the window with its loading label) and until the GUI is built, against
+FIRST_FRAME_BUDGET_MS.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_startup [--repeats 3]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+FIRST_FRAME_BUDGET_MS = 300  # Interpreter start to the first painted frame
+MODULES = ("customtkinter", "CTkToolTip", "PIL.Image", "pymupdf", "openpyxl", "numpy",
+           "backend.pdf_processor", "backend.template_io", "frontend.pdf_viewer", "frontend.gui", "main")
+DEFERRED = ("openpyxl", "numpy", "backend.pdf_processor", "backend.batch_runner")
+
+WINDOW_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import main
+app = main.ReidactorApp()
+first_frame = time.perf_counter()
+app.load_gui()
+app.root.update()
+ready = time.perf_counter()
+app.root.destroy()
+print(json.dumps({"first_frame": (first_frame - start) * 1000, "ready": (ready - start) * 1000}))
+"""
+
+
+def import_times(statement):
+    """Runs `statement` under -X importtime; returns {module: (self ms, cumulative ms)}."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def interpreter_start_ms(repeats):
+    """Median wall time of starting and stopping a bare interpreter, measured from here."""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark application startup.")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # Part 1: import cost, each module on its own in a fresh interpreter
+    print(f"{'module':<24}{'import ms':>11}")
+    for module in MODULES:
+        samples = [import_times(f"import {module}")[module][1] for _ in range(args.repeats)]
+        print(f"{module:<24}{statistics.median(samples):>11.1f}")
+
+    startup = import_times("import main, frontend.gui")
+    print("\nMost self time when starting the app:")
+    for name, (self_ms, _) in sorted(startup.items(), key=lambda item: -item[1][0])[:10]:
+        print(f"  {self_ms:>8.1f} ms  {name.strip()}")
+    loaded = [name for name in DEFERRED if name in startup]
+    print("Deferred modules imported at startup: " + (", ".join(loaded) if loaded else "none"))
+
+    # Part 2: time to first frame
+    interpreter_ms = interpreter_start_ms(args.repeats)
+    runs = []
+    for _ in range(args.repeats):
+        result = subprocess.run([sys.executable, "-c", WINDOW_SCRIPT], capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"\nWindow timing skipped: {result.stderr.strip().splitlines()[-1]}")
+            return
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    first_frame = interpreter_ms + statistics.median(run["first_frame"] for run in runs)
+    ready = interpreter_ms + statistics.median(run["ready"] for run in runs)
+    verdict = "within" if first_frame <= FIRST_FRAME_BUDGET_MS else "OVER"
+    print(f"\nInterpreter start {interpreter_ms:.0f} ms; first frame {first_frame:.0f} ms "
+          f"({verdict} the {FIRST_FRAME_BUDGET_MS} ms budget); GUI ready {ready:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# bench_text.py
+"""
+Text insertion cost per page: one page.insert_text call per insertion point against the batched
+PageText the processor uses, for templates with a growing number of insertions per sheet.
+
+Each call of page.insert_text commits its own Shape, which re-reads the page's content streams
+and appends a new one, so its cost grows with both the line work and the insertion count. The
+benchmark redacts each page as the batch does, writes the text both ways and reports the median
+ms per page, the content streams the page ends up with and whether the two renders are identical.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_text [--files 4] [--lines 20000] [--insertions 4,12,36]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from backend.pdf_processor import PDFProcessor
+from backend.template_io import load_template
+from benchmarks.generate_corpus import generate_corpus
+
+
+def grid_insertions(template, count):
+    """The template's insertion points plus enough extra labels, laid out in rows, to make `count`."""
+    insertions = list(template["insertion_points"])[:count]
+    for index in range(count - len(insertions)):
+        insertions.append({"position": (100 + 180 * (index % 10), 300 + 30 * (index // 10)),
+                           "text": f"LABEL {index + 1:03d}", "font": "Helvetica", "size": 10})
+    return insertions
+
+
+def insert_each(page, insertions):
+    """The unbatched baseline: one page.insert_text per insertion point."""
+    for insertion in insertions:
+        page.insert_text(insertion["position"], insertion["text"], fontsize=insertion["size"],
+                         fontname=insertion["font"], rotate=page.rotation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched text insertion.")
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--lines", type=int, default=20000, help="Line segments per page")
+    parser.add_argument("--insertions", default="4,12,36", help="Insertion counts per sheet")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus = os.path.join(work_dir, "corpus")
+        generate_corpus(corpus, files=args.files, sizes=("A1",), lines=args.lines)
+        pdf_files = sorted(glob.glob(os.path.join(corpus, "*.pdf")))
+        template = load_template(os.path.join(corpus, "template_A1.xlsx"))
+
+        print(f"{len(pdf_files)} A1 sheets with {args.lines} line segments\n")
+        print(f"{'insertions':>10}{'each ms':>10}{'batched ms':>12}{'speed-up':>10}{'streams':>12}  renders")
+        for count in (int(value) for value in args.insertions.split(",")):
+            insertions = grid_insertions(template, count)
+            processor = PDFProcessor(
+                pdf_folder=corpus, output_excel_path=work_dir, areas=template["areas"],
+                insertion_points=insertions, include_subfolders=False,
+                table_coordinates=template["table_coordinates"], rev_coordinates=template["rev_coordinates"],
+                revision_date="", revision_description="",
+            )
+            each_ms, batched_ms, streams, identical = [], [], set(), True
+            for pdf_path in pdf_files:
+                pages = []
+                for insert, timings in ((lambda page: insert_each(page, insertions), each_ms),
+                                        (processor.insert_page_text, batched_ms)):
+                    doc = fitz.open(pdf_path)
+                    page = doc[0]
+                    processor.redact_page(page)
+                    before = len(page.get_contents())
+                    start = time.perf_counter()
+                    insert(page)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    pages.append((page.get_pixmap(dpi=36).samples, len(page.get_contents()) - before))
+                    doc.close()
+                identical &= pages[0][0] == pages[1][0]
+                streams.add(f"{pages[0][1]} -> {pages[1][1]}")
+            each, batched = statistics.median(each_ms), statistics.median(batched_ms)
+            print(f"{count:>10}{each:>10.1f}{batched:>12.1f}{each / batched:>9.1f}x{', '.join(streams):>12}  "
+                  + ("identical" if identical else "DIFFERENT"))
+
+
+if __name__ == "__main__":
+    main()
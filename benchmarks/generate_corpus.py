@@ -0,0 +1,229 @@
+# generate_corpus.py
+"""
+Builds a reproducible corpus of synthetic drawing sheets for benchmarking the batch.
+
+Each file gets a title block with a drawing number and title, a revision-history table ruled so
+`find_tables(strategy="lines")` picks it up, and a configurable amount of vector line work.
+Sheets can be stored rotated (the content is still laid out upright as displayed, like a
+landscape drawing saved on a portrait page) and can carry form fields and annotations, which
+force the batch to bake. A matching template workbook is written next to the PDFs, so the
+corpus can be processed from the GUI, by bench_processor or by backend.qa without drawing areas.
+
+Usage (from the repository root):
+    python -m benchmarks.generate_corpus OUT_DIR [--files 50] [--pages 1] [--sizes A1,A3]
+        [--rotations 0,90] [--lines 20000] [--forms 0.2] [--annots 0.3] [--seed 1]
+"""
+
+import argparse
+import math
+import os
+import random
+
+import fitz  # PyMuPDF
+
+from backend.template_io import save_template
+
+SHEET_SIZES = {  # Landscape (width, height) in points
+    "A0": (3370, 2384),
+    "A1": (2384, 1684),
+    "A2": (1684, 1191),
+    "A3": (1191, 842),
+    "A4": (842, 595),
+}
+REVISION_ROWS = 8
+REVISION_COLUMNS = (0.12, 0.2, 0.44, 0.12, 0.12)  # Column widths as fractions of the table width
+
+
+def title_block_layout(width, height):
+    """
+    Template geometry for a sheet of displayed size (width, height), in displayed coordinates.
+
+    Returns (drawing number rect, drawing title rect, revision table rect, revision box rect),
+    all anchored to the bottom-right corner so every sheet size has a title block.
+    """
+    block_x0, block_x1 = width - 330, width - 30
+    drawing_no = [block_x0 + 10, height - 90, block_x1 - 60, height - 62]
+    drawing_title = [block_x0 + 10, height - 140, block_x1 - 10, height - 100]
+    revision_table = [block_x0, height - 160 - REVISION_ROWS * 18, block_x1, height - 160]
+    revision_box = [block_x1 - 50, height - 90, block_x1 - 10, height - 62]
+    return drawing_no, drawing_title, revision_table, revision_box
+
+
+def corpus_template(width, height):
+    """Areas, insertion points and table/revision boxes matching sheets of this displayed size."""
+    drawing_no, drawing_title, revision_table, revision_box = title_block_layout(width, height)
+    return {
+        "areas": [{"title": "Drawing No", "coordinates": drawing_no},
+                  {"title": "Drawing Title", "coordinates": drawing_title}],
+        "insertion_points": [
+            {"position": (drawing_no[0] + 2, drawing_no[3] - 8), "text": "NEW-0001", "font": "Helvetica", "size": 14},
+            {"position": (drawing_title[0] + 2, drawing_title[3] - 14), "text": "REISSUED DRAWING TITLE",
+             "font": "Helvetica-Bold", "size": 12},
+        ],
+        "table_coordinates": revision_table,
+        "rev_coordinates": revision_box,
+    }
+
+
+class SheetWriter:
+    """Draws on a page in displayed (upright) coordinates, whatever its /Rotate."""
+
+    def __init__(self, page):
+        self.page = page
+        self.matrix = page.derotation_matrix  # Displayed -> unrotated page space
+
+    def point(self, x, y):
+        return fitz.Point(x, y) * self.matrix
+
+    def rect(self, coordinates):
+        return fitz.Rect(coordinates) * self.matrix
+
+    def lines(self, segments, width=0.25):
+        """
+        Adds line segments as one raw content stream, placed under the existing content. Shape
+        builds its stream one Point and string concatenation at a time, which takes seconds for
+        tens of thousands of lines. Call it last: every later insert_text would rescan the stream.
+        """
+        m = self.matrix
+        ops = [f"q 0 G {width} w 1 0 0 -1 0 {self.page.mediabox.height} cm"]  # Top-left origin, y down
+        for x0, y0, x1, y1 in segments:
+            ops.append(f"{m.a * x0 + m.c * y0 + m.e:.2f} {m.b * x0 + m.d * y0 + m.f:.2f} m "
+                       f"{m.a * x1 + m.c * y1 + m.e:.2f} {m.b * x1 + m.d * y1 + m.f:.2f} l")
+        ops.append("S Q")
+
+        doc = self.page.parent
+        xref = doc.get_new_xref()
+        doc.update_object(xref, "<<>>")
+        doc.update_stream(xref, "\n".join(ops).encode())
+        contents = [xref] + self.page.get_contents()
+        doc.xref_set_key(self.page.xref, "Contents", "[" + " ".join(f"{x} 0 R" for x in contents) + "]")
+
+    def text(self, x, y, text, fontsize=9, fontname="helv"):
+        self.page.insert_text(self.point(x, y), text, fontsize=fontsize, fontname=fontname,
+                              rotate=self.page.rotation)
+
+
+def draw_sheet(page, width, height, lines, rng, number, forms=False, annots=False):
+    """Fills one page of displayed size (width, height) with line work, title block and revision table."""
+    sheet = SheetWriter(page)
+    drawing_no, drawing_title, revision_table, revision_box = title_block_layout(width, height)
+    # Line work stays clear of the title block, or find_tables would see extra rows and columns
+    title_block = fitz.Rect(drawing_no[0] - 20, revision_table[1] - 10, width - 20, height - 20)
+
+    # Border and line work
+    shape = page.new_shape()
+    shape.draw_rect(sheet.rect([20, 20, width - 20, height - 20]))
+    shape.finish(color=(0, 0, 0), width=0.8)
+    shape.commit()
+    segments = []
+    while len(segments) < lines:
+        x0, y0 = rng.uniform(30, width - 30), rng.uniform(30, height - 30)
+        length, angle = rng.uniform(5, 120), math.radians(rng.choice((0, 90, rng.uniform(0, 180))))
+        x1, y1 = x0 + length * math.cos(angle), y0 + length * math.sin(angle)
+        if (min(x0, x1) <= title_block.x1 and max(x0, x1) >= title_block.x0
+                and min(y0, y1) <= title_block.y1 and max(y0, y1) >= title_block.y0):
+            continue
+        segments.append((x0, y0, x1, y1))
+
+    # Scattered labels, as on a real drawing
+    for _ in range(max(10, lines // 200)):
+        sheet.text(rng.uniform(40, width - 400), rng.uniform(40, height - 300), f"LABEL {rng.randrange(10000):04d}", 7)
+
+    # Title block
+    shape = page.new_shape()
+    shape.draw_rect(sheet.rect([drawing_no[0] - 10, revision_table[1], width - 30, height - 30]))
+    shape.finish(color=(0, 0, 0), width=0.8)
+    shape.commit()
+    sheet.text(drawing_no[0] + 2, drawing_no[3] - 8, f"DWG-{number:05d}", 14)
+    sheet.text(drawing_title[0] + 2, drawing_title[3] - 14, f"SYNTHETIC SHEET {number} GENERAL ARRANGEMENT", 11)
+
+    # Revision history: blank rows on top, then revisions newest first, as the revision updater expects
+    x0, y0, x1, y1 = revision_table
+    row_height = (y1 - y0) / REVISION_ROWS
+    column_edges = [x0]
+    for fraction in REVISION_COLUMNS:
+        column_edges.append(column_edges[-1] + fraction * (x1 - x0))
+    shape = page.new_shape()
+    for row in range(REVISION_ROWS + 1):
+        shape.draw_line(sheet.point(x0, y0 + row * row_height), sheet.point(x1, y0 + row * row_height))
+    for x in column_edges:
+        shape.draw_line(sheet.point(x, y0), sheet.point(x, y1))
+    shape.finish(color=(0, 0, 0), width=0.5)
+    shape.commit()
+    revisions = rng.randint(1, REVISION_ROWS - 2)
+    for index in range(revisions):
+        row = REVISION_ROWS - revisions + index
+        cells = [f"P{revisions - index:02d}", f"{1 + index:02d}-Jan-25", "ISSUED FOR REVIEW", "AB", "CD"]
+        for column, cell in enumerate(cells):
+            sheet.text(column_edges[column] + 2, y0 + (row + 1) * row_height - 5, cell, 6)
+    sheet.text(revision_box[0] + 4, revision_box[3] - 8, f"P{revisions:02d}", 8)
+
+    if forms:
+        widget = fitz.Widget()
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.field_name = f"checked_by_{page.number}"
+        widget.field_value = "CHECKED"
+        widget.rect = sheet.rect([width - 320, height - 55, width - 200, height - 38])
+        page.add_widget(widget)
+    if annots:
+        page.add_freetext_annot(sheet.rect([60, 60, 360, 90]), "REVIEW COMMENT", fontsize=10,
+                                rotate=page.rotation)
+        page.add_rect_annot(sheet.rect([width - 600, 200, width - 420, 320]))
+
+    sheet.lines(segments)
+
+
+def generate_corpus(out_dir, files=50, pages=1, sizes=("A1",), rotations=(0,), lines=20000,
+                    forms=0.0, annots=0.0, seed=1):
+    """Writes `files` PDFs to `out_dir` plus one template workbook per sheet size; returns the PDF paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for number in range(files):
+        size = sizes[number % len(sizes)]
+        rotation = rotations[(number // len(sizes)) % len(rotations)]
+        width, height = SHEET_SIZES[size]
+        with_forms, with_annots = rng.random() < forms, rng.random() < annots
+
+        doc = fitz.open()
+        for _ in range(pages):
+            # Rotated sheets are stored on a portrait page and turned to landscape by /Rotate
+            if rotation in (90, 270):
+                page = doc.new_page(width=height, height=width)
+            else:
+                page = doc.new_page(width=width, height=height)
+            page.set_rotation(rotation)
+            draw_sheet(page, width, height, lines, rng, number, with_forms, with_annots)
+        path = os.path.join(out_dir, f"{size}_r{rotation:03d}_{number:05d}.pdf")
+        doc.save(path, garbage=3, deflate=True)
+        doc.close()
+        paths.append(path)
+
+    for size in sizes:
+        template = corpus_template(*SHEET_SIZES[size])
+        save_template(os.path.join(out_dir, f"template_{size}.xlsx"), template["areas"],
+                      template["insertion_points"], template["table_coordinates"], template["rev_coordinates"])
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic drawing corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=1, help="Pages per file")
+    parser.add_argument("--sizes", default="A1", help=f"Comma-separated, from {', '.join(SHEET_SIZES)}")
+    parser.add_argument("--rotations", default="0", help="Comma-separated /Rotate values, e.g. 0,90")
+    parser.add_argument("--lines", type=int, default=20000, help="Line segments per page")
+    parser.add_argument("--forms", type=float, default=0.0, help="Fraction of files with a form field")
+    parser.add_argument("--annots", type=float, default=0.0, help="Fraction of files with annotations")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.out_dir, args.files, args.pages, args.sizes.split(","),
+                            [int(rotation) for rotation in args.rotations.split(",")], args.lines,
+                            args.forms, args.annots, args.seed)
+    print(f"Wrote {len(paths)} files to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# area_list.py
+
+import tkinter as tk
+from tkinter import ttk
+
+from backend.constants import *
+
+COLUMNS = ("Title", "x0", "y0", "x1", "y1")
+
+
+class AreaList:
+    """
+    Virtualized table of the areas in an AreaStore.
+
+    The Treeview only ever holds `rows` items, one per visible line; scrolling changes which
+    store records they show instead of creating rows, so the cost of a refresh does not depend
+    on how many areas there are. Cells are edited in place with an entry over the cell, and each
+    edit is handed to `on_edit(uid, field, value)` (field 0 is the title, 1-4 are x0, y0, x1, y1);
+    "Remove Row" calls `on_remove(uid)`.
+    """
+
+    def __init__(self, master, store, on_edit, on_remove, rows=3):
+        self.store = store
+        self.on_edit = on_edit
+        self.on_remove = on_remove
+        self.rows = rows
+        self.first = 0  # Store index shown in the top row
+        self.slot_uids = [None] * rows  # uid shown in each row
+        self._entry = None
+
+        self.tree = ttk.Treeview(master, columns=COLUMNS, show="headings", height=rows, selectmode="browse")
+        self.tree.heading("Title", text="Title")
+        self.tree.column("Title", width=50, anchor="center")
+        for col in COLUMNS[1:]:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=45, anchor="center")
+        for slot in range(rows):
+            self.tree.insert("", "end", iid=str(slot), values=("",) * len(COLUMNS))
+        self.scrollbar = ttk.Scrollbar(master, orient="vertical", command=self.yview)
+        self.tree.pack(side="left")
+        self.scrollbar.pack(side="left", fill="y")
+
+        self.tree.bind("<Double-Button-1>", self.on_double_click)
+        self.tree.bind("<Button-3>", self.show_context_menu)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-1))  # Linux wheel
+        self.tree.bind("<Button-5>", lambda event: self.scroll(1))
+
+        self.context_menu = tk.Menu(self.tree, tearoff=0)
+        self.context_menu.add_command(label="Remove Row", command=self.remove_selected)
+
+    def refresh(self):
+        """Shows the store records that fall in the visible rows."""
+        total = len(self.store)
+        self.first = max(0, min(self.first, total - self.rows))
+        for slot in range(self.rows):
+            index = self.first + slot
+            if index < total:
+                area = self.store[index]
+                self.slot_uids[slot] = self.store.uids[index]
+                self.tree.item(str(slot), values=(area["title"], *area["coordinates"]))
+            else:
+                self.slot_uids[slot] = None
+                self.tree.item(str(slot), values=("",) * len(COLUMNS))
+        if total > self.rows:
+            self.scrollbar.set(self.first / total, (self.first + self.rows) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll(self, rows):
+        self.first += rows
+        self._cancel_edit()
+        self.refresh()
+
+    def yview(self, action, amount, units=None):
+        """Scrollbar callback: "moveto" a fraction, or "scroll" by units (rows) or pages."""
+        if action == "moveto":
+            self.first = int(float(amount) * len(self.store))
+        else:
+            self.first += int(amount) * (self.rows if units == "pages" else 1)
+        self._cancel_edit()
+        self.refresh()
+
+    def show(self, uid):
+        """Scrolls so the row of `uid` is visible and selects it."""
+        index = self.store.index_of(uid)
+        if not self.first <= index < self.first + self.rows:
+            self.first = index
+            self.refresh()
+        self.tree.selection_set(str(index - self.first))
+
+    def selected_uid(self):
+        selection = self.tree.selection()
+        return self.slot_uids[int(selection[0])] if selection else None
+
+    def remove_selected(self):
+        uid = self.selected_uid()
+        if uid is not None:
+            self.on_remove(uid)
+
+    def show_context_menu(self, event):
+        slot = self.tree.identify_row(event.y)
+        if slot and self.slot_uids[int(slot)] is not None:
+            self.tree.selection_set(slot)
+            self.context_menu.post(event.x_root, event.y_root)
+
+    def on_double_click(self, event):
+        slot, col = self.tree.identify_row(event.y), self.tree.identify_column(event.x)
+        if not slot or not col or self.slot_uids[int(slot)] is None:
+            return
+        self._cancel_edit()
+        field = int(col.replace("#", "")) - 1
+        uid = self.slot_uids[int(slot)]
+        x, y, width, height = self.tree.bbox(slot, col)
+
+        self._entry = ttk.Entry(self.tree, justify="center", font=(BUTTON_FONT, 9))
+        self._entry.insert(0, self.tree.item(slot, "values")[field])
+        self._entry.select_range(0, "end")
+        self._entry.place(x=x, y=y, width=width, height=height)
+        self._entry.focus_set()
+        self._entry.bind("<Return>", lambda _event: self._commit_edit(uid, field))
+        self._entry.bind("<Escape>", lambda _event: self._cancel_edit())
+        self._entry.bind("<FocusOut>", lambda _event: self._cancel_edit())
+
+    def _commit_edit(self, uid, field):
+        value = self._entry.get()
+        self._cancel_edit()
+        if value:
+            self.on_edit(uid, field, value)
+
+    def _cancel_edit(self):
+        if self._entry is not None:
+            self._entry.destroy()
+            self._entry = None
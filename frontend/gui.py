@@ -1,20 +1,19 @@
 # gui.py
 
 import json
-import multiprocessing
 import os
 import time
-from tkinter import filedialog, messagebox, StringVar
+from tkinter import filedialog, messagebox, simpledialog, StringVar
 
 import customtkinter as ctk
-import pymupdf
-from openpyxl import Workbook, load_workbook
 
 from backend.constants import *
-from backend.pdf_processor import PDFProcessor
+from backend.template_io import save_template, load_template
 from frontend.pdf_viewer import PDFViewer
-from backend.utils import create_tooltip, EditableTreeview
-from functools import partial
+from frontend.thumbnail_strip import ThumbnailStrip
+from frontend.progress_dashboard import ProgressDashboard
+from frontend.area_list import AreaList
+from backend.utils import create_tooltip, open_path
 
 class ReidactorGUI:
     def __init__(self, root):
@@ -26,6 +25,11 @@ class ReidactorGUI:
         self.output_excel_path = ''
 
         self.recent_pdf_path = None
+        self.log_file = None
+        self.pending_batch = None  # (processor, files not yet processed) of a cancelled batch
+        self.data_merge = None  # MergeTable for {{column}} placeholders in insertion text
+        self.metrics_file = None  # Per-file stage timings of the current batch, if collected
+        self.thumbnail_strip = ThumbnailStrip(self.root, on_select=self.load_pdf)
 
         self.setup_widgets()
         self.setup_bindings()
@@ -49,6 +53,27 @@ class ReidactorGUI:
                                          command=self.update_zoom, width=155)
         self.zoom_slider.place(x=20, y=110)
 
+        # Page Navigation
+        self.prev_page_button = ctk.CTkButton(self.root, text="<", command=self.pdf_viewer.previous_page,
+                                              font=(BUTTON_FONT, 9), width=20, height=10)
+        self.prev_page_button.place(x=185, y=106)
+        self.page_entry = ctk.CTkEntry(self.root, width=35, height=20, font=(BUTTON_FONT, 9), justify="center",
+                                       border_width=1, corner_radius=3)
+        self.page_entry.place(x=212, y=105)
+        self.page_count_label = ctk.CTkLabel(self.root, text="/ 0", font=(BUTTON_FONT, 9), height=20)
+        self.page_count_label.place(x=251, y=105)
+        self.next_page_button = ctk.CTkButton(self.root, text=">", command=self.pdf_viewer.next_page,
+                                              font=(BUTTON_FONT, 9), width=20, height=10)
+        self.next_page_button.place(x=285, y=106)
+
+        # Output Preview Checkbox
+        self.output_preview_var = ctk.IntVar()
+        self.output_preview_checkbox = ctk.CTkCheckBox(self.root, text="Preview Output",
+                                                       variable=self.output_preview_var,
+                                                       command=self.toggle_output_preview,
+                                                       font=(BUTTON_FONT, 9), checkbox_width=17, checkbox_height=17)
+        self.output_preview_checkbox.place(x=320, y=104)
+
         # Open Sample PDF Button
         self.open_sample_button = ctk.CTkButton(self.root, text="Open PDF", command=self.open_sample_pdf,
                                                 font=(BUTTON_FONT, 9),
@@ -84,27 +109,12 @@ class ReidactorGUI:
         self.include_subfolders_checkbox.place(x=192, y=34)
 
 
-        # Areas Treeview setup
+        # Areas list setup; only its visible rows exist, however many areas there are
         self.areas_frame = ctk.CTkFrame(self.root, height=1, width=200, border_width=0)
         self.areas_frame.place(x=-425, y=-10)
 
-        self.areas_tree = EditableTreeview(
-            self,
-            self.areas_frame,
-            columns=("Title", "x0", "y0", "x1", "y1"),  # Ensure "Title" is included
-            show="headings",
-            height=3
-        )
-
-        # Set up static headers and fixed column widths
-        self.areas_tree.heading("Title", text="Title")
-        self.areas_tree.column("Title", width=50, anchor="center")
-        for col in ("x0", "y0", "x1", "y1"):
-            self.areas_tree.heading(col, text=col)
-            self.areas_tree.column(col, width=45, anchor="center")
-
-        # Pack the Treeview into the frame
-        self.areas_tree.pack(side="left")
+        self.areas_list = AreaList(self.areas_frame, self.pdf_viewer.areas,
+                                   on_edit=self.pdf_viewer.edit_area, on_remove=self.pdf_viewer.remove_area)
 
         # Import, Export, and Clear Areas Buttons
         self.import_button = ctk.CTkButton(self.root, text="Import", command=self.import_from_excel,
@@ -119,6 +129,10 @@ class ReidactorGUI:
                                                 font=(BUTTON_FONT, 8.5), width=55, height=7)
         self.clear_areas_button.place(x=890, y=73)
 
+        self.thumbnails_button = ctk.CTkButton(self.root, text="Thumbs", command=self.show_thumbnails,
+                                               font=(BUTTON_FONT, 8.5), width=55, height=7)
+        self.thumbnails_button.place(x=890, y=93)
+
         # Modes
         self.mode_label = ctk.CTkLabel(self.root, text="MODE:", font=(BUTTON_FONT, 9))
         self.mode_label.place(x=337, y=0)
@@ -136,11 +150,13 @@ class ReidactorGUI:
         self.font_label.place(x=420, y=13)
 
         self.font_style_var = StringVar(value="Helvetica")  # Default font
-        self.font_styles = list(pymupdf.Base14_fontdict.values())  # Base-14 font styles
+        self.current_font = "Helvetica"  # Restored when adding a font file is cancelled
+        self.font_styles = list(BASE14_FONTS)  # Base-14 font styles, then any font files added
         self.font_style_menu = ctk.CTkOptionMenu(
             self.root, dynamic_resizing=False,
-            values=self.font_styles,
+            values=self.font_styles + [CUSTOM_FONT_OPTION],
             variable=self.font_style_var,
+            command=self.on_font_selected,
             font=(BUTTON_FONT, 9),
             width=88,
             height=18
@@ -213,6 +229,18 @@ class ReidactorGUI:
                                             corner_radius=10, width=75, height=55, command=self.start_processing)
         self.extract_button.place(x=793, y=35)
 
+        # Verify Output Checkbox
+        self.verify_output_var = ctk.IntVar()
+        self.verify_output_checkbox = ctk.CTkCheckBox(self.root, text="Verify Output",
+                                                      variable=self.verify_output_var,
+                                                      font=(BUTTON_FONT, 9), checkbox_width=17, checkbox_height=17)
+        self.verify_output_checkbox.place(x=785, y=94)
+
+        # Data Merge Button
+        self.data_merge_button = ctk.CTkButton(self.root, text="Data Merge", command=self.load_data_merge,
+                                               font=(BUTTON_FONT, 8.5), width=65, height=7)
+        self.data_merge_button.place(x=705, y=97)
+
 
         # Version Label with Tooltip
         self.version_label = ctk.CTkLabel(self.root, text=VERSION_TEXT, fg_color="transparent",
@@ -231,7 +259,7 @@ class ReidactorGUI:
         if export_file_path:
             try:
                 with open(export_file_path, 'w', encoding='utf-8') as json_file:
-                    json.dump(self.pdf_viewer.areas, json_file, indent=4)
+                    json.dump(self.pdf_viewer.areas.to_list(), json_file, indent=4)
                 print(f"Exported areas to {export_file_path}")
             except Exception as e:
                 messagebox.showerror("Export Error", f"Could not export areas: {e}")
@@ -246,18 +274,15 @@ class ReidactorGUI:
             try:
                 with open(import_file_path, 'r') as json_file:
                     imported_areas = json.load(json_file)
-                self.pdf_viewer.areas = imported_areas  # Update the areas in the PDF viewer
-                self.pdf_viewer.update_rectangles()  # Refresh the rectangles on the canvas
-                self.pdf_viewer.update_display(force_redraw=True)
-                self.update_areas_treeview()  # Refresh the Treeview to show imported areas
+                self.pdf_viewer.areas.replace(imported_areas)  # Update the areas in the PDF viewer
+                self.pdf_viewer.refresh_overlays()  # Redraws the overlays and area list; the page image is kept
                 print(f"Imported areas from {import_file_path}")
             except Exception as e:
                 messagebox.showerror("Import Error", f"Could not import areas: {e}")
 
     def clear_all_areas(self):
         """Clears all areas and updates the display."""
-        self.pdf_viewer.clear_areas()  # Clear areas from the PDF viewer
-        self.areas_tree.delete(*self.areas_tree.get_children())  # Clear all entries in the Treeview
+        self.pdf_viewer.clear_areas()  # Clear areas from the PDF viewer, along with their list rows
         print("All areas cleared.")
 
     def export_to_excel(self):
@@ -272,40 +297,8 @@ class ReidactorGUI:
             return  # User canceled the save dialog
 
         try:
-            # Create a new Excel workbook
-            wb = Workbook()
-
-            # Add Deletion Areas sheet
-            ws_deletion = wb.active
-            ws_deletion.title = "Deletion Areas"
-            ws_deletion.append(["X0", "Y0", "X1", "Y1", "Title"])  # Headers
-            for area in self.pdf_viewer.areas:
-                coordinates = area["coordinates"]
-                title = area.get("title", "Untitled")
-                ws_deletion.append(coordinates + [title])
-
-            # Add Insertion Points sheet
-            ws_insertion = wb.create_sheet(title="Insertion Points")
-            ws_insertion.append(["X", "Y", "Text", "Font", "Size"])  # Headers
-            for point in self.pdf_viewer.insertion_points:
-                ws_insertion.append([
-                    point["position"][0],
-                    point["position"][1],
-                    point["text"],
-                    point["font"],
-                    point["size"]
-                ])
-
-            # Add Table and Revision Areas sheet
-            ws_table_revision = wb.create_sheet(title="Table and Revision Areas")
-            ws_table_revision.append(["Type", "X0", "Y0", "X1", "Y1"])  # Headers
-            if self.pdf_viewer.table_coordinates:
-                ws_table_revision.append(["Table"] + self.pdf_viewer.table_coordinates)
-            if self.pdf_viewer.rev_coordinates:
-                ws_table_revision.append(["Revision"] + self.pdf_viewer.rev_coordinates)
-
-            # Save the workbook
-            wb.save(export_file_path)
+            save_template(export_file_path, self.pdf_viewer.areas.to_list(), self.pdf_viewer.insertion_points,
+                          self.pdf_viewer.table_coordinates, self.pdf_viewer.rev_coordinates)
             print(f"Exported to Excel at {export_file_path}")
             messagebox.showinfo("Export Successful",
                                 "Areas, insertion points, and coordinates have been exported to Excel.")
@@ -324,56 +317,20 @@ class ReidactorGUI:
             return  # User canceled the open dialog
 
         try:
-            # Load the Excel workbook
-            wb = load_workbook(import_file_path)
-
-            # Read Deletion Areas
-            if "Deletion Areas" in wb.sheetnames:
-                ws_deletion = wb["Deletion Areas"]
-                self.pdf_viewer.areas = []  # Clear existing deletion areas
-
-                for row in ws_deletion.iter_rows(min_row=2, values_only=True):  # Skip the header row
-                    x0, y0, x1, y1, title = row
-                    self.pdf_viewer.areas.append({
-                        "coordinates": [x0, y0, x1, y1],
-                        "title": title
-                    })
-
-            # Read Insertion Points
-            if "Insertion Points" in wb.sheetnames:
-                ws_insertion = wb["Insertion Points"]
-                self.pdf_viewer.insertion_points = []  # Clear existing insertion points
-
-                for row in ws_insertion.iter_rows(min_row=2, values_only=True):  # Skip the header row
-                    x, y, text, font, size = row
-                    self.pdf_viewer.insertion_points.append({
-                        "position": [x, y],
-                        "text": text,
-                        "font": font,
-                        "size": int(size) if size else 12  # Default size if missing
-                    })
-
-            # Read Table and Revision Areas
-            if "Table and Revision Areas" in wb.sheetnames:
-                ws_table_revision = wb["Table and Revision Areas"]
-
-                # Check if the sheet has at least one row of data
-                rows = list(ws_table_revision.iter_rows(min_row=2, values_only=True))  # Skip the header row
-                if rows:
-                    for row in rows:
-                        if any(row):  # Skip empty rows
-                            area_type, x0, y0, x1, y1 = row
-                            if area_type == "Table":
-                                self.pdf_viewer.table_coordinates = [x0, y0, x1, y1]
-                            elif area_type == "Revision":
-                                self.pdf_viewer.rev_coordinates = [x0, y0, x1, y1]
-                else:
-                    print("Table and Revision Areas sheet is blank. Skipping update.")
-
-            # Refresh the canvas and Treeview
-            self.pdf_viewer.update_rectangles()
-            self.pdf_viewer.update_display(force_redraw=True)
-            self.update_areas_treeview()
+            template = load_template(import_file_path)
+
+            # Sections missing from the file keep their current values
+            if template["areas"] is not None:
+                self.pdf_viewer.areas.replace(template["areas"])
+            if template["insertion_points"] is not None:
+                self.pdf_viewer.insertion_points = template["insertion_points"]
+            if template["table_coordinates"] is not None:
+                self.pdf_viewer.table_coordinates = template["table_coordinates"]
+            if template["rev_coordinates"] is not None:
+                self.pdf_viewer.rev_coordinates = template["rev_coordinates"]
+
+            # Refresh the overlays and area list; the page image is kept
+            self.pdf_viewer.refresh_overlays()
 
             print(f"Imported areas, insertion points, and coordinates from {import_file_path}")
             messagebox.showinfo("Import Successful",
@@ -382,30 +339,89 @@ class ReidactorGUI:
             print(f"Error importing from Excel: {e}")
             messagebox.showerror("Import Error", f"An error occurred while importing from Excel: {e}")
 
-    def update_areas_treeview(self):
-        """Refreshes the Treeview to display the current areas and their titles."""
+    def load_data_merge(self):
+        """Loads a CSV or xlsx of per-file values for {{column}} placeholders in the insertion text."""
+        path = filedialog.askopenfilename(filetypes=[("Data files", "*.csv *.xlsx"), ("All files", "*.*")],
+                                          title="Data Merge")
+        if not path:
+            if self.data_merge is not None and messagebox.askyesno("Data Merge", "Stop using the current data merge?"):
+                self.data_merge = None
+                self.data_merge_button.configure(text="Data Merge")
+                self.pdf_viewer.schedule_preview()
+            return
 
-        # Clear existing entries
-        self.areas_tree.delete(*self.areas_tree.get_children())
+        from backend.data_merge import MergeTable, read_table
 
-        # Insert each area with its title and coordinates into the Treeview and keep track of each item ID
-        self.treeview_item_ids = {}  # Dictionary to track Treeview item IDs to canvas rectangle IDs
+        try:
+            columns, rows = read_table(path)
+            key_column = simpledialog.askstring(
+                "Data Merge", f"Column holding the key ({', '.join(columns)}):", initialvalue=columns[0])
+            if key_column is None:
+                return
+            key_area = simpledialog.askstring(
+                "Data Merge", "Title of the template area to read the key from (blank: match file names):")
+            if key_area is None:
+                return
+            self.data_merge = MergeTable(columns, rows, key_column.strip(), key_area.strip() or None,
+                                         (path, os.path.getmtime(path)))
+        except Exception as e:
+            messagebox.showerror("Data Merge", f"Could not load {path}: {e}")
+            return
 
-        for index, area in enumerate(self.pdf_viewer.areas):
-            coordinates = area["coordinates"]
-            title = area["title"]
-            # Insert row into the Treeview and get its item ID
-            item_id = self.areas_tree.insert("", "end", values=(title, *coordinates))
-            # Store the item ID associated with the canvas rectangle index
-            self.treeview_item_ids[item_id] = index
+        self.data_merge_button.configure(text=f"Merge: {len(self.data_merge)}")
+        self.pdf_viewer.schedule_preview()
+        source = f"the text in area '{self.data_merge.key_area}'" if self.data_merge.key_area else "the file name"
+        messagebox.showinfo("Data Merge",
+                            f"{len(self.data_merge)} rows keyed by '{self.data_merge.key_column}', matched by {source}."
+                            + (f"\n{self.data_merge.duplicates} rows with repeated keys were ignored."
+                               if self.data_merge.duplicates else "")
+                            + "\n\nUse {{column}} in insertion text to insert a value.")
+
+    def on_font_selected(self, choice):
+        """Adds a TrueType/OpenType file to the font menu when "Font file..." is chosen."""
+        if choice != CUSTOM_FONT_OPTION:
+            self.current_font = choice
+            return
+        path = filedialog.askopenfilename(filetypes=[("Font files", "*.ttf *.otf"), ("All files", "*.*")],
+                                          title="Insertion Font")
+        if not path:
+            self.font_style_var.set(self.current_font)
+            return
+        try:
+            from backend.fonts import load_font
+            load_font(path)
+        except Exception as e:
+            messagebox.showerror("Font Error", f"Could not load {path}: {e}")
+            self.font_style_var.set(self.current_font)
+            return
+        if path not in self.font_styles:
+            self.font_styles.append(path)
+            self.font_style_menu.configure(values=self.font_styles + [CUSTOM_FONT_OPTION])
+        self.font_style_var.set(path)
+        self.current_font = path
+
+    def refresh_area_list(self):
+        """Redraws the visible rows of the area list from the area store."""
+        self.areas_list.refresh()
 
     def open_sample_pdf(self):
         # Opens a file dialog to select a PDF file, then displays it in the PDFViewer
         pdf_path = filedialog.askopenfilename(filetypes=[("PDF files", "*.pdf")])
         if pdf_path:
-            self.pdf_viewer.display_pdf(pdf_path)
-            self.recent_pdf_path = pdf_path  # Store the recent PDF path
-            print(f"Opened sample PDF: {pdf_path}")
+            self.load_pdf(pdf_path)
+
+    def load_pdf(self, pdf_path):
+        """Displays a PDF in the viewer and remembers it as the recent PDF."""
+        self.pdf_viewer.display_pdf(pdf_path)
+        self.recent_pdf_path = pdf_path  # Store the recent PDF path
+        print(f"Opened sample PDF: {pdf_path}")
+
+    def show_thumbnails(self):
+        """Opens the thumbnail strip for the selected PDF folder."""
+        if not self.pdf_folder or not os.path.isdir(self.pdf_folder):
+            messagebox.showinfo("Info", "Select a folder with PDFs first.")
+            return
+        self.thumbnail_strip.show_folder(self.pdf_folder, self.include_subfolders)
 
     def open_recent_pdf(self):
         """Opens the most recently viewed PDF."""
@@ -418,34 +434,36 @@ class ReidactorGUI:
     def close_pdf(self):
         """Delegates PDF closing to the PDF viewer."""
         self.pdf_viewer.close_pdf()
+        self.update_page_label(0, 0)
 
-    def remove_row(self):
-        """Removes the selected row from the Treeview and updates the canvas to remove the associated rectangle."""
-        selected_item = self.areas_tree.selection()
-        if selected_item:
-            # Get the rectangle index associated with the selected Treeview item
-            index = self.treeview_item_ids.get(selected_item[0])
-            if index is not None:
-                # Remove the rectangle from the canvas
-                rectangle_id = self.pdf_viewer.rectangle_list[index]
-                self.pdf_viewer.canvas.delete(rectangle_id)
-                # Remove the area from PDFViewer's areas and rectangle_list
-                del self.pdf_viewer.areas[index]
-                del self.pdf_viewer.rectangle_list[index]
-
-                # Remove the item from Treeview
-                self.areas_tree.delete(selected_item[0])
-
-                # Update Treeview and canvas display
-                self.update_areas_treeview()
-                self.pdf_viewer.update_rectangles()
-
-                print("Removed rectangle at index", index)
+    def update_page_label(self, page_number, page_count):
+        """Shows the current page (1-based) and the page count next to the navigation buttons."""
+        self.page_entry.delete(0, ctk.END)
+        if page_count:
+            self.page_entry.insert(0, str(page_number + 1))
+        self.page_count_label.configure(text=f"/ {page_count}")
+
+    def go_to_page(self, event=None):
+        """Jumps to the page number typed into the page entry."""
+        try:
+            page_number = int(self.page_entry.get()) - 1
+        except ValueError:
+            page_number = -1
+        if 0 <= page_number < self.pdf_viewer.page_count:
+            self.pdf_viewer.show_page(page_number)
+        else:
+            # Restore the entry to the page actually shown
+            self.update_page_label(self.pdf_viewer.page_number, self.pdf_viewer.page_count)
 
     def setup_bindings(self):
         self.pdf_folder_entry.bind("<KeyRelease>", self.update_pdf_folder)
         self.output_path_entry.bind("<KeyRelease>", self.update_output_path)
         self.root.bind("<Configure>", self.on_window_resize)
+        self.page_entry.bind("<Return>", self.go_to_page)
+        self.root.bind("<Prior>", lambda event: self.pdf_viewer.previous_page())  # Page Up
+        self.root.bind("<Next>", lambda event: self.pdf_viewer.next_page())  # Page Down
+        self.date_entry.bind("<KeyRelease>", lambda event: self.pdf_viewer.schedule_preview())
+        self.description_entry.bind("<KeyRelease>", lambda event: self.pdf_viewer.schedule_preview())
 
     def toggle_revision_updater(self):
         """Enables or disables the revision updater mode."""
@@ -457,6 +475,10 @@ class ReidactorGUI:
         self.date_entry.configure(state=state)  # Enable/disable Date entry
         self.description_entry.configure(state=state)
 
+    def toggle_output_preview(self):
+        """Shows the sample page as the batch will write it, or the original page."""
+        self.pdf_viewer.set_output_preview(self.output_preview_var.get() == 1)
+
     def toggle_text_mode(self):
         self.pdf_viewer.set_mode(TEXT_MODE)
 
@@ -496,12 +518,17 @@ class ReidactorGUI:
     def setup_tooltips(self):
         create_tooltip(self.pdf_folder_entry, "Select the main folder containing PDF files")
         create_tooltip(self.open_sample_button, "Open a sample PDF to set areas")
+        create_tooltip(self.page_entry, "Page shown; type a number and press Enter to jump (PgUp/PgDn to flip)")
+        create_tooltip(self.output_preview_checkbox, "Show this page as it will be written: redactions, inserted text and revision applied")
         create_tooltip(self.output_path_entry, "Select folder for the Excel output")
         create_tooltip(self.include_subfolders_checkbox, "Include files from subfolders for extraction")
         create_tooltip(self.extract_button, "Start the extraction process")
+        create_tooltip(self.data_merge_button, "Load a CSV or Excel file of per-drawing values for {{column}} placeholders in the insertion text")
+        create_tooltip(self.verify_output_checkbox, "Re-open each output and check no text is left in the areas and the inserted text is present")
         create_tooltip(self.import_button, "Import a saved template of selected areas")
         create_tooltip(self.export_button, "Export the selected areas as a template")
         create_tooltip(self.clear_areas_button, "Clear all selected areas")
+        create_tooltip(self.thumbnails_button, "Browse thumbnails of the PDF folder; click one to open it")
 
     def browse_pdf_folder(self):
         self.pdf_folder = filedialog.askdirectory()
@@ -539,23 +566,18 @@ class ReidactorGUI:
 
         self.pdf_viewer.close_pdf()
 
-        # Setup progress window
-        self.progress_window = ctk.CTkToplevel(self.root)
-        self.progress_window.title("Progress")
-        self.progress_window.geometry("300x120")
-
-        # Add a progress label
-        self.progress_label = ctk.CTkLabel(self.progress_window, text="Processing PDFs...")
-        self.progress_label.pack(pady=5)
-
-        # Add a total files label
-        self.total_files_label = ctk.CTkLabel(self.progress_window, text="Total files: 0")
-        self.total_files_label.pack(pady=5)
-
-        self.progress_var = ctk.DoubleVar(value=0)
-        self.progress_bar = ctk.CTkProgressBar(self.progress_window, variable=self.progress_var,
-                                               orientation="horizontal", width=250)
-        self.progress_bar.pack(pady=10)
+        if self.pending_batch:
+            processor, remaining = self.pending_batch
+            answer = messagebox.askyesnocancel(
+                "Resume Batch",
+                f"The last batch was cancelled with {len(remaining)} files not processed.\n\n"
+                "Yes: resume it with its original settings.\nNo: start a new batch with the current settings.")
+            if answer is None:
+                return
+            self.pending_batch = None
+            if answer:
+                self.run_batch(processor, remaining)
+                return
 
         # Fetch the Date and Description values from the text boxes
         date_value = self.date_entry.get()
@@ -568,81 +590,94 @@ class ReidactorGUI:
                                      "Please provide both Date and Description for the revision updater.")
                 return
 
-        manager = multiprocessing.Manager()
-        progress_list = manager.list()
-        total_files = manager.Value('i', 0)
+        if self.data_merge is not None:
+            missing = self.data_merge.missing_columns(self.pdf_viewer.insertion_points)
+            if missing:
+                messagebox.showerror("Data Merge",
+                                     f"The data merge file has no column {', '.join(missing)} used in the insertion text.")
+                return
+            if self.data_merge.key_area and self.data_merge.key_area not in self.pdf_viewer.areas.titles:
+                messagebox.showerror("Data Merge",
+                                     f"No area titled '{self.data_merge.key_area}' to read the data merge key from.")
+                return
+
+        from backend.pdf_processor import PDFProcessor  # The processing engine loads on first use
+        from backend.fonts import is_font_file
 
-        processor1 = PDFProcessor(
+        missing_fonts = sorted({point["font"] for point in self.pdf_viewer.insertion_points
+                                if is_font_file(point["font"]) and not os.path.isfile(point["font"])})
+        if missing_fonts:
+            messagebox.showerror("Font Error", "Font file not found:\n" + "\n".join(missing_fonts))
+            return
+
+        processor = PDFProcessor(
             pdf_folder=self.pdf_folder,
             output_excel_path=self.output_excel_path,
-            areas=self.pdf_viewer.areas,
+            areas=self.pdf_viewer.areas.to_list(),
             insertion_points=self.pdf_viewer.insertion_points,
             include_subfolders=self.include_subfolders,
             table_coordinates=self.pdf_viewer.table_coordinates,
             rev_coordinates=self.pdf_viewer.rev_coordinates,
             revision_date=date_value,
-            revision_description=description_value
+            revision_description=description_value,
+            verify_output=self.verify_output_var.get() == 1,
+            collect_metrics=COLLECT_METRICS,
+            data_merge=self.data_merge,
+            subset_fonts=SUBSET_FONTS
         )
 
-        processor1.setup_logging()
-        log_file = processor1.log_file
-        print(f"Logs are being saved to: {log_file}")
-
-        manager = multiprocessing.Manager()
-        progress_list = manager.list()
-        error_files = manager.list()  # Track files with errors
-        total_files = manager.Value('i', 0)
-
-        pdf_files = processor1.get_pdf_files()
-        total_files.value = len(pdf_files)
-
+        pdf_files = processor.get_pdf_files()
         if not pdf_files:
             messagebox.showinfo("No Files", "No PDF files found in the selected folder.")
-            self.progress_window.destroy()
             return
 
-        pool = multiprocessing.Pool()
-        process_func = partial(processor1.process_single_pdf, log_file=log_file, error_files=error_files, progress_list=progress_list)
-        pool.map_async(process_func, pdf_files)
+        self.run_batch(processor, pdf_files)
 
-        self.root.after(100, self.update_progress, progress_list, total_files, error_files, pool)
+    def run_batch(self, processor, pdf_files):
+        """Processes `pdf_files` in the background behind a progress dashboard."""
+        from backend.batch_runner import BatchRunner
 
-    def update_progress(self, progress_list, total_files, error_files, pool):
-        try:
-            if total_files.value > 0:
-                current_progress = len(progress_list) / total_files.value
-                self.progress_var.set(current_progress)
-
-                progress_text = f"Processed {len(progress_list)} of {total_files.value} files."
-                self.total_files_label.configure(text=progress_text)
-
-            if not pool._cache:  # All tasks complete
-                self.progress_var.set(1)
-                self.progress_window.destroy()
-
-                # Calculate elapsed time
-                end_time = time.time()
-                elapsed_time = end_time - self.start_time
-                formatted_time = time.strftime("%H:%M:%S", time.gmtime(elapsed_time))
-
-                # Summary message
-                error_count = len(error_files)
-                summary_message = (
-                        f"Total Files Processed: {total_files.value}\n"
-                        f"Files with Errors: {error_count}\n"
-                        f"Time Elapsed: {formatted_time}\n\n"
-                        "Files with Errors:\n" + "\n".join(error_files)
-                )
-
-                # Display summary and open log file
-                messagebox.showinfo("Processing Summary", summary_message)
-                print(f"Processing completed. Logs saved to {processor1.log_file}.")
-                os.startfile(processor1.log_file)
-
-            else:
-                self.root.after(100, self.update_progress, progress_list, total_files, error_files, pool)
-        except Exception as e:
-            print(f"Error updating progress: {e}")
+        processor.setup_logging()  # A resumed batch keeps the log and metrics files of its first run
+        self.log_file = processor.log_file
+        self.metrics_file = processor.metrics_file
+        print(f"Logs are being saved to: {self.log_file}")
+
+        runner = BatchRunner(processor, pdf_files, self.log_file)
+        self.progress_dashboard = ProgressDashboard(self.root, runner, on_finished=self.show_processing_summary)
+        self.progress_dashboard.start()
+
+    def show_processing_summary(self, runner):
+        """Summary dialog, metrics summary and log file once a batch is over."""
+        from backend.metrics import summarize_metrics, format_summary, write_summary
+
+        stats = runner.stats
+        formatted_time = time.strftime("%H:%M:%S", time.gmtime(time.time() - self.start_time))
+        summary_message = (
+                f"Total Files Processed: {stats.done_files} of {stats.total_files} ({stats.pages} pages)\n"
+                f"Files with Errors: {len(stats.error_files)}\n"
+                f"Time Elapsed: {formatted_time}\n\n"
+                "Files with Errors:\n" + "\n".join(stats.error_files)
+        )
+        if stats.cancelled:
+            remaining = runner.remaining_files()
+            self.pending_batch = (runner.processor, remaining) if remaining else None
+            summary_message = (f"Batch cancelled. {len(remaining)} files were not processed; "
+                               "click PROCESS to resume them.\n\n" + summary_message)
+        if self.verify_output_var.get() == 1:
+            failed_files = {path for path, _, _ in stats.verification_failures}
+            summary_message += f"\n\nFiles Failing Verification: {len(failed_files)}\n" + "\n".join(
+                f"{os.path.basename(path)} p.{page}: {message}"
+                for path, page, message in stats.verification_failures[:20])
+
+        if self.metrics_file and os.path.exists(self.metrics_file):
+            metrics_summary = summarize_metrics(self.metrics_file)
+            print(format_summary(metrics_summary))
+            print(f"Run metrics saved to {write_summary(metrics_summary, self.metrics_file)}")
+
+        # Display summary and open log file
+        messagebox.showinfo("Processing Summary", summary_message)
+        print(f"Processing completed. Logs saved to {self.log_file}.")
+        open_path(self.log_file)
 
     def on_window_resize(self, event):
         """Handles window resizing and adjusts the canvas dimensions."""
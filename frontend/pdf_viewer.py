@@ -1,14 +1,35 @@
 # pdf_viewer.py
 
+import copy
+import logging
+import os
+import queue
+
 import fitz  # PyMuPDF
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import Menu
 from backend.constants import *
+from frontend.tile_cache import TileCache, quantize_zoom
+from frontend.render_worker import RenderWorker, PRIORITY_PREFETCH, raster_to_image
+from backend.utils import project_area_to_page
+from backend.spatial_index import GridIndex
+from backend.area_store import AreaStore
+from backend.output_preview import stage_keys
+from backend.fonts import is_font_file, load_font
 from tkinter.simpledialog import askstring  # For custom title input
 import tkinter.font as tkfont
+from PIL import ImageTk
 scroll_counter = 0
 
+# Canvas options for each kind of overlay rectangle
+OVERLAY_STYLES = {
+    "area": {"outline": "red", "width": 2, "dash": ()},
+    "off_sheet": {"outline": "gray50", "width": 2, "dash": (6, 4)},  # Area running off the current sheet
+    "table": {"outline": "blue", "width": 2, "dash": (20, 5)},
+    "revision": {"outline": "green", "width": 2, "dash": (4, 2)},
+}
+
 class PDFViewer:
     def __init__(self, parent, master):
         self.parent = parent
@@ -33,15 +54,49 @@ class PDFViewer:
         self.pdf_document = None
         self.page = None
         self.current_zoom = CURRENT_ZOOM
-        self.areas = []
-        self.rectangle_list = []
+        self.areas = AreaStore()
+
+        # Overlay model: each canvas rectangle is keyed by its area's uid in the store, so an edit
+        # only adds, moves or removes the items that actually changed
+        self.overlays = {}  # {uid: {"item", "drawn", "style"}}; "table"/"revision" for those boxes
+        self._overlay_geometry = None  # (zoom, page size) the overlays were last positioned for
+        self.overlay_index = GridIndex()  # Overlay geometry in PDF points, keyed by the same uids
 
         self.original_coordinates = None
-        self.canvas_image = None  # Holds the current PDF page image to prevent garbage collection
         self.resize_job = None  # Track the delayed update job
 
         self._last_pixmap_zoom = None  # cache for throttling redraw
 
+        # Tiled rendering state
+        # {(doc key, page number, zoom, col, row): PhotoImage}, shared by every file opened this session
+        self.tile_cache = TileCache(TILE_CACHE_BYTES, on_evict=self._recycle_image)
+        self.doc_key = None  # (path, mtime) of the open file, so an edited file is never served stale tiles
+        self.source_doc_key = None  # doc_key of the file itself; doc_key names the processed page while previewing
+        self.page_number = 0
+        self.pdf_path = None
+        self.prefetched_generation = None  # Generation whose neighbouring pages were already queued
+        self.spare_images = []  # Evicted PhotoImages whose Tk buffers are reused for new tiles
+        self.tile_items = {}  # {(col, row): canvas image item} for tiles currently on the canvas
+        self.tile_refresh_job = None  # Pending idle callback that fills in visible tiles
+
+        # Background rendering state
+        self.render_worker = RenderWorker()
+        self.render_worker.start()
+        self.render_generation = 0  # Results tagged with an older generation are discarded
+        self.page_generation = 0  # Generation in which the current page was opened; tags its overview
+        self.pending_tiles = set()  # Tile cache keys requested from the worker but not yet received
+        self.overview = None  # (scale, greyscale PIL image) of the whole page, used for instant previews
+        self.awaiting_overview = False
+        self.placeholder_images = {}  # {(col, row): PhotoImage} scaled-up overview crops shown until tiles arrive
+        self.render_poll_job = None
+        self.zoom_settle_job = None  # Pending full-quality render once zoom input stops
+        self.interim_image = None  # Scaled overview shown over the viewport while zooming
+
+        # Output preview: the page is shown as the batch would write it
+        self.preview_output = False
+        self.preview_job = None  # Pending re-run of the pipeline once template edits pause
+        self.preview_request = None  # (path, page, stage keys) last sent to the worker
+
         # Initialize selected rectangle ID and title dictionary
         self.selected_rectangle = None
         self.selected_rectangle_id = None
@@ -84,12 +139,15 @@ class PDFViewer:
 
         # Initialize selection state
         self.selected_rectangle_id = None
-        self.selected_rectangle_index = None
+        self.selected_uid = None  # Overlay uid of the selection: an area uid, "table" or "revision"
         self.selected_rectangle_original_color = "red"  # Default color for rectangles
 
         self._prev_canvas_w = CANVAS_WIDTH
         self._prev_canvas_h = CANVAS_HEIGHT
 
+        # Any change of the visible region (scrollbars, wheel, auto-scroll) reports through these callbacks
+        self.canvas.config(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
+
         # Scroll and zoom events
         self.canvas.bind("<MouseWheel>", self.handle_mousewheel)
         self.canvas.bind("<Shift-MouseWheel>", self.handle_mousewheel)  # Shift for horizontal scroll
@@ -102,6 +160,15 @@ class PDFViewer:
     def _get_tk_font(self, pdf_name: str, pixel_h: int):
         """Return a Tk font whose *pixel* height equals `pixel_h`."""
         base, w, s = "Helvetica", "normal", "roman"
+        if is_font_file(pdf_name):
+            # Tk cannot load a font file; use its family if installed, Helvetica otherwise
+            try:
+                font = load_font(pdf_name)
+            except Exception:
+                return tkfont.Font(family=base, size=-pixel_h)
+            return tkfont.Font(family=font.name, size=-pixel_h,
+                               weight="bold" if font.is_bold else "normal",
+                               slant="italic" if font.is_italic else "roman")
         p = pdf_name.split("-")
         if p:
             base = p[0]
@@ -186,6 +253,7 @@ class PDFViewer:
 
             # Display the text on the canvas
             self._draw_preview(self.insertion_points[-1])
+            self.schedule_preview()
 
 
     def set_custom_title(self):
@@ -210,18 +278,30 @@ class PDFViewer:
 
     def zoom_in(self, increment=0.1):
         """Zoom in by increasing the current zoom level and refreshing the display."""
-        self.current_zoom += increment
-        self.update_display(force_redraw=True)
+        self.set_zoom(self.current_zoom + increment)
 
     def zoom_out(self, decrement=0.1):
         """Zoom out by decreasing the current zoom level and refreshing the display."""
-        self.current_zoom = max(0.1, self.current_zoom - decrement)  # Prevent excessive zooming out
-        self.update_display(force_redraw=True)
+        self.set_zoom(max(0.1, self.current_zoom - decrement))  # Prevent excessive zooming out
 
     def close_pdf(self):
         """Closes the displayed PDF and clears the canvas."""
         # Remove any displayed image from the canvas
         self.canvas.delete("pdf_image")
+        self.tile_items.clear()
+        self.tile_cache.clear()
+        self.placeholder_images.clear()
+        self.pending_tiles.clear()
+        self.overview = None
+        self.awaiting_overview = False
+        self.render_worker.close_document()
+        if self.zoom_settle_job:
+            self.canvas.after_cancel(self.zoom_settle_job)
+            self.zoom_settle_job = None
+        if self.preview_job:
+            self.canvas.after_cancel(self.preview_job)
+            self.preview_job = None
+        self.preview_request = None
 
         # Close the PDF document if it is open
         if self.pdf_document:
@@ -230,16 +310,16 @@ class PDFViewer:
 
         # Reset the pdf_document attribute to None to indicate no PDF is open
         self.pdf_document = None
+        self.page = None
 
     def display_pdf(self, pdf_path):
         """Loads and displays the first page of a PDF document."""
         self.pdf_document = fitz.open(pdf_path)
+        self.pdf_path = pdf_path
+        self.source_doc_key = self.doc_key = (pdf_path, os.path.getmtime(pdf_path))
+        self.render_worker.close_document()  # Fresh handle, in case the file changed on disk
         if self.pdf_document.page_count > 0:
-            self.page = self.pdf_document[0]  # Display the first page by default
-            self.pdf_width = int(self.page.rect.width)
-            self.pdf_height = int(self.page.rect.height)
-            # Update the display
-            self.update_display(force_redraw=True)
+            self.show_page(0)  # Display the first page by default
             # Set the initial view to the top-left corner of the PDF
             self.canvas.xview_moveto(0)  # Horizontal scroll to start
             self.canvas.yview_moveto(0)  # Vertical scroll to start
@@ -247,6 +327,90 @@ class PDFViewer:
             self.pdf_document = None
             print("Error: PDF has no pages.")
 
+    @property
+    def page_count(self):
+        return self.pdf_document.page_count if self.pdf_document else 0
+
+    def show_page(self, page_number):
+        """Displays another page of the open document, keeping the zoom and scroll position."""
+        if not self.pdf_document or not 0 <= page_number < self.pdf_document.page_count:
+            return
+        self.page_number = page_number
+        self.page = self.pdf_document[page_number]
+        self.pdf_width = int(self.page.rect.width)
+        self.pdf_height = int(self.page.rect.height)
+        self.canvas.delete("pdf_image")
+        self.tile_items.clear()
+        self.overview = None
+
+        self._load_page_in_worker()
+
+        # Update the display
+        self.update_display(force_redraw=True)
+        self.parent.update_page_label(page_number, self.pdf_document.page_count)
+
+    def _load_page_in_worker(self):
+        """Opens the current page in the render worker, as is or run through the processing pipeline."""
+        # The render process has its own handle; ours is only read for geometry
+        self.render_generation = self.page_generation = self.render_worker.next_generation()
+        if self.preview_output:
+            template = self._preview_template()
+            self.preview_request = (self.pdf_path, self.page_number, stage_keys(template))
+            # No tiles may be requested until the worker holds the processed page, or they would be
+            # rendered from the previous document and cached under the wrong key
+            self.doc_key = None
+            self.render_worker.request_preview(self.pdf_path, self.page_number, template, self.page_generation)
+        else:
+            self.preview_request = None
+            self.doc_key = self.source_doc_key
+            self.render_worker.open_page(self.pdf_path, self.page_number, self.page_generation)
+        self.awaiting_overview = True
+        self._start_render_polling()
+
+    def _preview_template(self):
+        """Snapshot of everything process_single_pdf reads, to hand to the render process."""
+        template = copy.deepcopy({
+            "areas": self.areas.to_list(),
+            "insertion_points": self.insertion_points,
+            "table_coordinates": self.table_coordinates,
+            "rev_coordinates": self.rev_coordinates,
+            "revision_date": self.parent.date_entry.get(),
+            "revision_description": self.parent.description_entry.get(),
+        })
+        template["data_merge"] = self.parent.data_merge  # Read-only; pickled for the render process, so not copied
+        return template
+
+    def set_output_preview(self, enabled):
+        """Switches between the original page and a preview of what the batch will write for it."""
+        self.preview_output = enabled
+        if self.preview_job:
+            self.canvas.after_cancel(self.preview_job)
+            self.preview_job = None
+        if self.page:
+            self._load_page_in_worker()
+            if not enabled:
+                self.update_display(force_redraw=True)
+
+    def schedule_preview(self):
+        """Re-runs the output preview shortly after the template stops changing."""
+        if not self.preview_output or not self.page:
+            return
+        if self.preview_job:
+            self.canvas.after_cancel(self.preview_job)
+        self.preview_job = self.canvas.after(PREVIEW_SETTLE_DELAY, self._refresh_preview)
+
+    def _refresh_preview(self):
+        self.preview_job = None
+        template = self._preview_template()
+        if (self.pdf_path, self.page_number, stage_keys(template)) != self.preview_request:
+            self._load_page_in_worker()  # The previous preview stays on screen until the new one arrives
+
+    def next_page(self):
+        self.show_page(self.page_number + 1)
+
+    def previous_page(self):
+        self.show_page(self.page_number - 1)
+
     def _draw_preview(self, ins):
         """(Re-)draw a single blue preview string for one entry in self.insertion_points"""
         x, y = [c * self.current_zoom for c in ins["position"]]
@@ -282,6 +446,8 @@ class PDFViewer:
             baseoff = fnt.metrics("descent")
             self.canvas.coords(text_id, x, y + baseoff)
             self.canvas.itemconfigure(text_id, font=fnt)  # update size too
+        # a larger viewport may expose tiles that were never rendered
+        self.schedule_tile_refresh()
 
     def update_display(self, force_redraw=False):
         """Updates the canvas to display the current PDF page with zoom and scroll configurations."""
@@ -327,37 +493,238 @@ class PDFViewer:
             print("No valid page to display.")
             return
 
-        try:
-            # Generate a pixmap from the PDF page at the current zoom level
-            pix = self.page.get_pixmap(matrix=fitz.Matrix(self.current_zoom, self.current_zoom))
-            img = pix.tobytes("ppm")
-            img_tk = tk.PhotoImage(data=img)
-
-           # Generate pixmap …
-            if self.canvas.find_withtag("pdf_image"):
-                # reuse the same image item
-                self.canvas.itemconfigure("pdf_image", image=img_tk)
-            else:
-                # first time: create it
-                self.canvas.create_image(0, 0, anchor=tk.NW, image=img_tk, tags="pdf_image")
-
-            # Keep a reference to the image to prevent garbage collection
-            self.canvas_image = img_tk
+        # Tiles rendered at another zoom no longer line up with the canvas; cancel their pending renders
+        self.canvas.delete("pdf_image")
+        self.tile_items.clear()
+        self.placeholder_images.clear()
+        self.pending_tiles.clear()
+        self.render_generation = self.render_worker.next_generation()
 
-            # Calculate the zoomed dimensions
-            zoomed_width = int(self.pdf_width * self.current_zoom)
-            zoomed_height = int(self.pdf_height * self.current_zoom)
+        # Calculate the zoomed dimensions
+        zoomed_width = int(self.pdf_width * self.current_zoom)
+        zoomed_height = int(self.pdf_height * self.current_zoom)
 
-            # Configure the scroll region of the canvas to match the zoomed dimensions
-            self.canvas.config(yscrollcommand=self.v_scrollbar.set, xscrollcommand=self.h_scrollbar.set,
-                               scrollregion=(0, 0, zoomed_width, zoomed_height))
+        # Configure the scroll region of the canvas to match the zoomed dimensions
+        self.canvas.config(scrollregion=(0, 0, zoomed_width, zoomed_height))
 
-        except ValueError as e:
-            print(f"Error updating display: {e}")
+        # Only the tiles around the visible region are rendered; the rest follow on scroll
+        self.render_visible_tiles()
+        logging.debug(f"Tile cache: {self.tile_cache.stats()}")
 
         # Update any rectangle overlays or additional graphics
         self.update_rectangles()
 
+    def _on_xscroll(self, first, last):
+        """Forwards the horizontal view to the scrollbar and fills in newly exposed tiles."""
+        self.h_scrollbar.set(first, last)
+        self.schedule_tile_refresh()
+
+    def _on_yscroll(self, first, last):
+        """Forwards the vertical view to the scrollbar and fills in newly exposed tiles."""
+        self.v_scrollbar.set(first, last)
+        self.schedule_tile_refresh()
+
+    def schedule_tile_refresh(self):
+        """Coalesces bursts of scroll events into one tile refresh once Tk is idle."""
+        if self.tile_refresh_job is None:
+            self.tile_refresh_job = self.canvas.after_idle(self.render_visible_tiles)
+
+    def _visible_tile_range(self, page_width=None, page_height=None):
+        """
+        Returns the (col0, row0, col1, row1) tile range covering the viewport plus TILE_MARGIN,
+        on the current page or on a page of the given size.
+        """
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        right = left + self.canvas.winfo_width()
+        bottom = top + self.canvas.winfo_height()
+
+        page_width = self.pdf_width if page_width is None else page_width
+        page_height = self.pdf_height if page_height is None else page_height
+        max_col = max(0, (int(page_width * self.current_zoom) - 1) // TILE_SIZE)
+        max_row = max(0, (int(page_height * self.current_zoom) - 1) // TILE_SIZE)
+
+        col0 = max(0, int(left // TILE_SIZE) - TILE_MARGIN)
+        row0 = max(0, int(top // TILE_SIZE) - TILE_MARGIN)
+        col1 = min(max_col, int(right // TILE_SIZE) + TILE_MARGIN)
+        row1 = min(max_row, int(bottom // TILE_SIZE) + TILE_MARGIN)
+        return col0, row0, col1, row1
+
+    def _make_placeholder(self, col, row):
+        """Crops the greyscale overview to one tile and scales it up as an interim image."""
+        if self.overview is None:
+            return None
+        scale, image = self.overview
+        zoom = self.current_zoom
+        x0, y0 = col * TILE_SIZE, row * TILE_SIZE
+        x1 = min(x0 + TILE_SIZE, int(self.pdf_width * zoom))
+        y1 = min(y0 + TILE_SIZE, int(self.pdf_height * zoom))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        ratio = scale / zoom
+        crop = image.crop((int(x0 * ratio), int(y0 * ratio), int(x1 * ratio) + 1, int(y1 * ratio) + 1))
+        # The placeholder is an RGB photo so the final tile can later be pasted into the same buffer
+        placeholder = self._photo_for(crop.resize((x1 - x0, y1 - y0)))
+        self.placeholder_images[(col, row)] = placeholder
+        return placeholder
+
+    def _photo_for(self, image, photo=None):
+        """
+        Returns an RGB PhotoImage showing `image`, pasting into `photo` or a spare buffer of the
+        same size when one exists instead of allocating a new Tk image.
+        """
+        size = image.size
+        if photo is None or (photo.width(), photo.height()) != size:
+            photo = next((spare for spare in self.spare_images
+                          if (spare.width(), spare.height()) == size), None)
+            if photo is None:
+                photo = ImageTk.PhotoImage("RGB", size)
+            else:
+                self.spare_images.remove(photo)
+        photo.paste(image)  # Blits the samples straight into the Tk photo buffer
+        return photo
+
+    def _recycle_image(self, photo):
+        """Keeps a few evicted tile images around so their buffers can be reused."""
+        if len(self.spare_images) >= SPARE_IMAGE_LIMIT:
+            return
+        # Never hand out a buffer that is still shown on the canvas
+        shown = {self.canvas.itemcget(item, "image") for item in self.tile_items.values()}
+        if str(photo) not in shown:
+            self.spare_images.append(photo)
+
+    def render_visible_tiles(self):
+        """Places tiles intersecting the viewport on the canvas and drops those scrolled out of range.
+
+        Cached tiles are shown directly. Missing ones get a scaled overview crop immediately and are
+        requested from the background worker; `_poll_render_results` swaps them in when ready.
+        """
+        self.tile_refresh_job = None
+        if not self.page or self.zoom_settle_job:
+            return  # While zooming, the interim frame stands in until the zoom settles
+        if self.doc_key is None:
+            return  # The output preview is being processed; the current tiles stay until it is ready
+
+        col0, row0, col1, row1 = self._visible_tile_range()
+        wanted = {(col, row) for col in range(col0, col1 + 1) for row in range(row0, row1 + 1)}
+
+        # Remove canvas items that left the visible range; their images stay in the cache
+        for key in list(self.tile_items):
+            if key not in wanted:
+                self.canvas.delete(self.tile_items.pop(key))
+                self.placeholder_images.pop(key, None)
+
+        missing = []
+        for col, row in sorted(wanted):
+            cache_key = self._tile_key(col, row)
+            img_tk = self.tile_cache.get(cache_key)
+            if img_tk is None:
+                if cache_key not in self.pending_tiles:
+                    self.pending_tiles.add(cache_key)
+                    missing.append((col, row))
+                img_tk = self.placeholder_images.get((col, row)) or self._make_placeholder(col, row)
+                if img_tk is None:
+                    continue  # Overview not ready yet either
+
+            item = self.tile_items.get((col, row))
+            if item is None:
+                self.tile_items[(col, row)] = self.canvas.create_image(
+                    col * TILE_SIZE, row * TILE_SIZE, anchor=tk.NW, image=img_tk, tags="pdf_image")
+            else:
+                self.canvas.itemconfigure(item, image=img_tk)
+
+        if missing:
+            self.render_worker.request_tiles(self.render_generation, self.page_number, self.current_zoom, missing)
+            self._start_render_polling()
+
+        # Keep the page underneath rectangles and preview text
+        self.canvas.tag_lower("pdf_image")
+
+    def _tile_key(self, col, row, zoom=None, page_number=None):
+        return (self.doc_key, self.page_number if page_number is None else page_number,
+                self.current_zoom if zoom is None else zoom, col, row)
+
+    def _prefetch_adjacent_pages(self):
+        """Queues the current view of the neighbouring pages at low priority so flipping is instant."""
+        self.prefetched_generation = self.render_generation
+        for page_number in range(self.page_number - PREFETCH_PAGES, self.page_number + PREFETCH_PAGES + 1):
+            if page_number == self.page_number or not 0 <= page_number < self.pdf_document.page_count:
+                continue
+            rect = self.pdf_document[page_number].rect
+            col0, row0, col1, row1 = self._visible_tile_range(rect.width, rect.height)
+            missing = []
+            for col in range(col0, col1 + 1):
+                for row in range(row0, row1 + 1):
+                    cache_key = self._tile_key(col, row, page_number=page_number)
+                    if cache_key not in self.tile_cache and cache_key not in self.pending_tiles:
+                        self.pending_tiles.add(cache_key)
+                        missing.append((col, row))
+            if missing:
+                self.render_worker.request_tiles(self.render_generation, page_number, self.current_zoom,
+                                                 missing, priority=PRIORITY_PREFETCH)
+
+    def _start_render_polling(self):
+        if self.render_poll_job is None:
+            self.render_poll_job = self.canvas.after(RENDER_POLL_INTERVAL, self._poll_render_results)
+
+    def _poll_render_results(self):
+        """Moves finished background renders onto the canvas. Runs on the Tk thread."""
+        self.render_poll_job = None
+        while True:
+            try:
+                kind, generation, *payload = self.render_worker.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "error":
+                print(f"Error rendering page: {payload[0]}")
+                self.pending_tiles.clear()  # Let the next refresh request them again
+                if generation == self.page_generation:
+                    self.awaiting_overview = False
+                    if self.doc_key is None:
+                        # The preview could not be produced; fall back to the original page
+                        self.parent.output_preview_var.set(0)
+                        self.set_output_preview(False)
+                continue
+            if kind == "preview":
+                if generation == self.page_generation:
+                    self.doc_key = payload[0]
+                    self.update_display(force_redraw=True)
+                continue
+            if kind == "overview":
+                if generation == self.page_generation:
+                    scale, overview = payload[0]
+                    self.overview = scale, raster_to_image(overview)
+                    self.awaiting_overview = False
+                    self.render_visible_tiles()  # Fill the still-empty tiles with previews
+                continue
+            if generation != self.render_generation:
+                continue  # Stale: the page or zoom changed after this was requested
+
+            if kind == "tile":
+                (page_number, zoom, col, row), tile = payload
+                image = raster_to_image(tile)
+                cache_key = self._tile_key(col, row, zoom, page_number)
+                self.pending_tiles.discard(cache_key)
+                if page_number != self.page_number:
+                    # Prefetched neighbour: cache it for when the user flips to that page
+                    self.tile_cache.put(cache_key, self._photo_for(image), image.width * image.height * 4)
+                    continue
+                # Paste over the placeholder already on the canvas when the sizes match
+                img_tk = self._photo_for(image, self.placeholder_images.pop((col, row), None))
+                self.tile_cache.put(cache_key, img_tk, image.width * image.height * 4)
+                item = self.tile_items.get((col, row))
+                if item is not None:
+                    self.canvas.itemconfigure(item, image=img_tk)
+                else:
+                    self.schedule_tile_refresh()  # Placed only if it is still in view
+
+        if (not self.pending_tiles and not self.awaiting_overview and self.page is not None and not self.preview_output
+                and self.prefetched_generation != self.render_generation and not self.zoom_settle_job):
+            self._prefetch_adjacent_pages()  # The current view is complete; warm up its neighbours
+
+        if self.pending_tiles or self.awaiting_overview:
+            self._start_render_polling()
+
     def set_mode(self, mode):
         """Set the active mode and bind appropriate events."""
         self.canvas.unbind("<ButtonPress-1>")
@@ -370,33 +737,29 @@ class PDFViewer:
 
         if mode == TEXT_MODE:
             self.canvas.bind("<Button-1>", self.add_insertion_point)
-            print("Text mode activated.")
+            logging.debug("Text mode activated.")
         elif mode == REDACTION_MODE:
             self.canvas.bind("<ButtonPress-1>", self.start_rectangle)
             self.canvas.bind("<B1-Motion>", self.draw_rectangle)
             self.canvas.bind("<ButtonRelease-1>", self.end_rectangle)
-            print("Redaction mode activated.")
+            logging.debug("Redaction mode activated.")
         elif mode in [TABLE_COORDINATES_MODE, REVISION_COORDINATES_MODE]:
             self.canvas.bind("<ButtonPress-1>", self.start_rectangle)
             self.canvas.bind("<B1-Motion>", self.draw_rectangle)
             self.canvas.bind("<ButtonRelease-1>", self.end_rectangle)
-            print(f"{mode.capitalize()} mode activated.")
+            logging.debug(f"{mode.capitalize()} mode activated.")
 
     def start_rectangle(self, event):
         """Starts drawing a rectangle on the canvas."""
-        print(f"Start rectangle called in mode: {self.mode}")
         if self.mode in [TABLE_COORDINATES_MODE, REVISION_COORDINATES_MODE, REDACTION_MODE]:
             self.original_coordinates = (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
             self.current_rectangle = self.canvas.create_rectangle(*self.original_coordinates,
                                                                   *self.original_coordinates, outline="purple", width=2)
-            print(f"Rectangle started at: {self.original_coordinates}")
 
     def draw_rectangle(self, event):
         """Adjusts the rectangle dimensions as the mouse is dragged."""
         if self.current_rectangle:
-            print(f"Dragging rectangle: Current mode {self.mode}")
             x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-            print(f"Dragging to: {x}, {y}")
             self.canvas.coords(self.current_rectangle, self.original_coordinates[0], self.original_coordinates[1], x, y)
 
     def end_rectangle(self, event):
@@ -404,31 +767,29 @@ class PDFViewer:
         if self.current_rectangle:
             x0, y0 = self.original_coordinates
             x1, y1 = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
-            print(f"End rectangle: {x0}, {y0}, {x1}, {y1}")
+            logging.debug(f"End rectangle: {x0}, {y0}, {x1}, {y1}")
 
             if self.mode == TABLE_COORDINATES_MODE:
                 # Adjust table coordinates for PDF units
                 self.table_coordinates = [x0 / self.current_zoom, y0 / self.current_zoom,
                                           x1 / self.current_zoom, y1 / self.current_zoom]
-                print(f"Table coordinates set: {self.table_coordinates}")
-                self.rectangle_list.append(self.current_rectangle)  # Keep the rectangle visible
+                logging.debug(f"Table coordinates set: {self.table_coordinates}")
 
             elif self.mode == REVISION_COORDINATES_MODE:
                 # Adjust revision coordinates for PDF units
                 self.rev_coordinates = [x0 / self.current_zoom, y0 / self.current_zoom,
                                         x1 / self.current_zoom, y1 / self.current_zoom]
-                print(f"Revision coordinates set: {self.rev_coordinates}")
-                self.rectangle_list.append(self.current_rectangle)  # Keep the rectangle visible
+                logging.debug(f"Revision coordinates set: {self.rev_coordinates}")
 
             elif self.mode == REDACTION_MODE:
                 # Adjust redaction area for PDF units
                 adjusted_coords = [x0 / self.current_zoom, y0 / self.current_zoom,
                                    x1 / self.current_zoom, y1 / self.current_zoom]
-                self.areas.append({"coordinates": adjusted_coords, "title": "Redaction Area"})
-                self.rectangle_list.append(self.current_rectangle)  # Keep the rectangle visible
-                print(f"Redaction area added: {adjusted_coords}")
+                self.areas.append(adjusted_coords, "Redaction Area")
+                logging.debug(f"Redaction area added: {adjusted_coords}")
 
-            # Call update_rectangles to refresh the canvas
+            # The rubber band is replaced by the overlay item update_rectangles adds for it
+            self.canvas.delete(self.current_rectangle)
             self.update_rectangles()
 
             self.current_rectangle = None
@@ -458,74 +819,154 @@ class PDFViewer:
             self.canvas.yview_scroll(-1, "units")
 
     def clear_areas(self):
-        """Clears all rectangles, area selections, insertion points, and Treeview entries from the canvas."""
-
-        # Clear all rectangles from the canvas
-        for rect_id in self.rectangle_list:
-            self.canvas.delete(rect_id)
-        self.rectangle_list.clear()
+        """Clears all rectangles, area selections, insertion points, and area list rows from the canvas."""
 
         # remove blue preview texts
         self.canvas.delete("preview_text")
 
-        # Clear the areas list
+        # Clear the areas and insertion points
         self.areas.clear()
-
-        # Clear all text related to insertion points from the canvas
-        for insertion in self.insertion_points:
-            # Optionally, you can identify and delete text items if needed
-            pass
         self.insertion_points.clear()
 
-        # Clear the areas Treeview if it exists
-        if hasattr(self, 'areas_tree') and self.areas_tree:
-            for item in self.areas_tree.get_children():
-                self.areas_tree.delete(item)
-
-        # Update the canvas display to reflect changes
-        self.update_display(force_redraw=True)
-
-        # Clear the Treeview in the parent GUI
-        self.parent.update_areas_treeview()
+        # Removes the area rectangles and their list rows; the page image is unaffected
+        self.refresh_overlays()
 
         # Optional: Print statement for debugging
         print("Cleared All Areas and Insertion Points")
 
+    def refresh_overlays(self):
+        """Redraws preview text and rectangles at the current zoom without re-rendering the page."""
+        self.canvas.delete("preview_text")
+        for ins in self.insertion_points:
+            self._draw_preview(ins)
+        self.update_rectangles()
+
     def update_rectangles(self):
-        """Updates rectangle overlays on the canvas and refreshes the Treeview with adjusted coordinates."""
-        # Clear existing rectangles from the canvas
-        for rect_id in self.rectangle_list:
-            self.canvas.delete(rect_id)
-        self.rectangle_list.clear()
-
-        # Redraw rectangles for redaction areas
-        for rect_info in self.areas:
-            x0, y0, x1, y1 = [coord * self.current_zoom for coord in rect_info["coordinates"]]
-            # Draw the rectangle on the canvas
-            rect_id = self.canvas.create_rectangle(x0, y0, x1, y1, outline="red", width=2)
-            self.rectangle_list.append(rect_id)
-
-        # Draw rectangle for table coordinates
-        if self.table_coordinates:
-            x0, y0, x1, y1 = [coord * self.current_zoom for coord in self.table_coordinates]
-            rect_id = self.canvas.create_rectangle(x0, y0, x1, y1, outline="blue", width=2, dash=(20, 5))
-            self.rectangle_list.append(rect_id)
-            print(f"Table coordinates rectangle drawn: {self.table_coordinates}")
-
-        # Draw rectangle for revision coordinates
-        if self.rev_coordinates:
-            x0, y0, x1, y1 = [coord * self.current_zoom for coord in self.rev_coordinates]
-            rect_id = self.canvas.create_rectangle(x0, y0, x1, y1, outline="green", width=2, dash=(4, 2))
-            self.rectangle_list.append(rect_id)
-            print(f"Revision coordinates rectangle drawn: {self.rev_coordinates}")
-
-        # Update the Treeview in the main GUI
-        self.parent.update_areas_treeview()
+        """
+        Brings the rectangle overlays and the area list in line with the area store and zoom.
+
+        Only areas the store reports as added, edited or removed are touched, so an edit costs the
+        same with ten areas or ten thousand. After a zoom or page change every overlay is moved.
+        """
+        changed, removed = self.areas.take_changes()
+        for uid in removed:
+            if uid in self.overlays:
+                self._remove_overlay(uid)
+
+        geometry = (self.current_zoom, (self.page.rect.width, self.page.rect.height) if self.page else None)
+        if geometry != self._overlay_geometry:
+            self._overlay_geometry = geometry
+            changed = self.areas.uids
+
+        for uid in changed:
+            # Redaction areas are projected onto this page as the batch would apply them
+            coordinates, style = self.areas.coordinates_of(uid), "area"
+            if self.page:
+                projected, cut_off = project_area_to_page(coordinates, self.page.rect.width, self.page.rect.height)
+                coordinates = projected or coordinates
+                style = "off_sheet" if cut_off else "area"
+            self._sync_overlay(uid, coordinates, style)
+
+        for key, coordinates in (("table", self.table_coordinates), ("revision", self.rev_coordinates)):
+            if coordinates:
+                self._sync_overlay(key, coordinates, key)
+            elif key in self.overlays:
+                self._remove_overlay(key)
+
+        self.parent.refresh_area_list()
+        self.schedule_preview()
+
+    def _sync_overlay(self, uid, coordinates, style):
+        """Creates the canvas item for an overlay, or moves/restyles the existing one if needed."""
+        drawn = tuple(coord * self.current_zoom for coord in coordinates)
+        self.overlay_index.update(uid, coordinates)
+        record = self.overlays.get(uid)
+        if record is None:
+            item = self.canvas.create_rectangle(*drawn, **OVERLAY_STYLES[style])
+            self.overlays[uid] = {"item": item, "drawn": drawn, "style": style}
+            return
+        if record["drawn"] != drawn:
+            self.canvas.coords(record["item"], *drawn)
+            record["drawn"] = drawn
+        if record["style"] != style:
+            self.canvas.itemconfigure(record["item"], **OVERLAY_STYLES[style])
+            record["style"] = style
+
+    def _remove_overlay(self, uid):
+        """Deletes an overlay's canvas item."""
+        record = self.overlays.pop(uid)
+        self.overlay_index.remove(uid)
+        self.canvas.delete(record["item"])
+        if uid == self.selected_uid:
+            self.selected_rectangle_id = None
+            self.selected_uid = None
+
+    def remove_area(self, uid):
+        """Removes the area with the given uid (as used for its row in the area list)."""
+        self.areas.remove([uid])
+        self.update_rectangles()
+
+    def edit_area(self, uid, field_index, value):
+        """
+        Applies one edited cell of the area list to its area: field 0 is the title, 1-4 are
+        x0, y0, x1, y1. Only that area's rectangle is updated.
+        """
+        if field_index == 0:
+            self.areas.set_title(uid, value)
+        else:
+            try:
+                self.areas.set_coordinate(uid, field_index - 1, value)
+            except ValueError:
+                print(f"Invalid coordinate: {value}")
+                return
+        self.update_rectangles()
 
     def set_zoom(self, zoom_level):
-        """Updates the zoom level and refreshes the display."""
-        self.current_zoom = zoom_level
-        self.update_display(force_redraw=True) # Refresh the display with the new zoom level
+        """
+        Updates the zoom level. A scaled interim frame is shown at once and the page is only
+        re-rendered at full quality after zoom input has been quiet for ZOOM_SETTLE_DELAY ms,
+        so dragging the slider or spinning the wheel coalesces into a single render.
+        """
+        self.current_zoom = quantize_zoom(zoom_level, ZOOM_BUCKET)
+        if not self.page:
+            return
+        if self.zoom_settle_job:
+            self.canvas.after_cancel(self.zoom_settle_job)
+        self.zoom_settle_job = self.canvas.after(ZOOM_SETTLE_DELAY, self._settle_zoom)
+        self._show_interim_frame()
+
+    def _settle_zoom(self):
+        """Renders the final zoom level once input has settled."""
+        self.zoom_settle_job = None
+        self.interim_image = None
+        self.update_display(force_redraw=True)
+
+    def _show_interim_frame(self):
+        """Stretches the overview over the viewport at the new zoom and repositions the overlays."""
+        # Drop tiles of the previous zoom and cancel their renders
+        self.canvas.delete("pdf_image")
+        self.tile_items.clear()
+        self.placeholder_images.clear()
+        self.pending_tiles.clear()
+        self.render_generation = self.render_worker.next_generation()
+
+        self._update_scrollregion_only()  # New scrollregion and preview text positions
+        self.update_rectangles()
+
+        if self.overview is None:
+            return
+        scale, image = self.overview
+        zoom = self.current_zoom
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        right = min(left + self.canvas.winfo_width(), self.pdf_width * zoom)
+        bottom = min(top + self.canvas.winfo_height(), self.pdf_height * zoom)
+        if right <= left or bottom <= top:
+            return
+        ratio = scale / zoom
+        crop = image.crop((int(left * ratio), int(top * ratio), int(right * ratio) + 1, int(bottom * ratio) + 1))
+        self.interim_image = ImageTk.PhotoImage(crop.resize((int(right - left), int(bottom - top))))
+        self.canvas.create_image(left, top, anchor=tk.NW, image=self.interim_image, tags="pdf_image")
+        self.canvas.tag_lower("pdf_image")
 
     def resize_canvas(self):
         """Schedule a lightweight resize without regenerating the pixmap."""
@@ -561,37 +1002,25 @@ class PDFViewer:
         # Clear previous selection if any
         self.clear_selection()
 
-        # Iterate over rectangles to find one that has been clicked near its edge
-        for index, rect_id in enumerate(self.rectangle_list):
-            bbox = self.canvas.bbox(rect_id)
-            if bbox:
-                x0, y0, x1, y1 = bbox
+        # Ask the spatial index (in PDF points) for the overlay whose edge is closest to the click
+        hits = self.overlay_index.near_edge(x / self.current_zoom, y / self.current_zoom,
+                                            edge_tolerance / self.current_zoom)
+        if hits:
+            self.selected_uid = hits[0]
+            rect_id = self.overlays[self.selected_uid]["item"]
+            self.selected_rectangle_id = rect_id
+            self.selected_rectangle_original_color = self.canvas.itemcget(rect_id, "outline")
 
-                # Check if the click is near the left or right edge within the tolerance
-                near_left_edge = abs(x - x0) <= edge_tolerance and y0 <= y <= y1
-                near_right_edge = abs(x - x1) <= edge_tolerance and y0 <= y <= y1
-
-                # Check if the click is near the top or bottom edge within the tolerance
-                near_top_edge = abs(y - y0) <= edge_tolerance and x0 <= x <= x1
-                near_bottom_edge = abs(y - y1) <= edge_tolerance and x0 <= x <= x1
-
-                # If click is near any edge, select this rectangle
-                if near_left_edge or near_right_edge or near_top_edge or near_bottom_edge:
-                    self.selected_rectangle_id = rect_id
-                    self.selected_rectangle_index = index
-                    self.selected_rectangle_original_color = self.canvas.itemcget(rect_id, "outline")
-
-                    # Highlight the selected rectangle with a different color
-                    self.canvas.itemconfig(rect_id, outline="blue")
-                    print(f"Selected Rectangle at Index {index} with ID: {rect_id}")
-                    break
+            # Highlight the selected rectangle with a different color
+            self.canvas.itemconfig(rect_id, outline="blue")
+            logging.debug(f"Selected Rectangle {self.selected_uid} with ID: {rect_id}")
 
         # Show context menu if a rectangle was selected by edge detection
         if self.selected_rectangle_id is not None:
             self.context_menu.post(event.x_root, event.y_root)
         else:
             # Hide menu if no rectangle edge was clicked
-            print("No rectangle edge detected, context menu will not be shown.")
+            logging.debug("No rectangle edge detected, context menu will not be shown.")
             self.context_menu.unpost()
 
     def clear_selection(self):
@@ -600,44 +1029,41 @@ class PDFViewer:
             # Reset the previously selected rectangle's color
             self.canvas.itemconfig(self.selected_rectangle_id, outline=self.selected_rectangle_original_color)
             self.selected_rectangle_id = None
-            self.selected_rectangle_index = None
+            self.selected_uid = None
 
     def set_rectangle_title(self, title):
-        """Assigns a selected title to the currently selected rectangle and updates the Treeview."""
-        if self.selected_rectangle_index is not None:
-            # Update the title directly in `self.areas` based on the rectangle index
-            self.areas[self.selected_rectangle_index]["title"] = title  # Update title in `self.areas`
-            print(f"Title '{title}' set for rectangle at Index: {self.selected_rectangle_index}")
-
-            # Update the Treeview to reflect the new title
-            self.parent.update_areas_treeview()
+        """Assigns a selected title to the currently selected rectangle and updates the area list."""
+        if self.selected_uid in self.overlays and self.selected_uid not in ("table", "revision"):
+            self.areas.set_title(self.selected_uid, title)
+            logging.debug(f"Title '{title}' set for rectangle {self.selected_uid}")
+
+            # Update the area list to reflect the new title
+            self.update_rectangles()
+        elif self.selected_uid is not None:
+            logging.debug("Table and revision boxes have no title. Title not set.")
         else:
-            print("No rectangle selected. Title not set.")
+            logging.debug("No rectangle selected. Title not set.")
 
     def delete_selected_rectangle(self):
         """Deletes the selected rectangle from the canvas and updates the list of areas."""
-        if self.selected_rectangle_id:
-            try:
-                # Find the index of the selected rectangle in rectangle_list
-                index = self.rectangle_list.index(self.selected_rectangle_id)
-
-                # Delete the rectangle from canvas and remove from lists
-                self.canvas.delete(self.selected_rectangle_id)
-                del self.rectangle_list[index]
-                del self.areas[index]
-
-                # Update the Treeview and clear selection
-                self.parent.update_areas_treeview()
-                self.selected_rectangle_id = None
-                print("Rectangle deleted.")
+        if self.selected_uid not in self.overlays:
+            logging.debug("No rectangle selected for deletion.")
+            return
 
-                # Reassign titles to reflect the new order
-                for index, area in enumerate(self.areas):
-                    area["title"] = f"Rectangle {index + 1}"  # Update titles in `areas`
-                self.parent.update_areas_treeview()  # Refresh Treeview to reflect updated titles
+        uid = self.selected_uid
+        if uid == "table":
+            self.table_coordinates = None
+        elif uid == "revision":
+            self.rev_coordinates = None
+        else:
+            # Remove the area; update_rectangles deletes its rectangle
+            self.areas.remove([uid])
 
+            # Reassign titles to reflect the new order
+            for index, area_uid in enumerate(self.areas.uids):
+                self.areas.set_title(area_uid, f"Rectangle {index + 1}")
 
-            except ValueError:
-                print("Selected rectangle ID not found in the rectangle list.")
-        else:
-            print("No rectangle selected for deletion.")
+        self.selected_rectangle_id = None
+        self.selected_uid = None
+        self.update_rectangles()  # Refresh the canvas and the area list
+        logging.debug("Rectangle deleted.")
@@ -0,0 +1,121 @@
+# progress_dashboard.py
+
+import os
+import time
+from tkinter import messagebox
+
+import customtkinter as ctk
+
+from backend.constants import *
+
+
+def format_duration(seconds):
+    return time.strftime("%H:%M:%S", time.gmtime(seconds)) if seconds is not None else "--:--:--"
+
+
+class ProgressDashboard:
+    """
+    Progress window for a BatchRunner: overall progress, rolling files/s and pages/s, ETA,
+    busy/idle workers with the file each one is on, error count and the slowest file so far.
+
+    Everything shown comes from the runner's event stream, drained every DASHBOARD_REFRESH ms.
+    Pause/Resume and Cancel drive the runner; a second Cancel, or closing the window, stops the
+    workers without waiting for the files in progress. `on_finished(runner)` is called once the
+    batch is over; the window is already closed by then.
+    """
+
+    def __init__(self, root, runner, on_finished):
+        self.root = root
+        self.runner = runner
+        self.on_finished = on_finished
+
+        self.window = ctk.CTkToplevel(root)
+        self.window.title("Progress")
+        self.window.geometry("520x370")
+        self.window.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        self.progress_label = ctk.CTkLabel(self.window, text="Processing PDFs...")
+        self.progress_label.pack(pady=(10, 0))
+
+        self.progress_var = ctk.DoubleVar(value=0)
+        self.progress_bar = ctk.CTkProgressBar(self.window, variable=self.progress_var,
+                                               orientation="horizontal", width=480)
+        self.progress_bar.pack(pady=8)
+
+        self.stats_label = ctk.CTkLabel(self.window, text="", justify="left", anchor="w",
+                                        font=(BUTTON_FONT, 11))
+        self.stats_label.pack(fill="x", padx=20)
+
+        self.workers_box = ctk.CTkTextbox(self.window, height=130, font=(BUTTON_FONT, 10), wrap="none")
+        self.workers_box.pack(fill="both", expand=True, padx=20, pady=(5, 10))
+        self.workers_box.configure(state="disabled")
+
+        buttons = ctk.CTkFrame(self.window, fg_color="transparent")
+        buttons.pack(pady=(0, 10))
+        self.pause_button = ctk.CTkButton(buttons, text="Pause", width=110, command=self.toggle_pause)
+        self.pause_button.pack(side="left", padx=5)
+        self.cancel_button = ctk.CTkButton(buttons, text="Cancel", width=110, command=self.cancel)
+        self.cancel_button.pack(side="left", padx=5)
+
+    def start(self):
+        self.runner.start()
+        self.window.after(DASHBOARD_REFRESH, self._refresh)
+
+    def _refresh(self):
+        finished = self.runner.drain()
+        stats = self.runner.stats
+        if finished:
+            self.window.destroy()
+            self.on_finished(self.runner)
+            return
+
+        now = time.time()
+        files_per_second, pages_per_second = stats.rates(now)
+        if stats.total_files:
+            self.progress_var.set(stats.done_files / stats.total_files)
+        state = "Cancelling - " if self.runner.cancelling else "Paused - " if self.runner.paused else ""
+        self.progress_label.configure(text=f"{state}Processed {stats.done_files} of {stats.total_files} files "
+                                           f"({stats.pages} pages)")
+
+        slowest = (f"{os.path.basename(stats.slowest[1])} ({stats.slowest[0]:.1f} s)"
+                   if stats.slowest else "-")
+        self.stats_label.configure(text=(
+            f"Throughput: {files_per_second:.2f} files/s, {pages_per_second:.2f} pages/s\n"
+            f"Elapsed: {format_duration(stats.elapsed)}    ETA: {format_duration(stats.eta_seconds(now))}\n"
+            f"Workers: {stats.busy_workers} busy, {stats.idle_workers} idle    Errors: {len(stats.error_files)}\n"
+            f"Slowest file: {slowest}"
+        ))
+
+        lines = [f"{pid:>7}  {now - started:6.1f} s  {os.path.basename(pdf_path)}"
+                 for pid, (pdf_path, started) in sorted(stats.current.items())]
+        self.workers_box.configure(state="normal")
+        self.workers_box.delete("1.0", "end")
+        self.workers_box.insert("1.0", "\n".join(lines))
+        self.workers_box.configure(state="disabled")
+
+        self.window.after(DASHBOARD_REFRESH, self._refresh)
+
+    def toggle_pause(self):
+        if self.runner.paused:
+            self.runner.resume()
+            self.pause_button.configure(text="Pause")
+        else:
+            self.runner.pause()
+            self.pause_button.configure(text="Resume")
+
+    def cancel(self):
+        """First click lets the files in progress finish; the second abandons them."""
+        if self.runner.cancelling:
+            self.runner.cancel(terminate=True)
+            self.cancel_button.configure(state="disabled")
+            return
+        self.runner.cancel()
+        self.pause_button.configure(state="disabled")
+        self.cancel_button.configure(text="Stop Now")
+
+    def on_close(self):
+        if messagebox.askyesno("Stop Processing",
+                               "Stop the batch? Files being processed are abandoned; the rest can be "
+                               "resumed with PROCESS.", parent=self.window):
+            self.runner.cancel(terminate=True)
+            self.window.withdraw()  # Destroyed by _refresh once the workers are gone
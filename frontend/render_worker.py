@@ -0,0 +1,241 @@
+# render_worker.py
+
+import hashlib
+import itertools
+import multiprocessing
+import queue
+import threading
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from backend.constants import TILE_SIZE, PREVIEW_MAX_SIZE, PREFETCH_PAGES
+from backend.output_preview import OutputPreview
+
+# Job priorities: lower runs first, so prefetching never delays tiles the user is looking at
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH = 1
+
+PROCESS_CHECK_INTERVAL = 1.0  # seconds between checks that the render process (or its parent) is alive
+
+
+def raster(pix):
+    """(mode, width, height, samples) of a pixmap without alpha: plain bytes that can cross processes."""
+    return ("L" if pix.n == 1 else "RGB"), pix.width, pix.height, pix.samples
+
+
+def raster_to_image(raster):
+    """Wraps a raster's samples in a PIL image without copying them."""
+    mode, width, height, samples = raster
+    return Image.frombuffer(mode, (width, height), samples, "raw", mode, 0, 1)
+
+
+class RenderWorker:
+    """
+    Renders page tiles in a child process so the Tk main loop never blocks on MuPDF.
+
+    MuPDF holds the GIL for the whole of a render, so a thread would still freeze the GUI, and
+    it is not safe to use from two threads while the viewer reads the same file. The process
+    keeps its own handle on the document and interprets each page's content only once, into a
+    display list that every zoom level and tile is rendered from; lists are kept for the current
+    page and its PREFETCH_PAGES neighbours. Renders come back as rasters (see raster), so only
+    wrapping them in PIL and Tk images happens on the Tk thread.
+
+    Jobs wait here in a priority queue and are sent to the process one at a time by a dispatch
+    thread, which posts the replies to `results` for the Tk thread to pick up with `after()`
+    polling. Every request carries a generation number; whenever the viewer changes page or zoom
+    it starts a new generation, shared with the process, and work from older generations is
+    dropped without being rendered. For the output preview the process swaps the document for
+    an in-memory copy of the processed page. If the process dies, an error is posted, a new one
+    is started and the last page opened (or previewed) is opened in it again.
+    """
+
+    def __init__(self):
+        self.jobs = queue.PriorityQueue()
+        self.results = queue.Queue()
+        self.generation = 0
+        self._sequence = itertools.count()  # Keeps equal-priority jobs in submission order
+        self._current = multiprocessing.RawValue("i", 0)  # self.generation, as seen by the process
+        self._requests = None
+        self._replies = None
+        self._process = None
+        self._thread = threading.Thread(target=self._dispatch, daemon=True)
+
+    def start(self):
+        self._start_process()
+        self._thread.start()
+
+    def _start_process(self):
+        self._requests = multiprocessing.Queue()
+        self._replies = multiprocessing.Queue()
+        self._process = multiprocessing.Process(target=_serve, args=(self._requests, self._replies, self._current),
+                                                name="RenderProcess", daemon=True)
+        self._process.start()
+
+    def next_generation(self):
+        """Starts a new generation, cancelling everything queued before it."""
+        self.generation += 1
+        self._current.value = self.generation
+        return self.generation
+
+    def _put(self, priority, job):
+        self.jobs.put((priority, next(self._sequence), job))
+
+    def open_page(self, pdf_path, page_number, generation):
+        """Loads a page for rendering and queues its greyscale overview as the first result."""
+        self._put(PRIORITY_VISIBLE, ("open", generation, pdf_path, page_number))
+
+    def request_preview(self, pdf_path, page_number, template, generation):
+        """
+        Runs the processing pipeline on a copy of the page, in the render process, and shows the
+        result in its place. Posts ("preview", generation, key) with a cache key for the output,
+        then its overview. `template` is pickled when the job is sent, so it must be picklable.
+        """
+        self._put(PRIORITY_VISIBLE, ("preview", generation, pdf_path, page_number, template))
+
+    def close_document(self):
+        """Releases the process's document handle."""
+        self.next_generation()
+        self._put(PRIORITY_VISIBLE, ("close", self.generation))
+
+    def request_tiles(self, generation, page_number, zoom, tiles, priority=PRIORITY_VISIBLE):
+        """Queues full-quality renders for the given (col, row) tiles of a page at `zoom`."""
+        self._put(priority, ("tiles", generation, page_number, zoom, list(tiles)))
+
+    def _dispatch(self):
+        """Sends one job at a time to the process, so later high-priority jobs can still overtake."""
+        document_job = None  # The last open or preview job, replayed if the process has to be replaced
+        while True:
+            _, _, job = self.jobs.get()
+            if job[0] == "tiles" and job[1] != self.generation:
+                continue  # Cancelled before it was sent
+            if job[0] in ("open", "preview"):
+                document_job = job
+            elif job[0] == "close":
+                document_job = None
+            if self._run(job):
+                continue
+            self._replace_process(job)
+            # A new process has no document; reopen the page so later tile jobs have one to render.
+            # Not when opening it is what failed, or every retry would take the process down again
+            if document_job is not None and document_job is not job and not self._run(document_job):
+                self._replace_process(document_job)
+
+    def _run(self, job):
+        """Sends a job and posts its replies until it finishes; returns False if the process died."""
+        self._requests.put(job)
+        while True:
+            try:
+                reply = self._replies.get(timeout=PROCESS_CHECK_INTERVAL)
+            except queue.Empty:
+                if self._process.is_alive():
+                    continue
+                return False
+            if reply is None:  # The job is finished
+                return True
+            self.results.put(reply)
+
+    def _replace_process(self, job):
+        """Reports the dead process as an error of `job` and starts a new one."""
+        self.results.put(("error", job[1], f"render process exited with code {self._process.exitcode}"))
+        self._start_process()
+
+
+def _serve(requests, replies, generation):
+    """Entry point of the render process: runs jobs until the viewer's process goes away."""
+    renderer = _Renderer(replies, generation)
+    parent = multiprocessing.parent_process()
+    while True:
+        try:
+            job = requests.get(timeout=PROCESS_CHECK_INTERVAL)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                return
+            continue
+        try:
+            renderer.run(job)
+        except Exception as e:
+            replies.put(("error", job[1], str(e)))
+        replies.put(None)
+
+
+class _Renderer:
+    """The render process's document, display lists and output preview."""
+
+    def __init__(self, replies, generation):
+        self.replies = replies
+        self.generation = generation  # Shared with RenderWorker.next_generation
+        self._doc = None
+        self._pdf_path = None
+        self._display_lists = {}  # {page_number: DisplayList}
+        self._page_map = {}  # {viewer page number: page index in self._doc} while a preview is shown
+        self._preview = OutputPreview()
+
+    def run(self, job):
+        kind, generation = job[0], job[1]
+        if kind == "close":
+            self._close()
+        elif kind == "open":
+            self._open(job[2], job[3])
+            # The overview stays valid across zoom changes, so it is posted even if
+            # a newer generation exists; the viewer matches it against the page it shows
+            self.replies.put(("overview", generation, self._render_overview(job[3])))
+        elif kind == "preview":
+            key = self._open_preview(job[2], job[3], job[4])
+            self.replies.put(("preview", generation, key))
+            self.replies.put(("overview", generation, self._render_overview(job[3])))
+        elif kind == "tiles":
+            self._render_tiles(generation, job[2], job[3], job[4])
+
+    def _open(self, pdf_path, page_number):
+        if pdf_path != self._pdf_path or self._page_map:
+            self._close()
+            self._doc = fitz.open(pdf_path)
+            self._pdf_path = pdf_path
+        # Display lists of pages far from the one shown are no longer worth their memory
+        for number in list(self._display_lists):
+            if abs(number - page_number) > PREFETCH_PAGES:
+                del self._display_lists[number]
+
+    def _open_preview(self, pdf_path, page_number, template):
+        """Replaces the document with the one-page processed output; returns a key for its content."""
+        data = self._preview.render(pdf_path, page_number, template)
+        self._close()
+        self._doc = fitz.open("pdf", data)
+        self._page_map = {page_number: 0}
+        # Identical output (e.g. an edit that was undone) gets the same key and reuses cached tiles
+        return ("preview", pdf_path, hashlib.sha1(data).hexdigest())
+
+    def _close(self):
+        self._display_lists.clear()
+        self._page_map = {}
+        self._pdf_path = None
+        if self._doc is not None:
+            self._doc.close()
+        self._doc = None
+
+    def _display_list(self, page_number):
+        """Returns the page's display list, interpreting its content stream on first use only."""
+        display_list = self._display_lists.get(page_number)
+        if display_list is None:
+            display_list = self._doc[self._page_map.get(page_number, page_number)].get_displaylist()
+            self._display_lists[page_number] = display_list
+        return display_list
+
+    def _render_overview(self, page_number):
+        """Renders the whole page in greyscale so its long side is PREVIEW_MAX_SIZE pixels; returns (scale, raster)."""
+        display_list = self._display_list(page_number)
+        scale = PREVIEW_MAX_SIZE / max(display_list.rect.width, display_list.rect.height)
+        pix = display_list.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY)
+        return scale, raster(pix)
+
+    def _render_tiles(self, generation, page_number, zoom, tiles):
+        for col, row in tiles:
+            # A newer page or zoom request makes the rest of this batch stale
+            if generation != self.generation.value or self._doc is None:
+                return
+            display_list = self._display_list(page_number)
+            clip = fitz.Rect(col * TILE_SIZE / zoom, row * TILE_SIZE / zoom,
+                             (col + 1) * TILE_SIZE / zoom, (row + 1) * TILE_SIZE / zoom) & display_list.rect
+            pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+            self.replies.put(("tile", generation, (page_number, zoom, col, row), raster(pix)))
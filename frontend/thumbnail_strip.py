@@ -0,0 +1,178 @@
+# thumbnail_strip.py
+
+import os
+import queue
+import tkinter as tk
+
+import customtkinter as ctk
+
+from backend.constants import *
+from backend.thumbnail_cache import cached_thumbnails, ThumbnailGenerator
+from frontend.tile_cache import TileCache
+
+ROW_HEIGHT = THUMBNAIL_SIZE + 28  # Thumbnail plus its file name
+STRIP_WIDTH = THUMBNAIL_SIZE + 40
+THUMBNAIL_POLL_INTERVAL = 100  # milliseconds
+
+
+class ThumbnailStrip:
+    """
+    Scrollable column of first-page thumbnails for every PDF in a folder.
+
+    Thumbnails already in the on-disk cache are shown straight away; the rest are rendered by a
+    ThumbnailGenerator pool and go into their file's row as they finish. Only rows in view have
+    canvas items; decoded images of rows scrolled away are kept in a TileCache bounded by
+    THUMBNAIL_MEMORY_BYTES, so folders with thousands of files stay responsive. Clicking a row
+    calls `on_select(pdf_path)`.
+    """
+
+    def __init__(self, root, on_select):
+        self.root = root
+        self.on_select = on_select
+        self.window = None
+        self.canvas = None
+        self.pdf_paths = []
+        self.thumbnail_paths = []  # png path or None per row, filled in as thumbnails become available
+        self.images = TileCache(THUMBNAIL_MEMORY_BYTES)  # {png path: PhotoImage}
+        self.row_items = {}  # {row: (canvas item ids, PhotoImage or None)} for rows in view
+        self.generator = None
+        self.poll_job = None
+
+    def show_folder(self, pdf_folder, include_subfolders):
+        """Lists the folder's PDFs, shows cached thumbnails and starts rendering the missing ones."""
+        from backend.pdf_processor import find_pdf_files  # Keeps the processing engine out of startup
+
+        self.stop()
+        self._ensure_window()
+        self.window.title(f"Thumbnails - {pdf_folder}")
+
+        self.pdf_paths = sorted(find_pdf_files(pdf_folder, include_subfolders), key=str.lower)
+        cached, missing = cached_thumbnails(self.pdf_paths)
+        self.thumbnail_paths = [cached.get(pdf_path) for pdf_path in self.pdf_paths]
+        print(f"Thumbnails: {len(cached)} cached, {len(missing)} to render")
+
+        self._clear_rows()
+        self.images.clear()
+        self.canvas.config(scrollregion=(0, 0, STRIP_WIDTH, max(1, len(self.pdf_paths)) * ROW_HEIGHT))
+        self.canvas.yview_moveto(0)
+        self.draw_visible_rows()
+
+        if missing:
+            missing = set(missing)
+            self.generator = ThumbnailGenerator((row, pdf_path) for row, pdf_path in enumerate(self.pdf_paths)
+                                                if pdf_path in missing)
+            self.generator.start()
+            self.poll_job = self.window.after(THUMBNAIL_POLL_INTERVAL, self._poll_generator)
+
+    def stop(self):
+        """Stops background rendering; thumbnails finished so far stay in the cache."""
+        if self.generator is not None:
+            self.generator.stop()
+            self.generator = None
+        if self.poll_job is not None and self.window is not None:
+            self.window.after_cancel(self.poll_job)
+        self.poll_job = None
+
+    def _ensure_window(self):
+        if self.window is not None and self.window.winfo_exists():
+            return
+        self.window = ctk.CTkToplevel(self.root)
+        self.window.geometry(f"{STRIP_WIDTH + 20}x{int(INITIAL_HEIGHT)}"
+                             f"+{INITIAL_X_POSITION + INITIAL_WIDTH + 10}+{INITIAL_Y_POSITION}")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.canvas = tk.Canvas(self.window, width=STRIP_WIDTH, highlightthickness=0)
+        scrollbar = ctk.CTkScrollbar(self.window, orientation="vertical", command=self.canvas.yview)
+        self.canvas.config(yscrollcommand=lambda first, last: (scrollbar.set(first, last),
+                                                                self.draw_visible_rows()))
+        scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>",
+                         lambda event: self.canvas.yview_scroll(-1 * int(event.delta / 120), "units"))
+
+    def close(self):
+        self.stop()
+        self._clear_rows()
+        self.images.clear()
+        self.window.destroy()
+        self.window = None
+
+    def _clear_rows(self):
+        if self.canvas is not None:
+            self.canvas.delete("all")
+        self.row_items.clear()
+
+    def _visible_rows(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(0, int(top // ROW_HEIGHT))
+        last = min(len(self.pdf_paths) - 1, int(bottom // ROW_HEIGHT))
+        return range(first, last + 1)
+
+    def draw_visible_rows(self):
+        """Creates items for rows scrolled into view and deletes those scrolled out."""
+        if self.canvas is None:
+            return
+        visible = set(self._visible_rows())
+        for row in list(self.row_items):
+            if row not in visible:
+                self._delete_row(row)
+        for row in visible:
+            if row not in self.row_items:
+                self._draw_row(row)
+
+    def _draw_row(self, row):
+        pdf_path = self.pdf_paths[row]
+        y = row * ROW_HEIGHT
+        items = [self.canvas.create_text(STRIP_WIDTH // 2, y + THUMBNAIL_SIZE + 14, width=STRIP_WIDTH - 10,
+                                         text=os.path.basename(pdf_path), font=(BUTTON_FONT, 8))]
+        image = None
+        thumbnail_path = self.thumbnail_paths[row]
+        if thumbnail_path:
+            image = self.images.get(thumbnail_path)
+            if image is None:
+                try:
+                    image = tk.PhotoImage(file=thumbnail_path)
+                    self.images.put(thumbnail_path, image, image.width() * image.height() * 4)
+                except tk.TclError:
+                    image = None
+            if image is not None:
+                items.append(self.canvas.create_image(STRIP_WIDTH // 2, y + 4, anchor=tk.N, image=image))
+        if image is None:
+            items.append(self.canvas.create_rectangle(20, y + 4, STRIP_WIDTH - 20, y + THUMBNAIL_SIZE,
+                                                      outline="gray70", dash=(3, 3)))
+        self.row_items[row] = (items, image)
+
+    def _delete_row(self, row):
+        items, _ = self.row_items.pop(row)
+        for item in items:
+            self.canvas.delete(item)
+
+    def _poll_generator(self):
+        """Picks up freshly rendered thumbnails and redraws their rows if they are in view."""
+        self.poll_job = None
+        if self.generator is None:
+            return
+        while True:
+            try:
+                result = self.generator.results.get_nowait()
+            except queue.Empty:
+                break
+            if result is None:
+                self.generator = None
+                print("Thumbnails: all rendered")
+                return
+            row, thumbnail_path = result
+            if thumbnail_path:
+                self.thumbnail_paths[row] = thumbnail_path
+                if row in self.row_items:
+                    self._delete_row(row)
+                    self._draw_row(row)
+        self.poll_job = self.window.after(THUMBNAIL_POLL_INTERVAL, self._poll_generator)
+
+    def _on_click(self, event):
+        row = int(self.canvas.canvasy(event.y) // ROW_HEIGHT)
+        if 0 <= row < len(self.pdf_paths):
+            self.on_select(self.pdf_paths[row])
@@ -0,0 +1,67 @@
+# tile_cache.py
+
+from collections import OrderedDict
+
+
+def quantize_zoom(zoom, bucket):
+    """Snaps a zoom factor to the nearest multiple of `bucket` so nearby zooms share cached tiles."""
+    return max(bucket, round(zoom / bucket) * bucket)
+
+
+class TileCache:
+    """
+    Memory-bounded least-recently-used store for rendered page tiles.
+
+    Keys are (document key, page number, quantized zoom, col, row), so switching back to a page,
+    file or zoom level that was shown recently is served without touching the renderer.
+    """
+
+    def __init__(self, max_bytes, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict  # Called with each evicted tile so its buffer can be recycled
+        self._tiles = OrderedDict()  # {key: (tile, nbytes)}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Returns the cached tile for `key` (marking it as recently used) or None."""
+        entry = self._tiles.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._tiles.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, tile, nbytes):
+        """Stores a tile of `nbytes` and evicts the least recently used ones beyond the budget."""
+        if key in self._tiles:
+            self.total_bytes -= self._tiles.pop(key)[1]
+        self._tiles[key] = (tile, nbytes)
+        self.total_bytes += nbytes
+        while self.total_bytes > self.max_bytes and len(self._tiles) > 1:
+            _, (evicted, evicted_bytes) = self._tiles.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+            if self.on_evict is not None:
+                self.on_evict(evicted)
+
+    def clear(self):
+        """Drops every cached tile."""
+        self._tiles.clear()
+        self.total_bytes = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        """One-line summary for debug output."""
+        return (f"{len(self._tiles)} tiles, {self.total_bytes / 2 ** 20:.1f} MB, "
+                f"hit rate {self.hit_rate():.0%} ({self.hits} hits / {self.misses} misses)")
+
+    def __contains__(self, key):
+        return key in self._tiles
+
+    def __len__(self):
+        return len(self._tiles)
@@ -4,7 +4,6 @@
 """
 import multiprocessing
 import customtkinter as ctk
-from frontend.gui import ReidactorGUI
 from backend.constants import INITIAL_WIDTH, INITIAL_HEIGHT, INITIAL_X_POSITION, INITIAL_Y_POSITION
 
 class ReidactorApp:
@@ -12,6 +11,19 @@ class ReidactorApp:
         self.root = ctk.CTk()
         self.root.title("Reidactor")
         self.root.geometry(f"{INITIAL_WIDTH}x{INITIAL_HEIGHT}+{INITIAL_X_POSITION}+{INITIAL_Y_POSITION}")
+        self.gui = None
+
+        # Paint the window before the slower imports in load_gui
+        self.loading_label = ctk.CTkLabel(self.root, text="Loading...")
+        self.loading_label.place(relx=0.5, rely=0.5, anchor="center")
+        self.root.update()
+
+    def load_gui(self):
+        # Imported here rather than at the top so the window is on screen while PyMuPDF, PIL and
+        # the viewer load; spawned worker processes, which re-import this module, skip them too
+        from frontend.gui import ReidactorGUI
+
+        self.loading_label.destroy()
         self.gui = ReidactorGUI(self.root)
 
     def run(self):
@@ -19,9 +31,9 @@ class ReidactorApp:
 
 def main():
     app = ReidactorApp()
+    app.load_gui()
     app.run()
 
 if __name__ == '__main__':
     multiprocessing.freeze_support()  # This helps PyInstaller handle multiprocessing.
     main()
-
@@ -0,0 +1,18 @@
+# test_metrics.py
+
+from backend.metrics import percentile
+
+
+def test_percentile_nearest_rank_of_ten():
+    values = list(range(1, 11))
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.9) == 9
+    assert percentile(values, 0.99) == 10
+    assert percentile(values, 0.0) == 1
+    assert percentile(values, 1.0) == 10
+
+
+def test_percentile_between_ranks_rounds_up():
+    values = list(range(1, 9))
+    assert percentile(values, 0.5) == 4
+    assert percentile(values, 0.9) == 8